@@ -0,0 +1,85 @@
+#############################################
+# NumPy 一括検証 (hanagram.bulk) の照合と処理速度
+#
+#   python benchmarks/bulk_validation.py [--boards 1000000] [--min-rate 1000000]
+#
+# ランダムな盤面で validation.check_duplicates / check_all_lines_completed と
+# 結果が一致するかを確かめてから、1 コアでの盤面/秒を測る。
+# 不一致か、速度が --min-rate を下回れば終了コード 1。
+#############################################
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+
+from hanagram.bulk import grids_to_array, validate_boards  # noqa: E402
+from hanagram.geometry import NUM_CELLS, cells, line_names  # noqa: E402
+from hanagram.solver import cells_to_grid, solve_cells  # noqa: E402
+from hanagram.validation import check_all_lines_completed, check_duplicates  # noqa: E402
+
+
+def random_grids(rng, count):
+    grids = []
+    for n in range(count):
+        if n % 10 == 0:
+            # 完成盤面 (半分は 1 セルだけ崩す)
+            board = cells_to_grid(solve_cells([None] * NUM_CELLS,
+                                              order=lambda d: rng.sample(d, len(d))))
+            if n % 20 == 0:
+                r, c = rng.choice(cells)
+                board[r][c] = rng.randrange(10)
+        else:
+            board = [[None]*9 for _ in range(6)]
+            density = rng.random()
+            for (r, c) in cells:
+                if rng.random() < density:
+                    board[r][c] = rng.randrange(10)
+        grids.append(board)
+    return grids
+
+
+def mismatches(grids, result):
+    bad = 0
+    for n, board in enumerate(grids):
+        dup_found, dup_info = check_duplicates(board)
+        lines = {f"{direction} - 列{d_idx + 1}" for direction, d_idx in
+                 (line_names[l] for l in np.flatnonzero(result['duplicate_lines'][n]))}
+        if (dup_found != result['duplicates'][n]
+                or lines != {info.split(' 重複')[0] for info in dup_info}
+                or check_all_lines_completed(board) != result['completed'][n]):
+            bad += 1
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='NumPy 一括検証の照合と速度測定')
+    parser.add_argument('--boards', type=int, default=1_000_000)
+    parser.add_argument('--check', type=int, default=5000, help='参照実装と照合する盤面数')
+    parser.add_argument('--min-rate', type=float, default=1_000_000, help='必要な盤面/秒')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    grids = random_grids(rng, args.check)
+    sample = grids_to_array(grids)
+    bad = mismatches(grids, validate_boards(sample))
+    print(f"照合: {len(grids)} 盤面中 不一致 {bad}")
+
+    boards = np.resize(sample, (args.boards, NUM_CELLS))
+    start = time.perf_counter()
+    validate_boards(boards)
+    rate = args.boards / (time.perf_counter() - start)
+    print(f"速度: {rate:,.0f} 盤面/秒 (必要 {args.min_rate:,.0f})")
+
+    ok = bad == 0 and rate >= args.min_rate
+    print("OK" if ok else "NG")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#############################################
+# 完成盤面の数え上げ (hanagram.census) を総当たりと照合する
+#
+#   python benchmarks/census_check.py [--size 2]
+#
+# 完成盤面を全て (数字の付け替え・対称操作を除かずに) 総当たりで列挙し、
+# 1. 完成盤面の数
+# 2. ライン 0 が 0, 1, 2, ... の盤面 (census の代表) の対称性の型毎の数
+# 3. 対称操作・数字の付け替えで移り合うものを同一視したクラス数 (軌道を直接数える)
+# が census.run(--classes) の結果と一致するかを確かめる。
+# 総当たりなので --size 2 (12 セル・11520 盤面) 程度まで。一致しなければ終了コード 1。
+#############################################
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hanagram.census import FIXED_LINE, CensusPlan, _stabilizer, run  # noqa: E402
+
+
+def all_grids(topology):
+    """全ラインが重複なく埋まった盤面をセル番号順に総当たりで列挙する"""
+    values = [None] * topology.num_cells
+    masks = [0] * topology.num_lines
+
+    def walk(idx):
+        if idx == topology.num_cells:
+            yield tuple(values)
+            return
+        lines = topology.cell_lines[idx]
+        for val in range(topology.num_digits):
+            if any(masks[l_idx] >> val & 1 for l_idx in lines):
+                continue
+            values[idx] = val
+            for l_idx in lines:
+                masks[l_idx] |= 1 << val
+            yield from walk(idx + 1)
+            for l_idx in lines:
+                masks[l_idx] &= ~(1 << val)
+        values[idx] = None
+
+    yield from walk(0)
+
+
+def normalize(values):
+    """数字を最初に現れた順に 0, 1, 2, ... に付け替える"""
+    relabel = {}
+    return tuple(relabel.setdefault(val, len(relabel)) for val in values)
+
+
+def brute_force(topology):
+    fixed_cells = topology.line_cells[FIXED_LINE]
+    fixed_values = tuple(range(len(fixed_cells)))
+    perms = list(topology.symmetries.items())
+    grids = 0
+    histogram = {}
+    orbits = set()
+    for values in all_grids(topology):
+        grids += 1
+        if tuple(values[idx] for idx in fixed_cells) == fixed_values:
+            key = ','.join(_stabilizer(values, topology, perms))
+            histogram[key] = histogram.get(key, 0) + 1
+        orbits.add(min(normalize([values[perm[idx]] for idx in range(topology.num_cells)])
+                       for _, perm in perms))
+    return grids, histogram, len(orbits)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='完成盤面の数え上げを総当たりと照合する')
+    parser.add_argument('--size', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    plan = CensusPlan(args.size)
+    start = time.perf_counter()
+    grids, histogram, classes = brute_force(plan.topology)
+    brute_time = time.perf_counter() - start
+    result = run(plan, classes=True, workers=1, progress=False)
+    print(f"size={args.size}: 総当たり {grids} 盤面 ({brute_time:.2f} 秒) / "
+          f"census {result['grids']} 盤面 ({result['seconds']:.2f} 秒, σ={plan.sigma})")
+
+    ok = True
+    if result['grids'] != grids:
+        print(f"NG: 完成盤面の数 census {result['grids']} / 総当たり {grids}")
+        ok = False
+    for key in sorted(set(histogram) | set(result['symmetry_types'])):
+        got, expected = result['symmetry_types'].get(key, 0), histogram.get(key, 0)
+        print(f"  {key}: census {got} / 総当たり {expected}{'' if got == expected else '  <-- NG'}")
+        ok = ok and got == expected
+    if result['classes'] != classes:
+        print(f"NG: クラス数 census {result['classes']} / 総当たり {classes}")
+        ok = False
+    print("OK" if ok else "NG")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#############################################
+# コアパッケージの import 時間の予算チェック
+#
+#   python benchmarks/import_time.py [--budget-ms 50] [--repeat 5]
+#
+# 新しいインタプリタで hanagram のコアモジュールを import し、
+# - 所要時間 (repeat 回の最小値) が予算以内か
+# - streamlit / pandas / matplotlib / plotly / numpy を読み込んでいないか
+# を確かめる。どちらかを満たさなければ終了コード 1。
+#############################################
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CORE_MODULES = [
+    'hanagram',
+    'hanagram.catalog',
+    'hanagram.pack',
+]
+HEAVY_MODULES = ['streamlit', 'pandas', 'matplotlib', 'plotly', 'numpy']
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - t
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{'ms': elapsed * 1000, 'heavy': heavy}}))
+"""
+
+
+def measure(modules=CORE_MODULES):
+    code = _PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='')
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='hanagram コアの import 時間を測る')
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = [measure() for _ in range(args.repeat)]
+    best = min(r['ms'] for r in results)
+    heavy = results[0]['heavy']
+    print(f"import {', '.join(CORE_MODULES)}: {best:.1f} ms (予算 {args.budget_ms:.0f} ms)")
+
+    ok = True
+    if heavy:
+        print(f"NG: UI 用の重いモジュールを読み込んでいます: {', '.join(heavy)}")
+        ok = False
+    if best > args.budget_ms:
+        print("NG: 予算を超えました")
+        ok = False
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
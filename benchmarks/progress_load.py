@@ -0,0 +1,185 @@
+#############################################
+# 進行状況の保存 (hanagram.progress) の負荷試験
+#
+#   python benchmarks/progress_load.py [--players 400] [--moves 50] [--threads 8]
+#                                      [--processes 2] [--min-rate 2000]
+#
+# 1. 入力: --processes 個のプロセス (同じマシンのワーカーのつもり) が同じ DB を開き、
+#    それぞれ --threads 本のスレッド (セッションのつもり) でプレイヤーに 1 手ずつ入力させて
+#    毎回 save() する。save() の待ち時間と、最後の flush() までを含めた保存回数/秒を測る
+# 2. 書き込み: 別々の (プレイヤー, パズル) の行を --rows 件 save() して flush() し、
+#    待ち行列でまとめられない場合に SQLite へ書ける行数/秒を測る
+# 3. 復元: 全プレイヤーを load() し、待ち時間と盤面・履歴が最後の状態と一致するかを確かめる
+# 保存回数/秒・書き込み行数/秒が --min-rate 未満、save() の p99 が --max-save-ms を
+# 超える、または復元した盤面が一致しなければ終了コード 1。
+# DB は一時ディレクトリに作る (--db で指定もできる)。
+#############################################
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Pool
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from hanagram.board import Board  # noqa: E402
+from hanagram.geometry import NUM_CELLS  # noqa: E402
+from hanagram.history import MoveHistory  # noqa: E402
+from hanagram.loader import load_puzzle_from_csv  # noqa: E402
+from hanagram.progress import ProgressStore  # noqa: E402
+from hanagram.state import BoardState  # noqa: E402
+
+SAMPLE_CSV = os.path.join(ROOT, 'puzzles', 'HAMAGRAM_A3_07.csv')
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def play(store, initial, players, moves, seed):
+    """players の各プレイヤーに moves 手ずつ入力させて毎回保存する。
+    (save() の待ち時間のリスト, プレイヤー → 最後の盤面のバイト列)"""
+    rng = random.Random(seed)
+    free = [idx for idx in range(NUM_CELLS) if not initial.is_given(idx)]
+    sessions = {}
+    for player in players:
+        board = initial.clone()
+        sessions[player] = (board, BoardState.from_cells(board.values()), MoveHistory(board.values()))
+    latencies = []
+    for _ in range(moves):
+        for player in players:
+            board, state, history = sessions[player]
+            idx = rng.choice(free)
+            old, new = board.get(idx), rng.choice([None, *range(10)])
+            board.set(idx, new)
+            state.set(idx, new)
+            history.record(idx, old, new, not state.has_duplicates)
+            start = time.perf_counter()
+            store.save(player, initial, board, history, 'load-test')
+            latencies.append(time.perf_counter() - start)
+    return latencies, {player: (board.to_bytes(), history.to_bytes())
+                       for player, (board, _, history) in sessions.items()}
+
+
+def run_worker(job):
+    """1 プロセス分: threads 本のスレッドでプレイヤーを分けて入力する"""
+    path, worker, players, moves, threads, flush_interval = job
+    initial = Board.from_grid(load_puzzle_from_csv(SAMPLE_CSV)).freeze()
+    store = ProgressStore(path, flush_interval=flush_interval)
+    names = [f'w{worker}-p{n}' for n in range(players)]
+    results = [None] * threads
+
+    def target(t):
+        results[t] = play(store, initial, names[t::threads], moves, seed=worker * 1000 + t)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=target, args=(t,)) for t in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    store.flush()
+    elapsed = time.perf_counter() - start
+    latencies = [lat for lats, _ in results for lat in lats]
+    final = {player: state for _, finals in results for player, state in finals.items()}
+    stats = (store.rows_written, store.flushes)
+    store.close()
+    return elapsed, latencies, final, stats
+
+
+def write_rows(path, rows, flush_interval):
+    """別々のキーの行を rows 件保存して flush() するまでの秒数"""
+    initial = Board.from_grid(load_puzzle_from_csv(SAMPLE_CSV)).freeze()
+    board = initial.clone()
+    history = MoveHistory(board.values())
+    store = ProgressStore(path, flush_interval=flush_interval)
+    start = time.perf_counter()
+    for n in range(rows):
+        store.save(f'bulk-{n}', initial, board, history)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    store.close()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='進行状況の保存の負荷試験')
+    parser.add_argument('--players', type=int, default=400, help='プロセスあたりのプレイヤー数')
+    parser.add_argument('--moves', type=int, default=50, help='プレイヤーあたりの手数')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=20000, help='書き込み試験の行数')
+    parser.add_argument('--flush-interval', type=float, default=0.2)
+    parser.add_argument('--min-rate', type=float, default=2000.0, help='保存回数/秒・書き込み行数/秒の下限')
+    parser.add_argument('--max-save-ms', type=float, default=1.0, help='save() の p99 の上限')
+    parser.add_argument('--db', default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, 'progress.sqlite')
+        ok = True
+
+        # 1) 入力しながら保存 (複数プロセス × 複数スレッド)
+        jobs = [(path, w, args.players, args.moves, args.threads, args.flush_interval)
+                for w in range(args.processes)]
+        ProgressStore(path).close()      # スキーマを先に作っておく
+        start = time.perf_counter()
+        with Pool(args.processes) as pool:
+            results = pool.map(run_worker, jobs)
+        elapsed = time.perf_counter() - start
+        latencies = [lat for _, lats, _, _ in results for lat in lats]
+        final = {player: state for _, _, finals, _ in results for player, state in finals.items()}
+        rows_written = sum(stats[0] for _, _, _, stats in results)
+        flushes = sum(stats[1] for _, _, _, stats in results)
+        rate = len(latencies) / elapsed
+        p50, p99 = percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+        print(f"入力: {args.processes} プロセス × {args.threads} スレッド, {len(final)} プレイヤー, "
+              f"{len(latencies)} 回保存 / {elapsed:.2f} 秒 = {rate:,.0f} 回/秒")
+        print(f"  save(): p50 {p50:.3f} ms / p99 {p99:.3f} ms / 最大 {max(latencies) * 1000:.2f} ms")
+        print(f"  書き込み: {rows_written} 行 / {flushes} トランザクション "
+              f"(平均 {rows_written / max(flushes, 1):.0f} 行/回)")
+        if rate < args.min_rate:
+            print(f"NG: 保存回数/秒が {args.min_rate:,.0f} 未満です")
+            ok = False
+        if p99 > args.max_save_ms:
+            print(f"NG: save() の p99 が {args.max_save_ms} ms を超えました")
+            ok = False
+
+        # 2) まとめられない書き込み (別々のキー)
+        elapsed = write_rows(path, args.rows, args.flush_interval)
+        rate = args.rows / elapsed
+        print(f"書き込み: 別々のキー {args.rows} 行 / {elapsed:.2f} 秒 = {rate:,.0f} 行/秒")
+        if rate < args.min_rate:
+            print(f"NG: 書き込み行数/秒が {args.min_rate:,.0f} 未満です")
+            ok = False
+
+        # 3) 復元 (最後に保存したパズルを 1 回の索引検索で読む)
+        store = ProgressStore(path)
+        load_times = []
+        mismatched = 0
+        for player, (board_bytes, history_bytes) in final.items():
+            start = time.perf_counter()
+            progress = store.load(player)
+            load_times.append(time.perf_counter() - start)
+            if progress is None or progress.board.to_bytes() != board_bytes \
+                    or progress.history.to_bytes() != history_bytes:
+                mismatched += 1
+        print(f"復元: {len(load_times)} プレイヤー / p50 {percentile(load_times, 0.5) * 1000:.3f} ms / "
+              f"p99 {percentile(load_times, 0.99) * 1000:.3f} ms / 不一致 {mismatched}")
+        store.close()
+        if mismatched:
+            print("NG: 復元した盤面・履歴が最後に保存したものと一致しません")
+            ok = False
+
+    print("OK" if ok else "NG")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#############################################
+# Matplotlib 盤面描画のメモリ回帰チェック
+#
+#   python benchmarks/render_memory.py [--renders 300] [--tolerance-mb 8]
+#
+# キャッシュを使わずにランダムな盤面を繰り返し描画し、
+# ウォームアップ後から最後までの RSS の増加が許容値以内かを確かめる。
+# 超えた場合は終了コード 1。
+#############################################
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hanagram.geometry import cells  # noqa: E402
+from hanagram.mpl_board import render_board_png  # noqa: E402
+
+
+def current_rss_mb():
+    # Linux: /proc/self/statm の 2 列目が常駐ページ数
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def random_board(rng):
+    board = [[None]*9 for _ in range(6)]
+    givens = [[None]*9 for _ in range(6)]
+    for (r, c) in cells:
+        if rng.random() < 0.7:
+            board[r][c] = rng.randrange(10)
+            if rng.random() < 0.4:
+                givens[r][c] = board[r][c]
+    return board, rng.choice(cells), givens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='盤面描画を繰り返して RSS が増え続けないか調べる')
+    parser.add_argument('--renders', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=30)
+    parser.add_argument('--tolerance-mb', type=float, default=8.0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    for _ in range(args.warmup):
+        render_board_png(*random_board(rng), use_cache=False)
+    start = current_rss_mb()
+    for _ in range(args.renders):
+        render_board_png(*random_board(rng), use_cache=False)
+    end = current_rss_mb()
+
+    growth = end - start
+    print(f"RSS: {start:.1f} MB → {end:.1f} MB (+{growth:.1f} MB / {args.renders} 回描画)")
+    if growth > args.tolerance_mb:
+        print(f"NG: 許容値 {args.tolerance_mb} MB を超えて増加しました")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,308 @@
+#############################################
+# ホットパスのベンチマーク (読み込み・検証・描画・求解)
+#
+#   python benchmarks/suite.py -o results.json
+#   python benchmarks/suite.py -o new.json --compare results.json --threshold 25
+#   python benchmarks/suite.py -k solve          # 名前に solve を含むものだけ
+#
+# 各ベンチマークは 1 回の計測が --min-time 秒以上になるよう反復回数を決め、
+# --repeat 回計測した 1 呼び出しあたりの最小値・中央値を JSON に保存する。
+# --compare を付けると基準の JSON と最小値を比べ、--threshold % 以上
+# 遅くなったものがあれば終了コード 1。
+#
+# 入力は puzzles/HAMAGRAM_A3_07.csv と、シード固定で生成した盤面。
+#############################################
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from hanagram.board import Board  # noqa: E402
+from hanagram.geometry import NUM_CELLS, cells, generate_combinations  # noqa: E402
+from hanagram.generator import generate_puzzle  # noqa: E402
+from hanagram.loader import load_puzzle_from_csv, parse_puzzle_csv  # noqa: E402
+from hanagram.solver import cells_to_grid, solve, solve_cells  # noqa: E402
+from hanagram.state import BoardState  # noqa: E402
+from hanagram.validation import check_all_lines_completed, check_duplicates  # noqa: E402
+from hanagram.uniqueness import count_solutions  # noqa: E402
+
+SAMPLE_CSV = os.path.join(ROOT, 'puzzles', 'HAMAGRAM_A3_07.csv')
+
+
+#############################################
+# 入力データ (シード固定で毎回同じものを作る)
+#############################################
+class Fixtures:
+    def __init__(self, seed=0, generated=20):
+        rng = random.Random(seed)
+        with open(SAMPLE_CSV, encoding='utf-8-sig') as f:
+            self.sample_text = f.read()
+        self.sample = load_puzzle_from_csv(SAMPLE_CSV)
+        self.sample_board = Board.from_grid(self.sample).freeze()
+        self.solution = solve(self.sample)
+
+        self.generated = []
+        for n in range(generated):
+            puzzle, _ = generate_puzzle(seed + n)
+            self.generated.append(cells_to_grid(puzzle))
+
+        # 途中まで埋まった盤面 (重複を含むものもある)
+        self.partial = []
+        for _ in range(200):
+            board = [[None]*9 for _ in range(6)]
+            density = rng.random()
+            for (r, c) in cells:
+                if rng.random() < density:
+                    board[r][c] = rng.randrange(10)
+            self.partial.append(board)
+        self.entries = [(rng.randrange(NUM_CELLS), rng.choice([None] + list(range(10))))
+                        for _ in range(1000)]
+
+
+#############################################
+# ベンチマーク本体: 名前 → (fixtures を受け取って「1 回分の処理」を返す関数)
+#############################################
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark('loader.load_puzzle_from_csv')
+def _(fx):
+    return lambda: load_puzzle_from_csv(SAMPLE_CSV)
+
+
+@benchmark('loader.parse_puzzle_csv')
+def _(fx):
+    return lambda: parse_puzzle_csv(fx.sample_text)
+
+
+@benchmark('validation.combinations_check_duplicates_completed')
+def _(fx):
+    def run():
+        combos = generate_combinations()
+        check_duplicates(fx.solution, combos)
+        check_all_lines_completed(fx.solution, combos)
+    return run
+
+
+@benchmark('validation.check_duplicates_partial')
+def _(fx):
+    combos = generate_combinations()
+    boards = fx.partial
+
+    def run():
+        for board in boards:
+            check_duplicates(board, combos)
+    return run
+
+
+@benchmark('state.BoardState_from_grid')
+def _(fx):
+    return lambda: BoardState.from_grid(fx.solution)
+
+
+@benchmark('state.BoardState_set_1000')
+def _(fx):
+    entries = fx.entries
+
+    def run():
+        state = BoardState()
+        for idx, value in entries:
+            state.set(idx, value)
+        state.check_duplicates()
+    return run
+
+
+@benchmark('board.Board_clone_set')
+def _(fx):
+    def run():
+        board = fx.sample_board.clone()
+        board.set(0, 1)
+    return run
+
+
+@benchmark('bulk.validate_boards_100k')
+def _(fx):
+    from hanagram.bulk import grids_to_array, validate_boards
+    import numpy as np
+    boards = np.resize(grids_to_array(fx.partial + fx.generated), (100_000, NUM_CELLS))
+    return lambda: validate_boards(boards)
+
+
+@benchmark('render.mpl_board_png')
+def _(fx):
+    from hanagram.mpl_board import render_board_png
+    return lambda: render_board_png(fx.sample, (1, 1), fx.sample, use_cache=False)
+
+
+@benchmark('render.plotly_figure')
+def _(fx):
+    from hanagram.plotly_board import build_board_figure
+    return lambda: build_board_figure(fx.sample, (1, 1), fx.sample, use_cache=False)
+
+
+@benchmark('render.plotly_figure_json')
+def _(fx):
+    from hanagram.plotly_board import build_board_figure
+    return lambda: build_board_figure(fx.sample, (1, 1), fx.sample, use_cache=False).to_json()
+
+
+@benchmark('solver.solve_sample')
+def _(fx):
+    return lambda: solve(fx.sample)
+
+
+@benchmark('solver.solve_generated')
+def _(fx):
+    puzzles = fx.generated
+
+    def run():
+        for board in puzzles:
+            solve(board)
+    return run
+
+
+@benchmark('solver.solve_empty_board')
+def _(fx):
+    return lambda: solve_cells([None] * NUM_CELLS)
+
+
+@benchmark('grade.grade_generated')
+def _(fx):
+    from hanagram.grade import grade
+    puzzles = fx.generated
+
+    def run():
+        for board in puzzles:
+            grade(board)
+    return run
+
+
+@benchmark('verify.count_solutions_generated')
+def _(fx):
+    puzzles = fx.generated
+
+    def run():
+        for board in puzzles:
+            count_solutions(board)
+    return run
+
+
+#############################################
+# 計測
+#############################################
+def measure(func, repeat, min_time):
+    # 1 回の計測が min_time 秒以上になる反復回数を求める (timeit.autorange と同じ考え方)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed * 10 >= min_time else 10
+    times = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        times.append((time.perf_counter() - start) / loops)
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """基準より threshold % 以上遅くなったベンチマーク名のリスト"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"  {name}: 基準なし")
+            continue
+        change = (result['min'] / base['min'] - 1) * 100
+        mark = ''
+        if change > threshold:
+            mark = '  <-- NG'
+            regressions.append(name)
+        print(f"  {name}: {base['min'] * 1000:.3f} ms → {result['min'] * 1000:.3f} ms "
+              f"({change:+.1f}%){mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ホットパスのベンチマークを実行する')
+    parser.add_argument('-o', '--output', help='結果を保存する JSON ファイル')
+    parser.add_argument('--compare', help='比較する基準の JSON ファイル')
+    parser.add_argument('--threshold', type=float, default=25.0,
+                        help='これ以上 (%%) 遅くなったら失敗にする')
+    parser.add_argument('-k', '--filter', default='', help='名前にこの文字列を含むものだけ実行')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='1 回の計測の最短時間 (秒)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    fixtures = Fixtures(args.seed)
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        result = measure(setup(fixtures), args.repeat, args.min_time)
+        results[name] = result
+        print(f"{name}: {result['min'] * 1000:.3f} ms (中央値 {result['median'] * 1000:.3f} ms, "
+              f"{result['loops']} 回 × {result['repeat']})")
+
+    if args.output:
+        data = {
+            'meta': {
+                'commit': git_commit(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+            },
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        print(f"基準 {args.compare} との比較 (許容 +{args.threshold:.0f}%):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"NG: {len(regressions)} 件が遅くなりました")
+            return 1
+        print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
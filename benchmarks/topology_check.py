@@ -0,0 +1,106 @@
+#############################################
+# 盤面トポロジー (hanagram.topology) の照合と規模の確認
+#
+#   python benchmarks/topology_check.py [--max-size 8]
+#
+# 1. Topology(3) が従来の手書きの盤面・ライン (下の表) と一致するか
+# 2. 大きさ 2 ～ --max-size について、表の作成時間・セル数あたりの時間、
+#    全ラインが重複なく完成した盤面をソルバーで作れるか、12 通りの対称操作で
+#    ラインがラインに移るかを確かめる
+# 一致しないものがあれば終了コード 1。
+#############################################
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hanagram.solver import cells_to_grid, solve_cells  # noqa: E402
+from hanagram.topology import Topology  # noqa: E402
+from hanagram.validation import check_all_lines_completed, check_duplicates  # noqa: E402
+
+# 以前 geometry.py に手で書いていた表
+CLASSIC_STRUCTURE = [
+    ['N', 'N', 'N', 'U', 'D', 'U', 'N', 'N', 'N'],
+    ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
+    ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
+    ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
+    ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
+    ['N', 'N', 'N', 'D', 'U', 'D', 'N', 'N', 'N'],
+]
+CLASSIC_LINES = {
+    "A": [(0,4),(0,3),(1,3),(1,2),(2,2),(2,1),(3,1),(3,0),(4,0)],
+    "B": [(0,5),(1,5),(1,4),(2,4),(2,3),(3,3),(3,2),(4,2),(4,1)],
+    "C": [(1,7),(1,6),(2,6),(2,5),(3,5),(3,4),(4,4),(4,3),(5,3)],
+    "D": [(1,8),(2,8),(2,7),(3,7),(3,6),(4,6),(4,5),(5,5),(5,4)],
+    "E": [(4,8),(3,8),(3,7),(2,7),(2,6),(1,6),(1,5),(0,5),(0,4)],
+    "F": [(4,7),(4,6),(3,6),(3,5),(2,5),(2,4),(1,4),(1,3),(0,3)],
+    "G": [(5,5),(4,5),(4,4),(3,4),(3,3),(2,3),(2,2),(1,2),(1,1)],
+    "H": [(5,4),(5,3),(4,3),(4,2),(3,2),(3,1),(2,1),(2,0),(1,0)],
+    "I": [(4,0),(4,1),(4,2),(4,3),(4,4),(4,5),(4,6),(4,7),(4,8)],
+    "J": [(3,0),(3,1),(3,2),(3,3),(3,4),(3,5),(3,6),(3,7),(3,8)],
+    "K": [(2,0),(2,1),(2,2),(2,3),(2,4),(2,5),(2,6),(2,7),(2,8)],
+    "L": [(1,0),(1,1),(1,2),(1,3),(1,4),(1,5),(1,6),(1,7),(1,8)]
+}
+CLASSIC_DIRECTIONS = {
+    '斜め_右上から左下': ['A', 'B', 'C', 'D'],
+    '斜め_右下から左上': ['E', 'F', 'G', 'H'],
+    '横方向_左から右': ['I', 'J', 'K', 'L'],
+}
+
+
+def check_classic():
+    topology = Topology(3)
+    ok = True
+    for name, got, expected in (('board_structure', topology.board_structure, CLASSIC_STRUCTURE),
+                                ('lines_map', topology.lines_map, CLASSIC_LINES),
+                                ('line_directions', topology.line_directions, CLASSIC_DIRECTIONS)):
+        if got != expected:
+            print(f"NG: Topology(3).{name} が従来の表と一致しません")
+            ok = False
+    if ok:
+        print("Topology(3): 従来の盤面・ライン A～L と一致")
+    return ok
+
+
+def check_size(size):
+    start = time.perf_counter()
+    topology = Topology(size)
+    build = time.perf_counter() - start
+
+    # 対称操作でラインはラインに移る
+    lines = {frozenset(line) for line in topology.line_cells}
+    symmetric = all(frozenset(perm[idx] for idx in line) in lines
+                    for perm in topology.symmetries.values() for line in topology.line_cells)
+
+    start = time.perf_counter()
+    solution = solve_cells([None] * topology.num_cells, topology=topology)
+    solve_time = time.perf_counter() - start
+    solved = False
+    if solution is not None:
+        grid = cells_to_grid(solution, topology)
+        combos = topology.generate_combinations()
+        solved = not check_duplicates(grid, combos)[0] and check_all_lines_completed(grid, combos)
+
+    print(f"size={size}: {topology.num_cells} セル / {topology.num_lines} ライン / "
+          f"数字 {topology.num_digits} 種類 / 作成 {build * 1000:.2f} ms "
+          f"({build / topology.num_cells * 1e6:.1f} µs/セル) / 求解 {solve_time * 1000:.1f} ms"
+          f"{'' if symmetric else '  <-- NG: 対称性'}{'' if solved else '  <-- NG: 求解'}")
+    return symmetric and solved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='盤面トポロジーの照合と規模の確認')
+    parser.add_argument('--max-size', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    ok = check_classic()
+    for size in range(2, args.max_size + 1):
+        ok = check_size(size) and ok
+    print("OK" if ok else "NG")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""Hanagram のゲームロジック（盤面トポロジー・検証・ソルバー）をまとめたパッケージ
+
+streamlit / matplotlib / plotly には依存しないので、CLI やワーカープロセスからも
+軽く import できる。描画が必要なときだけ hanagram.mpl_board / hanagram.plotly_board を
+import すること。
+"""
+from hanagram.board import Board
+from hanagram.geometry import board_structure, generate_combinations, lines_map
+from hanagram.loader import PuzzleFormatError, load_puzzle_from_csv, save_puzzle_to_csv
+from hanagram.solver import solve
+from hanagram.state import BoardState
+from hanagram.topology import Topology, get_topology
+from hanagram.validation import check_all_lines_completed, check_duplicates
+from hanagram.uniqueness import count_solutions, is_unique
@@ -0,0 +1,196 @@
+#############################################
+# パズルの一括検証 (重複チェック → 求解 → 一意性) をプロセスプールで並列実行
+#
+#   python -m hanagram.batch puzzles/ -o results.jsonl
+#   python -m hanagram.batch "puzzles/*.csv" -o results.csv --workers 8
+#############################################
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from hanagram.loader import load_puzzle_from_csv
+from hanagram.pack import PACK_EXTENSION, PuzzlePack
+from hanagram.solver import grid_to_cells, solve_cells
+from hanagram.state import BoardState
+from hanagram.uniqueness import count_solutions_cells
+
+FIELDS = [
+    'file', 'givens', 'duplicates', 'dup_info', 'solved', 'solutions', 'unique',
+    'solution', 'load_ms', 'solve_ms', 'verify_ms', 'error',
+]
+
+
+def collect_files(paths):
+    """フォルダ / glob / ファイル名のリストを CSV ファイルのリストに展開する"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                files.extend(sorted(e.path for e in entries
+                                    if e.is_file() and e.name.endswith('.csv')))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    return files
+
+
+def iter_sources(paths, solutions=False):
+    """フォルダ / glob / CSV / パックを (出典, 42 セルの値リスト or None) に展開する。
+    パックの出典は "パス#000001"、CSV は値を読まずに None を返す (ワーカー側で読む)。
+    solutions=True なら (出典, 値, 解答の値リスト or None) を返す
+    (解答はパックの解答セクションにあるときだけ)"""
+    csv_paths = []
+    for path in paths:
+        if path.endswith(PACK_EXTENSION):
+            with PuzzlePack(path) as pack:
+                width = max(6, len(str(len(pack))))
+                for n in range(len(pack)):
+                    source = f"{path}#{n + 1:0{width}d}"
+                    if solutions:
+                        yield source, pack.cells(n), pack.solution_cells(n)
+                    else:
+                        yield source, pack.cells(n)
+        else:
+            csv_paths.append(path)
+    for filename in collect_files(csv_paths):
+        yield (filename, None, None) if solutions else (filename, None)
+
+
+def check_puzzle(filename, limit=2):
+    """1 パズル分の検証結果 (FIELDS の辞書) を返す。プロセスプールのワーカーで実行される"""
+    result = dict.fromkeys(FIELDS)
+    result['file'] = filename
+    try:
+        t0 = time.perf_counter()
+        # 重複は dup_info として報告するので読み込み時には弾かない
+        board_values = load_puzzle_from_csv(filename, check_duplicates=False)
+        t1 = time.perf_counter()
+        result['load_ms'] = round((t1 - t0) * 1000, 3)
+
+        state = BoardState.from_grid(board_values)
+        dup_found, dup_info = state.check_duplicates()
+        result['givens'] = sum(v is not None for v in state.values)
+        result['duplicates'] = dup_found
+        result['dup_info'] = dup_info
+        if dup_found:
+            result['solved'] = False
+            result['solutions'] = 0
+            result['unique'] = False
+            return result
+
+        values = grid_to_cells(board_values)
+        t2 = time.perf_counter()
+        solution = solve_cells(values)
+        t3 = time.perf_counter()
+        count = count_solutions_cells(values, limit=limit) if solution is not None else 0
+        t4 = time.perf_counter()
+
+        result['solved'] = solution is not None
+        result['solution'] = ''.join(map(str, solution)) if solution is not None else None
+        result['solutions'] = count
+        result['unique'] = count == 1
+        result['solve_ms'] = round((t3 - t2) * 1000, 3)
+        result['verify_ms'] = round((t4 - t3) * 1000, 3)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _check_puzzle_job(args):
+    return check_puzzle(*args)
+
+
+#############################################
+# 出力 (JSONL / CSV を 1 件ずつ書き出す)
+#############################################
+class ResultWriter:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(stream, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, result):
+        if self.fmt == 'csv':
+            row = dict(result)
+            row['dup_info'] = ' / '.join(row['dup_info'] or [])
+            self.writer.writerow(row)
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+
+def _progress(done, total, start, failed):
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    sys.stderr.write(f"\r{done}/{total}  {rate:.0f} 件/秒  要確認 {failed} 件")
+    sys.stderr.flush()
+
+
+def run(files, out, fmt='jsonl', workers=None, limit=2, chunksize=None, progress=True):
+    """files を並列に検証して結果を out に書き出し、集計 (辞書) を返す"""
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, min(256, len(files) // (workers * 8)))
+    writer = ResultWriter(out, fmt)
+    summary = {'total': len(files), 'unique': 0, 'multiple': 0, 'unsolvable': 0,
+               'duplicates': 0, 'errors': 0}
+    start = time.perf_counter()
+    jobs = ((f, limit) for f in files)
+    with Pool(workers) as pool:
+        for done, result in enumerate(pool.imap_unordered(_check_puzzle_job, jobs, chunksize), 1):
+            writer.write(result)
+            if result['error']:
+                summary['errors'] += 1
+            elif result['duplicates']:
+                summary['duplicates'] += 1
+            elif not result['solved']:
+                summary['unsolvable'] += 1
+            elif result['unique']:
+                summary['unique'] += 1
+            else:
+                summary['multiple'] += 1
+            if progress and (done % 100 == 0 or done == len(files)):
+                _progress(done, len(files), start, done - summary['unique'])
+    if progress and files:
+        sys.stderr.write('\n')
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hanagram パズル CSV を一括で検証・求解する')
+    parser.add_argument('paths', nargs='+', help='パズルのフォルダ / glob / CSV ファイル')
+    parser.add_argument('-o', '--output', help='結果の出力先 (.jsonl / .csv、省略時は標準出力に JSONL)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'],
+                        help='出力形式 (省略時は出力ファイルの拡張子から判断)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ワーカープロセス数 (既定: CPU コア数)')
+    parser.add_argument('--limit', type=int, default=2, help='解の個数を数える上限 (既定: 2)')
+    parser.add_argument('--quiet', action='store_true', help='進捗を表示しない')
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    fmt = args.format
+    if fmt is None:
+        fmt = 'csv' if args.output and args.output.endswith('.csv') else 'jsonl'
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as out:
+            summary = run(files, out, fmt, args.workers, args.limit, progress=not args.quiet)
+    else:
+        summary = run(files, sys.stdout, fmt, args.workers, args.limit, progress=not args.quiet)
+
+    sys.stderr.write(json.dumps(summary, ensure_ascii=False) + '\n')
+    return 0 if summary['unique'] == summary['total'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
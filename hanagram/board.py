@@ -0,0 +1,147 @@
+#############################################
+# コンパクトな盤面 (42 セル分の bytes + 初期値のビットマスク)
+#
+# - セルの値は geometry.cells の順に 1 バイトずつ (0～9、空欄 = EMPTY)
+# - 初期値セルはセル番号をビット位置とする整数 givens で持つ
+# - clone() はバイト列を共有するだけ (O(1))。書き込むときに初めて
+#   自分用の bytearray にコピーする (copy-on-write)
+# - freeze() した盤面は書き換えられないので、読み込んだパズルを
+#   全セッションで共有できる
+# - board[r][c] で 6×9 の盤面 (空欄・'N' = None) と同じように読めるので、
+#   描画・検証・ソルバーにそのまま渡せる
+#############################################
+from hanagram.geometry import NUM_CELLS, NUM_COLS, NUM_ROWS, cell_index, cells
+
+EMPTY = 0xFF
+
+# (行, 列) → セル番号 ('N' の位置は -1)
+_ROW_INDEX = [[cell_index.get((r, c), -1) for c in range(NUM_COLS)] for r in range(NUM_ROWS)]
+_EMPTY_DATA = bytes([EMPTY] * NUM_CELLS)
+
+
+class Board:
+    __slots__ = ('_data', '_rows', '_frozen', 'givens')
+
+    def __init__(self, data=_EMPTY_DATA, givens=0):
+        if len(data) != NUM_CELLS:
+            raise ValueError(f"セル数が {NUM_CELLS} ではありません: {len(data)}")
+        self._data = data
+        self._rows = None      # 6×9 で読むときの行タプルのキャッシュ
+        self._frozen = False
+        self.givens = givens
+
+    @classmethod
+    def from_cells(cls, values, givens=None):
+        """42 セルの値リスト (None=空) から作る。givens=None なら値のあるセルを初期値とする"""
+        data = bytes(EMPTY if val is None else val for val in values)
+        if givens is None:
+            givens = 0
+            for idx, b in enumerate(data):
+                if b != EMPTY:
+                    givens |= 1 << idx
+        return cls(data, givens)
+
+    @classmethod
+    def from_grid(cls, board_values, givens=None):
+        """6×9 の盤面から作る。givens=None なら値のあるセルを初期値とする"""
+        return cls.from_cells([board_values[r][c] for (r, c) in cells], givens)
+
+    def freeze(self):
+        """以後の書き換えを禁止する (共有用)。自身を返す"""
+        if type(self._data) is bytearray:
+            self._data = bytes(self._data)
+        self._frozen = True
+        return self
+
+    def clone(self):
+        """同じ内容の書き換え可能な盤面。バイト列は最初の書き込みまで共有する"""
+        if type(self._data) is bytearray:
+            # 以後は自分も書き込み時にコピーする
+            self._data = bytes(self._data)
+        other = Board(self._data, self.givens)
+        other._rows = self._rows
+        return other
+
+    def initial(self):
+        """初期値だけの盤面 (凍結済み)"""
+        data = bytes(b if self.givens >> idx & 1 else EMPTY for idx, b in enumerate(self._data))
+        return Board(data, self.givens).freeze()
+
+    #############################################
+    # 読み出し
+    #############################################
+    def get(self, idx):
+        b = self._data[idx]
+        return None if b == EMPTY else b
+
+    def get_cell(self, r, c):
+        return self.get(cell_index[(r, c)])
+
+    def values(self):
+        """42 セルの値リスト (None=空)"""
+        return [None if b == EMPTY else b for b in self._data]
+
+    def __getitem__(self, r):
+        """board[r][c] で 6×9 の盤面と同じように読む (行はタプル)"""
+        rows = self._rows
+        if rows is None:
+            values = self.values()
+            rows = self._rows = tuple(
+                tuple(None if idx < 0 else values[idx] for idx in row_index)
+                for row_index in _ROW_INDEX)
+        return rows[r]
+
+    def __len__(self):
+        return NUM_ROWS
+
+    def __iter__(self):
+        for r in range(NUM_ROWS):
+            yield self[r]
+
+    def to_grid(self):
+        return [list(row) for row in self]
+
+    def to_bytes(self):
+        return bytes(self._data)
+
+    def is_given(self, idx):
+        return bool(self.givens >> idx & 1)
+
+    def is_given_cell(self, r, c):
+        return self.is_given(cell_index[(r, c)])
+
+    @property
+    def num_givens(self):
+        return bin(self.givens).count('1')
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self._data == other._data and self.givens == other.givens
+
+    def __hash__(self):
+        return hash((bytes(self._data), self.givens))
+
+    def __repr__(self):
+        text = ''.join('.' if b == EMPTY else str(b) for b in self._data)
+        return f"Board({text!r}, givens={self.num_givens})"
+
+    #############################################
+    # 書き込み (初期値セルかどうかの判定は呼び出し側で行う)
+    #############################################
+    def set(self, idx, value):
+        if self._frozen:
+            raise TypeError("凍結された盤面は書き換えられません (clone() してください)")
+        if value is not None and not (isinstance(value, int) and 0 <= value <= 9):
+            raise ValueError(f"セル {cells[idx]} の値が 0～9 ではありません: {value!r}")
+        data = self._data
+        if type(data) is not bytearray:
+            data = self._data = bytearray(data)
+        data[idx] = EMPTY if value is None else value
+        self._rows = None
+
+    def set_cell(self, r, c, value):
+        self.set(cell_index[(r, c)], value)
+
+
+EMPTY_BOARD = Board().freeze()
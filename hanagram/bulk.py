@@ -0,0 +1,157 @@
+#############################################
+# NumPy による多数の盤面の一括検証 (QA・生成結果のチェック用)
+#
+# 盤面は (N, 6, 9) または (N, 42) の整数配列 (空欄 = -1)。
+# ライン毎のセル番号を (12, 9) の配列 LINE_INDEX にしておき、
+# 数字 d をビット 1<<d に置き換えてライン上の 9 セル分を
+#   - 論理和 (現れた数字)
+#   - 和 (重複がなければ論理和と一致する)
+#   - 「それまでの論理和」との論理積 (2 回目以降に現れた数字)
+# と積み上げるだけで、重複ライン・重複数字・完成ラインが求まる。
+# 結果は validation.check_duplicates / check_all_lines_completed と一致する。
+#
+#   python -m hanagram.bulk library.hgp
+#############################################
+import argparse
+import sys
+
+import numpy as np
+
+from hanagram.geometry import NUM_CELLS, NUM_COLS, NUM_LINES, NUM_ROWS, cells, line_cells, line_labels
+from hanagram.pack import HEADER, RECORD_SIZE, PuzzlePack
+
+EMPTY = -1
+
+# ライン番号 → セル番号 (12, 9)
+LINE_INDEX = np.array(line_cells, dtype=np.intp)
+# セル番号 → 6×9 を平らにしたときの位置
+GRID_INDEX = np.array([r * NUM_COLS + c for (r, c) in cells], dtype=np.intp)
+
+# 値+1 → 数字のビット (空欄は 0)
+_BITS = np.array([0] + [1 << d for d in range(10)], dtype=np.uint16)
+# 10bit の数字集合 → 数字の個数
+_POPCOUNT = np.array([bin(m).count('1') for m in range(1 << 10)], dtype=np.uint8)
+
+# キャッシュに収まる程度に区切って処理する
+CHUNK_SIZE = 1 << 14
+
+
+#############################################
+# 変換
+#############################################
+def as_cells(boards):
+    """(N, 6, 9) / (N, 42) の配列 → (N, 42) の int8 配列 (空欄 = -1)"""
+    boards = np.asarray(boards)
+    if boards.ndim == 3 and boards.shape[1:] == (NUM_ROWS, NUM_COLS):
+        boards = boards.reshape(len(boards), NUM_ROWS * NUM_COLS)[:, GRID_INDEX]
+    elif boards.ndim != 2 or boards.shape[1] != NUM_CELLS:
+        raise ValueError(f"盤面の形が (N, {NUM_ROWS}, {NUM_COLS}) / (N, {NUM_CELLS}) ではありません: "
+                         f"{boards.shape}")
+    if boards.size and (boards.min() < EMPTY or boards.max() > 9):
+        raise ValueError("値は -1 (空欄) か 0～9 でなければなりません")
+    return boards.astype(np.int8, copy=False)
+
+
+def grids_to_array(grids):
+    """6×9 の盤面 (空欄 = None) のリスト → (N, 42) の int8 配列"""
+    out = np.full((len(grids), NUM_CELLS), EMPTY, dtype=np.int8)
+    for n, board_values in enumerate(grids):
+        for idx, (r, c) in enumerate(cells):
+            val = board_values[r][c]
+            if val is not None:
+                out[n, idx] = val
+    return out
+
+
+def pack_to_array(pack, solutions=False):
+    """パズルパック (PuzzlePack またはファイル名) → (N, 42) の int8 配列"""
+    if not isinstance(pack, PuzzlePack):
+        with PuzzlePack(pack) as opened:
+            return pack_to_array(opened, solutions)
+    if solutions and not pack.has_solutions:
+        raise ValueError(f"{pack.filename}: 解答セクションがありません")
+    offset = pack._solution_offset if solutions else HEADER.size
+    records = np.frombuffer(pack._mm, dtype=np.uint8, count=pack.count * RECORD_SIZE,
+                            offset=offset).reshape(pack.count, RECORD_SIZE)
+    nibbles = np.empty((pack.count, RECORD_SIZE * 2), dtype=np.int8)
+    nibbles[:, 0::2] = records >> 4
+    nibbles[:, 1::2] = records & 0xF
+    nibbles = nibbles[:, :NUM_CELLS]
+    nibbles[nibbles > 9] = EMPTY
+    return nibbles
+
+
+#############################################
+# 一括検証
+#############################################
+def _validate_chunk(cells_chunk, out, start):
+    # セル番号を先頭の軸にしておくと、ライン上の j 番目のセルの取り出しが
+    # 連続した行のコピーになる
+    bits = np.take(_BITS, (cells_chunk.T + 1).view(np.uint8))
+    seen = np.zeros((NUM_LINES, len(cells_chunk)), dtype=np.uint16)
+    total = np.zeros_like(seen)
+    dups = np.zeros_like(seen)
+    for j in range(LINE_INDEX.shape[1]):
+        b = bits[LINE_INDEX[:, j]]
+        dups |= seen & b
+        seen |= b
+        total += b
+    stop = start + len(cells_chunk)
+    out['duplicate_digits'][start:stop] = dups.T
+    out['duplicate_lines'][start:stop] = (total != seen).T
+    out['completed_lines'][start:stop] = (_POPCOUNT[seen] == 9).T
+
+
+def validate_boards(boards, chunk_size=CHUNK_SIZE):
+    """盤面の配列をまとめて検証して、次の配列の辞書を返す
+
+    duplicates        (N,)    重複のある盤面 (check_duplicates の dup_found)
+    duplicate_lines   (N, 12) 重複のあるライン (A～L の順)
+    duplicate_digits  (N, 12) ライン毎の重複している数字 (ビット d = 数字 d)
+    completed_lines   (N, 12) 9 セルとも埋まって重複のないライン
+    completed         (N,)    すべてのラインが完成 (check_all_lines_completed)
+    """
+    cells_array = as_cells(boards)
+    n = len(cells_array)
+    out = {
+        'duplicate_lines': np.empty((n, NUM_LINES), dtype=bool),
+        'duplicate_digits': np.empty((n, NUM_LINES), dtype=np.uint16),
+        'completed_lines': np.empty((n, NUM_LINES), dtype=bool),
+    }
+    for start in range(0, n, chunk_size):
+        _validate_chunk(cells_array[start:start + chunk_size], out, start)
+    return {
+        'duplicates': out['duplicate_lines'].any(axis=1),
+        'duplicate_lines': out['duplicate_lines'],
+        'duplicate_digits': out['duplicate_digits'],
+        'completed_lines': out['completed_lines'],
+        'completed': out['completed_lines'].all(axis=1),
+    }
+
+
+def digits_from_mask(mask):
+    """数字のビットマスク → 数字の集合"""
+    return {d for d in range(10) if int(mask) >> d & 1}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='パズルパックの全盤面を NumPy で一括検証する')
+    parser.add_argument('pack', help='パズルパック (.hgp)')
+    parser.add_argument('--solutions', action='store_true', help='解答セクションを検証する')
+    args = parser.parse_args(argv)
+
+    boards = pack_to_array(args.pack, args.solutions)
+    result = validate_boards(boards)
+    n_dup = int(result['duplicates'].sum())
+    n_done = int(result['completed'].sum())
+    print(f"{args.pack}: {len(boards)} 盤面 / 重複あり {n_dup} / 完成 {n_done}")
+    for n in np.flatnonzero(result['duplicates'])[:20]:
+        labels = [line_labels[l] for l in np.flatnonzero(result['duplicate_lines'][n])]
+        print(f"  {n + 1}: 重複ライン {', '.join(labels)}")
+    if args.solutions:
+        return 0 if n_done == len(boards) else 1
+    return 0 if n_dup == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
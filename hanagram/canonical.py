@@ -0,0 +1,71 @@
+#############################################
+# 対称性と数字の入れ替えを同一視した正規形・ハッシュ
+#
+# 盤面の 12 通りの対称操作 (geometry.symmetries) それぞれについて
+#   1. 事前計算した読み出し順 (置換の逆) でセルを並べ替え
+#   2. 数字を最初に現れた順に 0, 1, 2, ... と付け替える
+# を行い、辞書順で最小になったものを正規形とする。
+# 数字の入れ替え (10! 通り) は 2 の付け替えで吸収されるので、
+# 回転・鏡映・数字の入れ替えで移り合う盤面は同じ正規形・同じハッシュになる。
+# 並べ替えは operator.itemgetter、付け替えは bytes.translate で行う。
+#############################################
+import hashlib
+from operator import itemgetter
+
+from hanagram.geometry import cells, symmetries
+
+EMPTY = 0xFF
+HASH_SIZE = 16   # バイト (16 進で 32 文字)
+
+# 対称操作名 → 変換後の盤面の j 番目のセルが元の盤面のどのセルか
+_READ_ORDERS = {}
+for _name, _perm in symmetries.items():
+    _order = [0] * len(_perm)
+    for _src, _dst in enumerate(_perm):
+        _order[_dst] = _src
+    _READ_ORDERS[_name] = _order
+_GETTERS = [(name, itemgetter(*order)) for name, order in _READ_ORDERS.items()]
+_RANKS = bytes(range(10))
+_EMPTY_BYTE = bytes([EMPTY])
+
+
+def _encode(values):
+    return bytes(EMPTY if val is None else val for val in values)
+
+
+def _relabel(data):
+    """数字を最初に現れた順に 0, 1, 2, ... へ付け替える"""
+    digits = bytes(dict.fromkeys(data)).replace(_EMPTY_BYTE, b'')
+    return data.translate(bytes.maketrans(digits, _RANKS[:len(digits)]))
+
+
+def canonical_form(values):
+    """42 セルの値リスト (None=空) → (正規形の 42 バイト, そこへ移す対称操作名)"""
+    data = _encode(values)
+    best = None
+    best_name = None
+    for name, getter in _GETTERS:
+        candidate = _relabel(bytes(getter(data)))
+        if best is None or candidate < best:
+            best = candidate
+            best_name = name
+    return best, best_name
+
+
+def canonical_hash(values):
+    """正規形のハッシュ (16 進文字列)。対称・数字の入れ替えで移り合う盤面は同じ値になる"""
+    return hashlib.blake2b(canonical_form(values)[0], digest_size=HASH_SIZE).hexdigest()
+
+
+def canonical_hash_grid(board_values):
+    return canonical_hash([board_values[r][c] for (r, c) in cells])
+
+
+def puzzle_hash(values):
+    """盤面そのもの (対称性を同一視しない) のハッシュ。キャッシュのキー用"""
+    return hashlib.blake2b(_encode(values), digest_size=HASH_SIZE).hexdigest()
+
+
+def canonical_cells(values):
+    """正規形を 42 セルの値リストで返す"""
+    return [None if b == EMPTY else b for b in canonical_form(values)[0]]
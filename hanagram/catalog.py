@@ -0,0 +1,266 @@
+#############################################
+# パズルライブラリの索引 (フォルダの走査・読み込み結果をプロセス内で共有)
+#
+# - フォルダは 1 度だけ走査し、フォルダの mtime が変わったときだけ再走査する
+# - 読み込んだ盤面は (パス, mtime) をキーにキャッシュする (全セッション共有)
+#   load_board() は凍結した Board を返すので、セッション側は clone() して使う
+# - 初期値の数・難易度などのメタデータも同じキーでキャッシュする
+#   難易度 (grade.grade_cells) は盤面の puzzle_hash でもキャッシュするので、
+#   別のファイル・パックにある同じパズルは採点し直さない
+# - ファイル名の前方一致検索とページ分割は並べ替え済みの名前リストを二分探索して行う
+#############################################
+import bisect
+import os
+import threading
+
+from hanagram.board import Board
+from hanagram.canonical import puzzle_hash
+from hanagram.grade import grade_cells, grade_text
+from hanagram.loader import load_puzzle_from_csv
+from hanagram.pack import PACK_EXTENSION, PuzzlePack
+from hanagram.solver import grid_to_cells
+
+PAGE_SIZE = 50
+
+_grades = {}               # puzzle_hash → grade.Grade (全カタログで共有)
+_grades_lock = threading.Lock()
+
+
+def puzzle_grade(values):
+    """42 セルの値リストの難易度 (同じ盤面は 1 度だけ採点する)"""
+    key = puzzle_hash(values)
+    with _grades_lock:
+        result = _grades.get(key)
+    if result is None:
+        result = grade_cells(values)
+        with _grades_lock:
+            result = _grades.setdefault(key, result)
+    return result
+
+
+def puzzle_metadata(board_values):
+    values = grid_to_cells(board_values)
+    result = puzzle_grade(values)
+    return {
+        'givens': sum(v is not None for v in values),
+        'difficulty': result.score,
+        'grade': result,
+    }
+
+
+class PuzzleCatalog:
+    def __init__(self, folder, extension='.csv'):
+        self.folder = folder
+        self.extension = extension
+        self.names = []
+        self.packs = []        # フォルダ内のパズルパック (.hgp) のファイル名
+        self._dir_mtime = None
+        self._boards = {}      # パス → (mtime, 盤面)
+        self._frozen = {}      # パス → (mtime, 凍結した Board)
+        self._metadata = {}    # パス → (mtime, メタデータ)
+        self._lock = threading.Lock()
+        self.refresh()
+
+    #############################################
+    # 走査
+    #############################################
+    def refresh(self, force=False):
+        """フォルダの mtime が変わっていれば再走査する (変わっていなければ stat 1 回だけ)"""
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if not force and mtime == self._dir_mtime:
+            return False
+        names = []
+        packs = []
+        if mtime is not None:
+            with os.scandir(self.folder) as entries:
+                for e in entries:
+                    if e.name.endswith(self.extension) and e.is_file():
+                        names.append(e.name)
+                    elif e.name.endswith(PACK_EXTENSION) and e.is_file():
+                        packs.append(e.name)
+        names.sort()
+        packs.sort()
+        with self._lock:
+            self.names = names
+            self.packs = packs
+            self._dir_mtime = mtime
+            known = {os.path.join(self.folder, name) for name in names}
+            for cache in (self._boards, self._frozen, self._metadata):
+                for path in [p for p in cache if p not in known]:
+                    del cache[path]
+        return True
+
+    def __len__(self):
+        return len(self.names)
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    #############################################
+    # 検索・ページ分割
+    #############################################
+    def _prefix_range(self, prefix):
+        names = self.names
+        if not prefix:
+            return 0, len(names)
+        lo = bisect.bisect_left(names, prefix)
+        hi = bisect.bisect_left(names, prefix + '\uffff', lo)
+        return lo, hi
+
+    def count(self, prefix=''):
+        lo, hi = self._prefix_range(prefix)
+        return hi - lo
+
+    def search(self, prefix='', page=0, page_size=PAGE_SIZE):
+        """前方一致する名前の page ページ目 (0 始まり) と一致件数を返す"""
+        lo, hi = self._prefix_range(prefix)
+        start = lo + page * page_size
+        return self.names[start:min(start + page_size, hi)], hi - lo
+
+    #############################################
+    # 読み込み (mtime が変わらない限りキャッシュを返す)
+    #############################################
+    def _cached(self, cache, name, compute):
+        path = self.path(name)
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = cache.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        value = compute(path)
+        with self._lock:
+            cache[path] = (mtime, value)
+        return value
+
+    def load(self, name):
+        """盤面 (6×9) を返す。キャッシュを共有しているので呼び出し側で書き換えないこと"""
+        return self._cached(self._boards, name, load_puzzle_from_csv)
+
+    def load_board(self, name):
+        """凍結した Board を返す (全セッションで同じオブジェクトを共有する)"""
+        return self._cached(self._frozen, name,
+                            lambda path: Board.from_grid(self.load(name)).freeze())
+
+    def metadata(self, name):
+        return self._cached(self._metadata, name,
+                            lambda path: puzzle_metadata(self.load(name)))
+
+    def label(self, name):
+        """セレクトボックス用の表示名"""
+        try:
+            meta = self.metadata(name)
+        except (OSError, ValueError):
+            return f"{name} (読み込めません)"
+        return f"{name} (初期値 {meta['givens']} / {grade_text(meta['grade'])})"
+
+
+#############################################
+# パズルパック (.hgp) 版: 名前は "#000001" のような通し番号
+# 名前リストは持たず、前方一致の範囲を番号の範囲として計算する
+# 読み込み側はロックを取らないので、再読み込みでは新しいパックに差し替えるだけにして
+# 古いパックは閉じない (読んでいる途中のセッションがいなくなれば参照カウントで閉じる)
+#############################################
+class PackCatalog:
+    def __init__(self, filename):
+        self.filename = filename
+        self.pack = None
+        self._mtime = None
+        self._metadata = {}
+        self._frozen = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self, force=False):
+        mtime = os.stat(self.filename).st_mtime_ns
+        if not force and mtime == self._mtime:
+            return False
+        pack = PuzzlePack(self.filename)
+        with self._lock:
+            self.width = max(6, len(str(len(pack))))
+            self._metadata = {}
+            self._frozen = {}
+            self.pack = pack
+            self._mtime = mtime
+        return True
+
+    def __len__(self):
+        return len(self.pack)
+
+    def name(self, n):
+        return f"#{n + 1:0{self.width}d}"
+
+    def _number(self, name):
+        return int(name.lstrip('#')) - 1
+
+    def _prefix_range(self, prefix):
+        digits = prefix.lstrip('#')
+        if not digits:
+            return 0, len(self.pack)
+        if not digits.isdigit() or len(digits) > self.width:
+            return 0, 0
+        lo = max(int(digits.ljust(self.width, '0')), 1) - 1
+        hi = min(int(digits.ljust(self.width, '9')), len(self.pack))
+        return lo, max(lo, hi)
+
+    def count(self, prefix=''):
+        lo, hi = self._prefix_range(prefix)
+        return hi - lo
+
+    def search(self, prefix='', page=0, page_size=PAGE_SIZE):
+        lo, hi = self._prefix_range(prefix)
+        start = lo + page * page_size
+        return [self.name(n) for n in range(start, min(start + page_size, hi))], hi - lo
+
+    def load(self, name):
+        return self.pack[self._number(name)]
+
+    def load_board(self, name):
+        with self._lock:
+            pack, frozen = self.pack, self._frozen
+            board = frozen.get(name)
+        if board is None:
+            board = Board.from_cells(pack.cells(self._number(name))).freeze()
+            with self._lock:
+                board = frozen.setdefault(name, board)
+        return board
+
+    def solution(self, name):
+        return self.pack.solution(self._number(name))
+
+    def metadata(self, name):
+        with self._lock:
+            pack, metadata = self.pack, self._metadata
+            meta = metadata.get(name)
+        if meta is None:
+            meta = puzzle_metadata(pack[self._number(name)])
+            with self._lock:
+                metadata[name] = meta
+        return meta
+
+    label = PuzzleCatalog.label
+
+
+#############################################
+# フォルダ / パック毎にプロセス内で 1 つだけ作る
+#############################################
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(source):
+    """source がフォルダなら PuzzleCatalog、.hgp ファイルなら PackCatalog"""
+    source = os.path.abspath(source)
+    with _catalogs_lock:
+        catalog = _catalogs.get(source)
+        if catalog is None:
+            if source.endswith(PACK_EXTENSION):
+                catalog = PackCatalog(source)
+            else:
+                catalog = PuzzleCatalog(source)
+            _catalogs[source] = catalog
+            return catalog
+    catalog.refresh()
+    return catalog
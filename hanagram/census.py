@@ -0,0 +1,453 @@
+#############################################
+# 完成盤面 (全ラインが重複なく埋まった盤面) の数え上げと対称性の分類
+#
+#   python -m hanagram.census --size 2 -o census_size2.json
+#   python -m hanagram.census -o census.json --checkpoint census.ckpt --classes --workers 8
+#   python -m hanagram.census -o census.json --checkpoint census.ckpt --max-jobs 100   # 100 ジョブずつ
+#   python -m hanagram.census -o census.json --dump grids.hgp                          # 代表の盤面も書き出す
+#
+# 対称性の除き方:
+#   - 数字の付け替え: ライン 0 (A) を 0, 1, 2, ... の順に固定して数え、
+#     最後に「ライン 0 に入りうる数字の並び」の数 (10 数字・9 セルなら 10!) を掛ける
+#   - 盤面の対称操作: ライン 0 を自分自身に移す対称操作 σ (従来の盤面では 1 つ) で
+#     ジョブ (分割に使うセルの値の組) が対になるので、対の小さい方だけを数えて 2 倍する
+# 探索木は「ライン 0 の次に埋める --split-cells 個のセルの値」でジョブに分け、
+# プロセスプールで並列に数える。終わったジョブは --checkpoint の JSON に随時保存し、
+# 同じ引数でもう一度実行すると続きから数える。
+# --classes を付けると、各盤面について 12 通りの対称操作のうち数字の付け替えで
+# 自分自身に重なるものを調べ、対称性の型毎の個数と、対称操作・数字の付け替えで
+# 移り合うものを同一視したクラス数 (Burnside の補題) を出す。
+# --dump は従来の盤面 (42 セル) のみ。代表 (ライン 0 が 0～8、σ の対の小さい方) を
+# パズルパック (.hgp) 形式で書き出す。
+#############################################
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import time
+from multiprocessing import Pool
+
+from hanagram.topology import get_topology
+
+FIXED_LINE = 0
+IDENTITY = 'rot0'
+CHECKPOINT_INTERVAL = 30.0   # 秒
+
+
+#############################################
+# 探索の準備 (セルの順番・ライン 0 の固定・σ)
+#############################################
+class CensusPlan:
+    def __init__(self, size=3, split_cells=4):
+        topology = get_topology(size)
+        self.topology = topology
+        self.size = size
+        self.fixed_cells = topology.line_cells[FIXED_LINE]
+        self.fixed_values = list(range(len(self.fixed_cells)))
+        self.all_digits = (1 << topology.num_digits) - 1
+
+        # ライン 0 を自分自身に移す対称操作 (恒等以外) と、そのときの数字の付け替え
+        self.sigma = None
+        self.sigma_relabel = None
+        fixed_set = set(self.fixed_cells)
+        for name, perm in topology.symmetries.items():
+            if name != IDENTITY and {perm[idx] for idx in self.fixed_cells} == fixed_set:
+                self.sigma = name
+                position = {idx: i for i, idx in enumerate(self.fixed_cells)}
+                relabel = list(range(topology.num_digits))
+                for j, idx in enumerate(self.fixed_cells):
+                    relabel[j] = position[perm[idx]]
+                self.sigma_relabel = relabel
+                break
+
+        # σ の対の相手の盤面では、重なる対称操作 g が σgσ⁻¹ に読み替わる
+        self.sigma_conjugates = None
+        if self.sigma is not None:
+            s = topology.symmetries[self.sigma]
+            inverse = [0] * topology.num_cells
+            for idx, image in enumerate(s):
+                inverse[image] = idx
+            names = {tuple(perm): name for name, perm in topology.symmetries.items()}
+            self.sigma_conjugates = {
+                name: names[tuple(s[perm[inverse[idx]]] for idx in range(topology.num_cells))]
+                for name, perm in topology.symmetries.items()}
+
+        # 残りのセルを「既に埋まったセルと同じラインに多く乗っているもの」から順に並べる。
+        # σ があれば相手のセルをすぐ後ろに置き、分割に使うセルの集合が σ で閉じるようにする
+        perm = topology.symmetries[self.sigma] if self.sigma else None
+        placed = set(self.fixed_cells)
+        filled = [sum(idx in placed for idx in line) for line in topology.line_cells]
+        order = []
+
+        def place(idx):
+            order.append(idx)
+            placed.add(idx)
+            for l_idx in topology.cell_lines[idx]:
+                filled[l_idx] += 1
+
+        while len(placed) < topology.num_cells:
+            idx = max((i for i in range(topology.num_cells) if i not in placed),
+                      key=lambda i: (sum(filled[l] for l in topology.cell_lines[i]), -i))
+            place(idx)
+            if perm is not None and perm[idx] not in placed:
+                place(perm[idx])
+        self.order = order
+
+        # 分割に使うセルは split_cells 個以上で σ で閉じている最短の先頭部分
+        split = min(split_cells, len(order))
+        while perm is not None and split < len(order) \
+                and {perm[idx] for idx in order[:split]} != set(order[:split]):
+            split += 1
+        self.split = split
+        self.split_cells = order[:split]
+
+    def initial_masks(self):
+        masks = [0] * self.topology.num_lines
+        for idx, val in zip(self.fixed_cells, self.fixed_values):
+            for l_idx in self.topology.cell_lines[idx]:
+                masks[l_idx] |= 1 << val
+        return masks
+
+    def jobs(self):
+        """分割に使うセルの値の組を全て列挙する (ライン 0 と矛盾しないもの)"""
+        cell_lines = self.topology.cell_lines
+        masks = self.initial_masks()
+        values = []
+        split_cells = self.split_cells
+
+        def walk(depth):
+            if depth == len(split_cells):
+                yield tuple(values)
+                return
+            lines = cell_lines[split_cells[depth]]
+            used = 0
+            for l_idx in lines:
+                used |= masks[l_idx]
+            cand = self.all_digits & ~used
+            while cand:
+                bit = cand & -cand
+                cand ^= bit
+                for l_idx in lines:
+                    masks[l_idx] |= bit
+                values.append(bit.bit_length() - 1)
+                yield from walk(depth + 1)
+                values.pop()
+                for l_idx in lines:
+                    masks[l_idx] &= ~bit
+
+        yield from walk(0)
+
+    def mirror_job(self, job):
+        """σ で移したジョブ (σ がなければ同じもの)"""
+        if self.sigma is None:
+            return job
+        perm = self.topology.symmetries[self.sigma]
+        relabel = self.sigma_relabel
+        values = dict(zip(self.split_cells, job))
+        image = {perm[idx]: relabel[val] for idx, val in values.items()}
+        return tuple(image[idx] for idx in self.split_cells)
+
+    def mirror_type(self, key):
+        """対称性の型 (対称操作名のカンマ区切り) → σ で移した盤面の型"""
+        if self.sigma is None:
+            return key
+        names = {self.sigma_conjugates[name] for name in key.split(',')}
+        return ','.join(name for name in self.topology.symmetries if name in names)
+
+    def canonical_jobs(self):
+        """(ジョブ, 重み) の列。σ の対は小さい方だけ重み 2 で返す"""
+        for job in self.jobs():
+            mirror = self.mirror_job(job)
+            if mirror < job:
+                continue
+            yield job, 1 if mirror == job else 2
+
+    @property
+    def relabel_factor(self):
+        """ライン 0 に入りうる数字の並びの数"""
+        d = self.topology.num_digits
+        return math.perm(d, len(self.fixed_cells))
+
+    def config(self):
+        return {'size': self.size, 'split': self.split, 'fixed_line': FIXED_LINE,
+                'sigma': self.sigma}
+
+
+#############################################
+# 1 ジョブ分の数え上げ (ワーカープロセス)
+#############################################
+_plan = None
+
+
+def _init_worker(size, split_cells):
+    global _plan
+    _plan = CensusPlan(size, split_cells)
+
+
+def _stabilizer(values, topology, symmetry_perms):
+    """数字の付け替えで自分自身に重なる対称操作の名前"""
+    names = []
+    for name, perm in symmetry_perms:
+        mapping = {}
+        for idx, val in enumerate(values):
+            target = values[perm[idx]]
+            prev = mapping.setdefault(val, target)
+            if prev != target:
+                break
+        else:
+            if len(set(mapping.values())) == len(mapping):
+                names.append(name)
+    return names
+
+
+def count_job(plan, job, classes=False, dump=None):
+    """ジョブ 1 つの (完成盤面の数, 対称性の型 → 数, Σ|固定部分群|) を返す
+
+    対称性の型は数字の付け替えで自分自身に重なる対称操作名のカンマ区切り。
+    |固定部分群| は (重なる対称操作の数) × (使われていない数字の数)!  (classes のときだけ数える)
+    dump にファイルを渡すと盤面を pack のレコード (42 セル 21 バイト) で書き出す
+    """
+    topology = plan.topology
+    num_cells = topology.num_cells
+    cell_lines = topology.cell_lines
+    all_digits = plan.all_digits
+    values = [None] * num_cells
+    for idx, val in zip(plan.fixed_cells, plan.fixed_values):
+        values[idx] = val
+    masks = plan.initial_masks()
+    for idx, val in zip(plan.split_cells, job):
+        values[idx] = val
+        for l_idx in cell_lines[idx]:
+            if masks[l_idx] >> val & 1:
+                return 0, {}, 0
+            masks[l_idx] |= 1 << val
+
+    rest = plan.order[plan.split:]
+    rest_lines = [cell_lines[idx] for idx in rest]
+    last = len(rest) - 1
+    need_grids = classes or dump is not None
+    symmetry_perms = [(name, perm) for name, perm in topology.symmetries.items()]
+    num_digits = topology.num_digits
+    histogram = {}
+    stabilizer_total = [0]
+    if dump is not None:
+        from hanagram.pack import encode_cells
+
+    def visit():
+        if classes:
+            names = _stabilizer(values, topology, symmetry_perms)
+            key = ','.join(names)
+            histogram[key] = histogram.get(key, 0) + 1
+            stabilizer_total[0] += len(names) * math.factorial(num_digits - len(set(values)))
+        if dump is not None:
+            dump.write(encode_cells(values))
+
+    def walk(depth):
+        lines = rest_lines[depth]
+        used = 0
+        for l_idx in lines:
+            used |= masks[l_idx]
+        cand = all_digits & ~used
+        if depth == last and not need_grids:
+            return bin(cand).count('1')
+        total = 0
+        idx = rest[depth]
+        while cand:
+            bit = cand & -cand
+            cand ^= bit
+            values[idx] = bit.bit_length() - 1
+            if depth == last:
+                visit()
+                total += 1
+                continue
+            for l_idx in lines:
+                masks[l_idx] |= bit
+            total += walk(depth + 1)
+            for l_idx in lines:
+                masks[l_idx] &= ~bit
+        values[idx] = None
+        return total
+
+    count = walk(0) if rest else (visit() or 1)
+    return count, histogram, stabilizer_total[0]
+
+
+def _count_job(args):
+    job_id, job, weight, classes, dump_dir = args
+    start = time.perf_counter()
+    if dump_dir is None:
+        result = count_job(_plan, job, classes)
+    else:
+        path = os.path.join(dump_dir, f"{job_id}.bin")
+        with open(path + '.tmp', 'wb') as f:
+            result = count_job(_plan, job, classes, f)
+        os.replace(path + '.tmp', path)
+    return (job_id, weight) + result
+
+
+#############################################
+# チェックポイント (JSON) と結果
+#############################################
+def load_checkpoint(path, config):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('config') != config:
+        raise ValueError(f"{path}: 別の条件 ({data.get('config')}) のチェックポイントです")
+    return {int(job_id): tuple(entry) for job_id, entry in data['done'].items()}
+
+
+def save_checkpoint(path, config, done):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'config': config,
+                   'done': {str(job_id): list(entry) for job_id, entry in sorted(done.items())}},
+                  f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def summarize(plan, done, n_jobs, classes):
+    """done: ジョブ番号 → (重み, 数, 対称性の型 → 数, Σ|固定部分群|)"""
+    topology = plan.topology
+    representatives = sum(weight * count for weight, count, _, _ in done.values())
+    result = {
+        'size': plan.size,
+        'cells': topology.num_cells,
+        'lines': topology.num_lines,
+        'digits': topology.num_digits,
+        'jobs': n_jobs,
+        'jobs_done': len(done),
+        'complete': len(done) == n_jobs,
+        'split_cells': plan.split,
+        'sigma': plan.sigma,
+        'representatives': representatives,
+        'relabel_factor': plan.relabel_factor,
+        'grids': representatives * plan.relabel_factor,
+    }
+    if classes:
+        # 重み 2 のジョブの相手 (σ で移した盤面) は、重なる対称操作が σgσ⁻¹ に変わるので
+        # 型を読み替えて数える (|固定部分群| は共役でも同じなので Burnside の和はそのまま)
+        histogram = {}
+        for weight, _, hist, _ in done.values():
+            for key, n in hist.items():
+                histogram[key] = histogram.get(key, 0) + n
+                if weight == 2:
+                    mirror = plan.mirror_type(key)
+                    histogram[mirror] = histogram.get(mirror, 0) + n
+        # Burnside: クラス数 = Σ_x |固定部分群(x)| / |群|、群は 12 通りの対称操作 × 数字の並べ替え d!。
+        # 代表 1 つはライン 0 の数字の並べ方 relabel_factor = d!/(d-L)! 個の盤面に当たるので
+        # クラス数 = Σ_代表 |固定部分群| / (12 × (d-L)!)
+        stabilizers = sum(weight * total for weight, _, _, total in done.values())
+        group = len(topology.symmetries) * math.factorial(topology.num_digits - len(plan.fixed_cells))
+        classes_count, remainder = divmod(stabilizers, group)
+        result['symmetry_types'] = dict(sorted(histogram.items(), key=lambda kv: -kv[1]))
+        result['classes'] = classes_count if remainder == 0 else stabilizers / group
+    return result
+
+
+def merge_dump(dump_dir, n_jobs, filename):
+    """ジョブ毎の部分ファイルを 1 つのパックにまとめる"""
+    from hanagram.pack import HEADER, MAGIC, RECORD_SIZE, VERSION
+
+    parts = [os.path.join(dump_dir, f"{job_id}.bin") for job_id in range(n_jobs)]
+    parts = [p for p in parts if os.path.exists(p)]
+    count = sum(os.path.getsize(p) for p in parts) // RECORD_SIZE
+    with open(filename, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, VERSION, 0, get_topology(3).num_cells, count, 0))
+        for part in parts:
+            with open(part, 'rb') as f:
+                shutil.copyfileobj(f, out)
+    return count
+
+
+def _progress(done, total, start, counted):
+    elapsed = time.perf_counter() - start
+    rate = counted / elapsed if elapsed > 0 else 0.0
+    sys.stderr.write(f"\r{len(done)}/{total} ジョブ  {rate:.1f} ジョブ/秒  {elapsed:.0f} 秒")
+    sys.stderr.flush()
+
+
+def run(plan, output=None, checkpoint=None, classes=False, dump=None, workers=None,
+        max_jobs=None, progress=True):
+    config = dict(plan.config(), classes=classes, dump=bool(dump))
+    done = load_checkpoint(checkpoint, config)
+    jobs = list(plan.canonical_jobs())
+    pending = [(job_id, job, weight) for job_id, (job, weight) in enumerate(jobs)
+               if job_id not in done]
+    if max_jobs is not None:
+        pending = pending[:max_jobs]
+
+    dump_dir = None
+    if dump:
+        dump_dir = dump + '.parts'
+        os.makedirs(dump_dir, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    last_save = start
+    counted = 0
+    args = ((job_id, job, weight, classes, dump_dir) for job_id, job, weight in pending)
+    with Pool(workers, initializer=_init_worker, initargs=(plan.size, plan.split)) as pool:
+        for job_id, weight, count, histogram, stabilizers in pool.imap_unordered(_count_job, args):
+            done[job_id] = (weight, count, histogram, stabilizers)
+            counted += 1
+            now = time.perf_counter()
+            if checkpoint and now - last_save >= CHECKPOINT_INTERVAL:
+                save_checkpoint(checkpoint, config, done)
+                last_save = now
+            if progress:
+                _progress(done, len(jobs), start, counted)
+    if progress:
+        sys.stderr.write('\n')
+    if checkpoint:
+        save_checkpoint(checkpoint, config, done)
+
+    result = summarize(plan, done, len(jobs), classes)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    if dump and result['complete']:
+        result['dumped'] = merge_dump(dump_dir, len(jobs), dump)
+        shutil.rmtree(dump_dir)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='完成盤面を数え上げて対称性で分類する')
+    parser.add_argument('--size', type=int, default=3, help='盤面の大きさ (3 が従来の盤面)')
+    parser.add_argument('-o', '--output', help='結果を書き出す JSON ファイル')
+    parser.add_argument('--checkpoint', help='途中経過を保存・再開する JSON ファイル')
+    parser.add_argument('--split-cells', type=int, default=4,
+                        help='ジョブの分割に使うセルの数 (σ の相手も含めるので多くなることがある)')
+    parser.add_argument('--classes', action='store_true', help='対称性の型毎に数える (遅くなる)')
+    parser.add_argument('--dump', help='代表の盤面を書き出すパック (.hgp、従来の盤面のみ)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ワーカープロセス数 (既定: CPU コア数)')
+    parser.add_argument('--max-jobs', type=int, default=None,
+                        help='今回数えるジョブの上限 (--checkpoint と組み合わせて少しずつ進める)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='進捗を表示しない')
+    args = parser.parse_args(argv)
+
+    if args.dump and args.size != 3:
+        parser.error('--dump は従来の盤面 (--size 3) のときだけ使えます')
+    plan = CensusPlan(args.size, args.split_cells)
+    try:
+        result = run(plan, args.output, args.checkpoint, args.classes, args.dump,
+                     args.workers, args.max_jobs, not args.quiet)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    status = '完了' if result['complete'] else f"途中 ({result['jobs_done']}/{result['jobs']} ジョブ)"
+    print(f"size={plan.size}: 代表 {result['representatives']} 個 × {result['relabel_factor']} "
+          f"= 完成盤面 {result['grids']} 個 [{status}]")
+    if args.classes:
+        print(f"対称操作・数字の付け替えで同一視したクラス数: {result['classes']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
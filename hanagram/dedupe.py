@@ -0,0 +1,180 @@
+#############################################
+# 正規形ハッシュによる重複パズルの索引 (SQLite)
+#
+#   python -m hanagram.dedupe index puzzles/ --db library.sqlite    # 登録して重複を表示
+#   python -m hanagram.dedupe check new_puzzles/ --db library.sqlite  # 登録せずに照合だけ
+#   python -m hanagram.dedupe groups --db library.sqlite            # 重複しているグループの一覧
+#
+# puzzles テーブルは正規形ハッシュ (canonical.canonical_hash) を主キーにして
+# 最初に登録した出典を持つので、取り込み時の重複判定は主キー検索 1 回で済む。
+# sources テーブルは出典 (CSV のパス / "パック#番号") → ハッシュ。
+# ハッシュの計算 (CSV の読み込みを含む) はプロセスプールで並列に行う。
+#############################################
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from multiprocessing import Pool
+
+from hanagram.batch import iter_sources
+from hanagram.canonical import canonical_form, canonical_hash
+from hanagram.loader import load_puzzle_from_csv
+from hanagram.solver import grid_to_cells
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    hash TEXT PRIMARY KEY,
+    canonical BLOB NOT NULL,
+    givens INTEGER NOT NULL,
+    first_source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES puzzles(hash)
+);
+CREATE INDEX IF NOT EXISTS sources_hash ON sources(hash);
+"""
+
+
+def hash_entry(source, values):
+    """(出典, ハッシュ, 正規形, 初期値の数)"""
+    canonical, _ = canonical_form(values)
+    return source, canonical_hash(values), canonical, sum(v is not None for v in values)
+
+
+class PuzzleIndex:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    def find(self, puzzle_hash):
+        """同じ正規形で最初に登録された出典 (なければ None)"""
+        row = self.conn.execute("SELECT first_source FROM puzzles WHERE hash = ?",
+                                (puzzle_hash,)).fetchone()
+        return row[0] if row else None
+
+    def add_entries(self, entries):
+        """hash_entry の列をまとめて登録し、重複していたものを (出典, 先に登録された出典) で返す"""
+        duplicates = []
+        with self.conn:
+            for source, puzzle_hash, canonical, givens in entries:
+                first = self.find(puzzle_hash)
+                if first is None:
+                    self.conn.execute(
+                        "INSERT INTO puzzles (hash, canonical, givens, first_source) VALUES (?, ?, ?, ?)",
+                        (puzzle_hash, canonical, givens, source))
+                elif first != source:
+                    duplicates.append((source, first))
+                self.conn.execute("INSERT OR REPLACE INTO sources (source, hash) VALUES (?, ?)",
+                                  (source, puzzle_hash))
+        return duplicates
+
+    def check_entries(self, entries):
+        """add_entries と同じ重複を登録せずに返す (同じ入力の中での重複も、先に出た出典と組にする)"""
+        seen = {}                # ハッシュ → 入力の中で最初の出典 (索引にないもの)
+        duplicates = []
+        for source, puzzle_hash, _, _ in entries:
+            first = self.find(puzzle_hash)
+            if first is None:
+                first = seen.setdefault(puzzle_hash, source)
+            if first != source:
+                duplicates.append((source, first))
+        return duplicates
+
+    def add(self, source, values):
+        """1 問登録して、重複なら先に登録された出典を返す"""
+        duplicates = self.add_entries([hash_entry(source, values)])
+        return duplicates[0][1] if duplicates else None
+
+    def duplicate_groups(self):
+        """同じ正規形を持つ出典のグループ (2 件以上のもの)"""
+        rows = self.conn.execute(
+            "SELECT hash, source FROM sources WHERE hash IN "
+            "(SELECT hash FROM sources GROUP BY hash HAVING COUNT(*) > 1) ORDER BY hash, source")
+        groups = {}
+        for puzzle_hash, source in rows:
+            groups.setdefault(puzzle_hash, []).append(source)
+        return groups
+
+
+#############################################
+# 入力の展開とハッシュ計算 (プロセスプール)
+#############################################
+def _hash_job(job):
+    source, values = job
+    try:
+        if values is None:
+            values = grid_to_cells(load_puzzle_from_csv(source, check_duplicates=False))
+        return hash_entry(source, values), None
+    except (OSError, ValueError) as e:
+        return None, f"{source}: {e}"
+
+
+def hash_sources(paths, workers=None):
+    """(hash_entry のリスト, エラーのリスト)"""
+    jobs = list(iter_sources(paths))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(256, len(jobs) // (workers * 8)))
+    entries = []
+    errors = []
+    with Pool(workers) as pool:
+        for entry, error in pool.imap(_hash_job, jobs, chunksize):
+            if error:
+                errors.append(error)
+            else:
+                entries.append(entry)
+    return entries, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='対称性・数字の入れ替えを同一視して重複パズルを探す')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('index', '登録して重複を表示する'), ('check', '登録せずに照合だけする')):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('paths', nargs='+', help='パズルのフォルダ / glob / CSV ファイル / パック (.hgp)')
+        p.add_argument('--db', required=True, help='索引の SQLite ファイル')
+        p.add_argument('--workers', type=int, default=None,
+                       help='ワーカープロセス数 (既定: CPU コア数)')
+    p_groups = sub.add_parser('groups', help='重複しているグループを表示する')
+    p_groups.add_argument('--db', required=True, help='索引の SQLite ファイル')
+    args = parser.parse_args(argv)
+
+    with PuzzleIndex(args.db) as index:
+        if args.command == 'groups':
+            for puzzle_hash, sources in index.duplicate_groups().items():
+                print(f"{puzzle_hash}: {', '.join(sources)}")
+            return 0
+
+        start = time.perf_counter()
+        entries, errors = hash_sources(args.paths, args.workers)
+        if args.command == 'index':
+            duplicates = index.add_entries(entries)
+        else:
+            duplicates = index.check_entries(entries)
+        for source, first in duplicates:
+            print(f"{source}: {first} と同じパズルです")
+        for error in errors:
+            sys.stderr.write(error + '\n')
+        sys.stderr.write(f"{len(entries)} 問中 重複 {len(duplicates)} 問 / 索引 {len(index)} 問 "
+                         f"({time.perf_counter() - start:.1f} 秒)\n")
+    if args.command == 'check' and duplicates:
+        return 1
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#############################################
+# まとめて入力 (ライン 1 本 / 盤面全体を文字列で)
+#
+#   ライン:   "A", "31.5..7.9"            ライン A の番号 0～8 の順に 9 文字
+#   盤面全体: 42 文字 (geometry.cells の順)、または 6×9 = 54 文字 (行毎、左から)
+# 0～9 はその数字、'.' '-' '_' は空欄にする。空白・改行・',' '/' '|' は区切りとして無視する。
+# 文字数や文字が正しくなければ EntryError (何も変更しない)。
+# 初期値のセルを変えようとするもの、54 文字形式でセルが存在しない位置 ('N') に
+# 数字があるものはセル毎に却下し、残りの変更だけを 1 回でまとめて適用する。
+# 適用 (apply_entry) は Board・BoardState・MoveHistory を受け取るだけで streamlit には依存しない。
+#############################################
+from collections import namedtuple
+
+from hanagram.geometry import NUM_CELLS, NUM_COLS, NUM_ROWS, board_structure, cell_index, cells, lines_map
+
+BLANK_CHARS = '.-_'
+SEPARATORS = ' \t\r\n,/|'
+BOARD_TARGET = '盤面全体'
+
+# changes: [(セル番号, 変更前, 変更後)]、rejected: [((行, 列), 理由)]
+EntryPlan = namedtuple('EntryPlan', ['changes', 'rejected'])
+
+_SKIP = str.maketrans('', '', SEPARATORS)
+
+
+class EntryError(ValueError):
+    pass
+
+
+def parse_text(text):
+    """文字列 → 値のリスト (None=空欄)。区切り文字は取り除く"""
+    values = []
+    for pos, ch in enumerate(text.translate(_SKIP)):
+        if ch.isdigit() and ch.isascii():
+            values.append(int(ch))
+        elif ch in BLANK_CHARS:
+            values.append(None)
+        else:
+            raise EntryError(f"{pos + 1} 文字目 {ch!r} は数字でも空欄 ({BLANK_CHARS}) でもありません")
+    return values
+
+
+def line_assignments(label, text):
+    """ライン label の文字列 → [((行, 列), 値)]"""
+    line = lines_map.get(label.strip().upper())
+    if line is None:
+        raise EntryError(f"ライン {label!r} はありません ({', '.join(lines_map)} から選んでください)")
+    values = parse_text(text)
+    if len(values) != len(line):
+        raise EntryError(f"ライン {label} は {len(line)} 文字で入力してください ({len(values)} 文字)")
+    return list(zip(line, values))
+
+
+def board_assignments(text):
+    """盤面全体の文字列 (42 文字 / 54 文字) → [((行, 列), 値)]"""
+    values = parse_text(text)
+    if len(values) == NUM_CELLS:
+        return list(zip(cells, values))
+    if len(values) == NUM_ROWS * NUM_COLS:
+        return [((r, c), values[r * NUM_COLS + c]) for r in range(NUM_ROWS) for c in range(NUM_COLS)]
+    raise EntryError(f"盤面全体は {NUM_CELLS} 文字 (セル順) か {NUM_ROWS * NUM_COLS} 文字 "
+                     f"({NUM_ROWS}×{NUM_COLS}) で入力してください ({len(values)} 文字)")
+
+
+def parse_entry(target, text):
+    """target: ライン名 (A～L) か BOARD_TARGET"""
+    if target == BOARD_TARGET:
+        return board_assignments(text)
+    return line_assignments(target, text)
+
+
+def plan_entry(board, assignments):
+    """Board に対する変更と却下したセルを返す (board は変更しない)"""
+    changes = []
+    rejected = []
+    for (r, c), value in assignments:
+        if board_structure[r][c] == 'N':
+            if value is not None:
+                rejected.append(((r, c), f"セルが存在しない位置です (値 {value})"))
+            continue
+        idx = cell_index[(r, c)]
+        old = board.get(idx)
+        if old == value:
+            continue
+        if board.is_given(idx):
+            rejected.append(((r, c), f"初期値 {old} のセルなので変更できません"))
+            continue
+        changes.append((idx, old, value))
+    return EntryPlan(changes, rejected)
+
+
+def apply_entry(plan, board, board_state, history):
+    """plan.changes を Board・BoardState に適用し、履歴には 1 操作として記録する。
+    重複の有無は全部適用した後に 1 回だけ見る"""
+    for idx, _, new in plan.changes:
+        board.set(idx, new)
+        board_state.set(idx, new)
+    history.record_group(plan.changes, not board_state.has_duplicates)
+    return len(plan.changes)
+
+
+def format_rejected(rejected):
+    return '\n'.join(f"- {pos}: {reason}" for pos, reason in rejected)
+
+
+def board_to_text(board):
+    """Board → 42 文字 (空欄は '.')。board_assignments で読み戻せる"""
+    return ''.join('.' if val is None else str(val) for val in board.values())
+
+
+def line_to_text(board, label):
+    return ''.join('.' if board.get_cell(r, c) is None else str(board.get_cell(r, c))
+                   for (r, c) in lines_map[label])
@@ -0,0 +1,207 @@
+#############################################
+# 盤面画像の一括書き出し (streamlit なしで PNG / SVG / 複数ページ PDF)
+#
+#   python -m hanagram.export puzzles/ -o images/ --format svg --views puzzle,solution
+#   python -m hanagram.export puzzles/library.hgp -o book.pdf --views puzzle,solution
+#   python -m hanagram.export puzzles/ -o flowers/ --views flower --highlight 3,7
+#
+# 表示の種類 (--views):
+#   puzzle   初期値だけ
+#   solution 解答 (初期値セルは薄青)
+#   flower   完成盤面で --highlight の数字をピンクにした「花」表示
+# 描画は mpl_board.BoardRenderer を使う。三角形・ラベル・数字の Text は
+# プロセス毎に 1 度だけ作り、ページ毎には塗り色と数字だけを差し替える。
+# PNG / SVG はプロセスプールで並列に、PDF は 1 ファイルにまとめるので順番に書き出す。
+# CSV はパズル毎に (ワーカー内で) 読み込み、読めないものはエラーとして報告して飛ばす。
+# パックに解答セクションがあればその解答を使い、なければその場で解く。
+#############################################
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from hanagram.batch import iter_sources
+from hanagram.geometry import board_appearance
+from hanagram.loader import load_puzzle_from_csv
+from hanagram.solver import cells_to_grid, solve
+
+VIEWS = ('puzzle', 'solution', 'flower')
+FORMATS = ('png', 'svg', 'pdf')
+
+
+def view_appearance(view, puzzle, solution, highlight_digits=None):
+    """表示の種類 → board_appearance の (塗り色, 数字)"""
+    if view == 'puzzle':
+        return board_appearance(puzzle, None, puzzle)
+    if view == 'solution':
+        return board_appearance(solution, None, puzzle)
+    if view == 'flower':
+        return board_appearance(solution, None, puzzle, True, highlight_digits)
+    raise ValueError(f"不明な表示の種類です: {view}")
+
+
+def source_name(source):
+    """出典 → 出力ファイル名の元 (CSV は拡張子を除いたファイル名、パックは "パック名_000001")"""
+    path, _, number = source.partition('#')
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}_{number}" if number else stem
+
+
+def load_source(source, values, solution=None):
+    """iter_sources(solutions=True) の 1 件 → (名前, 6×9 の盤面, 6×9 の解答 or None)。
+    読めなければ OSError / ValueError"""
+    if solution is not None:
+        solution = cells_to_grid(solution)
+    if values is None:
+        return source_name(source), load_puzzle_from_csv(source), solution
+    return source_name(source), cells_to_grid(values), solution
+
+
+def _load_error(source, error):
+    message = str(error)
+    return message if source in message else f"{source}: {message}"
+
+
+def _pages(name, puzzle, solution, views, highlight_digits):
+    """(名前, 表示の種類, 塗り色, 数字) を順に返す"""
+    if solution is None and any(view != 'puzzle' for view in views):
+        solution = solve(puzzle)
+        if solution is None:
+            raise ValueError(f"{name}: 解がないため解答を描けません")
+    for view in views:
+        yield (name, view) + view_appearance(view, puzzle, solution, highlight_digits)
+
+
+#############################################
+# PNG / SVG (ワーカー毎にレンダラーを 1 つ作って使い回す)
+#############################################
+_renderer = None
+
+
+def _init_worker(dpi):
+    global _renderer
+    from hanagram.mpl_board import BoardRenderer
+    _renderer = BoardRenderer(dpi=dpi)
+
+
+def _export_job(args):
+    source, values, solution, views, highlight_digits, fmt, out_dir = args
+    written = []
+    try:
+        name, puzzle, solution = load_source(source, values, solution)
+    except (OSError, ValueError) as e:
+        return source, written, _load_error(source, e)
+    try:
+        for _, view, colors, texts in _pages(name, puzzle, solution, views, highlight_digits):
+            path = os.path.join(out_dir, f"{name}_{view}.{fmt}")
+            with open(path, 'wb') as f:
+                f.write(_renderer.render(colors, texts, fmt))
+            written.append(path)
+    except Exception as e:
+        return name, written, f"{type(e).__name__}: {e}"
+    return name, written, None
+
+
+def export_images(sources, out_dir, fmt='png', views=('puzzle',), highlight_digits=None,
+                  workers=None, dpi=100):
+    """sources (iter_sources(solutions=True) の (出典, 値, 解答) のリスト) の画像を並列に書き出して
+    (書き出したパスのリスト, エラーのリスト) を返す"""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(sources) // (workers * 4)))
+    jobs = ((source, values, solution, tuple(views), highlight_digits, fmt, out_dir)
+            for source, values, solution in sources)
+    written = []
+    errors = []
+    with Pool(workers, initializer=_init_worker, initargs=(dpi,)) as pool:
+        for name, paths, error in pool.imap_unordered(_export_job, jobs, chunksize):
+            written.extend(paths)
+            if error:
+                errors.append(error)
+    return written, errors
+
+
+#############################################
+# 複数ページ PDF (1 表示 = 1 ページ)
+#############################################
+def export_pdf(sources, filename, views=('puzzle',), highlight_digits=None, dpi=100):
+    """sources を PDF に書き出して (ページ数, エラーのリスト) を返す"""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from hanagram.mpl_board import BoardRenderer
+
+    renderer = BoardRenderer(dpi=dpi)
+    pages = 0
+    errors = []
+    with PdfPages(filename) as pdf:
+        for source, values, solution in sources:
+            try:
+                name, puzzle, solution = load_source(source, values, solution)
+            except (OSError, ValueError) as e:
+                errors.append(_load_error(source, e))
+                continue
+            try:
+                for _, _, colors, texts in _pages(name, puzzle, solution, views, highlight_digits):
+                    renderer.save_page(pdf, colors, texts)
+                    pages += 1
+            except ValueError as e:
+                errors.append(str(e))
+    return pages, errors
+
+
+def _parse_digits(text):
+    try:
+        digits = [int(d) for d in text.split(',') if d.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"数字のカンマ区切りではありません: {text!r}")
+    if any(not 0 <= d <= 9 for d in digits):
+        raise argparse.ArgumentTypeError(f"0～9 の数字を指定してください: {text!r}")
+    return digits
+
+
+def _parse_views(text):
+    views = [v.strip() for v in text.split(',') if v.strip()]
+    for view in views:
+        if view not in VIEWS:
+            raise argparse.ArgumentTypeError(f"表示の種類は {', '.join(VIEWS)} から選んでください: {view}")
+    return views
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='盤面を PNG / SVG / PDF に書き出す')
+    parser.add_argument('paths', nargs='+', help='パズルのフォルダ / glob / CSV ファイル / パック (.hgp)')
+    parser.add_argument('-o', '--output', required=True,
+                        help='出力先 (PNG / SVG はフォルダ、PDF はファイル名)')
+    parser.add_argument('--format', choices=FORMATS,
+                        help='出力形式 (省略時は -o が .pdf なら pdf、それ以外は png)')
+    parser.add_argument('--views', type=_parse_views, default=['puzzle'],
+                        help='表示の種類 (puzzle,solution,flower のカンマ区切り)')
+    parser.add_argument('--highlight', type=_parse_digits, default=None,
+                        help='flower 表示でピンクにする数字 (例: 3,7)')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ワーカープロセス数 (既定: CPU コア数、PDF では使わない)')
+    args = parser.parse_args(argv)
+
+    if 'flower' in args.views and not args.highlight:
+        parser.error('flower 表示には --highlight が必要です')
+    fmt = args.format or ('pdf' if args.output.endswith('.pdf') else 'png')
+
+    start = time.perf_counter()
+    sources = list(iter_sources(args.paths, solutions=True))
+    if fmt == 'pdf':
+        count, errors = export_pdf(sources, args.output, args.views, args.highlight, args.dpi)
+        print(f"{args.output}: {count} ページ")
+    else:
+        written, errors = export_images(sources, args.output, fmt, args.views, args.highlight,
+                                        args.workers, args.dpi)
+        count = len(written)
+        print(f"{args.output}: {count} ファイル")
+    for error in errors:
+        sys.stderr.write(error + '\n')
+    sys.stderr.write(f"{len(sources)} 問を {time.perf_counter() - start:.1f} 秒で書き出しました\n")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
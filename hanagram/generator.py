@@ -0,0 +1,123 @@
+#############################################
+# パズル生成 (ランダムな完成盤面 → 唯一解を保ったまま初期値を削る)
+#
+#   python -m hanagram.generator -n 100 --givens 22 --symmetry rot180 --seed 1 -o puzzles/
+#############################################
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from hanagram.geometry import NUM_CELLS, symmetries
+from hanagram.loader import save_puzzle_to_csv
+from hanagram.solver import cells_to_grid, solve_cells
+from hanagram.uniqueness import count_solutions_cells
+
+# 対称性オプション → 生成元となる置換名
+SYMMETRY_OPTIONS = {
+    'none': [],
+    'rot180': ['rot180'],
+    'rot120': ['rot120'],
+    'rot60': ['rot60'],
+    'mirror': ['mirror0'],        # 左右反転
+    'mirror_v': ['mirror180'],    # 上下反転
+    'full': list(symmetries),
+}
+
+
+def symmetry_orbits(symmetry='none'):
+    """対称操作で互いに移り合うセルのグループ (初期値はグループ単位で削る)"""
+    perms = [symmetries[name] for name in SYMMETRY_OPTIONS[symmetry]]
+    orbits = []
+    seen = set()
+    for idx in range(NUM_CELLS):
+        if idx in seen:
+            continue
+        orbit = {idx}
+        stack = [idx]
+        while stack:
+            cur = stack.pop()
+            for perm in perms:
+                nxt = perm[cur]
+                if nxt not in orbit:
+                    orbit.add(nxt)
+                    stack.append(nxt)
+        seen |= orbit
+        orbits.append(sorted(orbit))
+    return orbits
+
+
+def random_solution(rng):
+    """ルールを満たすランダムな完成盤面 (42 セルの値リスト)"""
+    return solve_cells([None] * NUM_CELLS, order=lambda digits: rng.sample(digits, len(digits)))
+
+
+def generate_puzzle(seed, givens=22, symmetry='none', attempts=20):
+    """seed から再現可能にパズルを 1 つ生成して (初期値リスト, 解リスト) を返す
+
+    初期値が givens 個以下になるまで削る。届かなければ完成盤面を作り直し、
+    attempts 回のうち最も初期値の少ないものを返す。
+    """
+    rng = random.Random(seed)
+    orbits = symmetry_orbits(symmetry)
+    best = None
+    for _ in range(attempts):
+        solution = random_solution(rng)
+        puzzle = list(solution)
+        n_givens = NUM_CELLS
+        for orbit in rng.sample(orbits, len(orbits)):
+            if n_givens <= givens:
+                break
+            for idx in orbit:
+                puzzle[idx] = None
+            if count_solutions_cells(puzzle, limit=2) == 1:
+                n_givens -= len(orbit)
+            else:
+                for idx in orbit:
+                    puzzle[idx] = solution[idx]
+        if best is None or n_givens < best[0]:
+            best = (n_givens, puzzle, solution)
+        if n_givens <= givens:
+            break
+    return best[1], best[2]
+
+
+def _generate_job(args):
+    seed, givens, symmetry, attempts, out_dir, prefix = args
+    puzzle, _ = generate_puzzle(seed, givens, symmetry, attempts)
+    filename = os.path.join(out_dir, f"{prefix}_{seed:06d}.csv")
+    save_puzzle_to_csv(cells_to_grid(puzzle), filename)
+    return filename, sum(v is not None for v in puzzle)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='唯一解の Hanagram パズルを生成して CSV に保存する')
+    parser.add_argument('-n', '--count', type=int, default=10, help='生成するパズル数')
+    parser.add_argument('--givens', type=int, default=22, help='目標の初期値の数 (この数以下まで削る)')
+    parser.add_argument('--symmetry', choices=list(SYMMETRY_OPTIONS), default='none',
+                        help='初期値の配置の対称性')
+    parser.add_argument('--seed', type=int, default=0, help='最初のシード (i 番目は seed+i)')
+    parser.add_argument('--attempts', type=int, default=20,
+                        help='目標に届かない場合に完成盤面を作り直す回数')
+    parser.add_argument('-o', '--output', default='puzzles', help='出力フォルダ')
+    parser.add_argument('--prefix', default='GEN', help='ファイル名の接頭辞')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ワーカープロセス数 (既定: CPU コア数)')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs = [(args.seed + i, args.givens, args.symmetry, args.attempts, args.output, args.prefix)
+            for i in range(args.count)]
+    start = time.perf_counter()
+    with Pool(args.workers or os.cpu_count() or 1) as pool:
+        for filename, n_givens in pool.imap_unordered(_generate_job, jobs):
+            print(f"{filename}: 初期値 {n_givens} 個")
+    elapsed = time.perf_counter() - start
+    sys.stderr.write(f"{args.count} 問を {elapsed:.1f} 秒で生成しました\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#############################################
+# 盤面トポロジー (三角形セルとライン) の定義
+# 従来の 6×9 の盤面 (topology.Topology(3)) の表をモジュール変数として公開する。
+# 大きい盤面は topology.get_topology(size) を使う
+#############################################
+from hanagram.topology import HEIGHT, get_topology
+
+TOPOLOGY = get_topology(3)
+
+board_structure = TOPOLOGY.board_structure
+
+# 列(A～L) → ライン上のセル座標 (番号 0～8 の順)
+lines_map = TOPOLOGY.lines_map
+
+# 方向名 → その方向のライン(列記号)
+line_directions = TOPOLOGY.line_directions
+
+#############################################
+# 事前計算したインデックス表
+#############################################
+NUM_ROWS = TOPOLOGY.num_rows
+NUM_COLS = TOPOLOGY.num_cols
+DIGITS = TOPOLOGY.digits
+
+# セル番号(0～41) ⇔ (行, 列)
+cells = TOPOLOGY.cells
+cell_index = TOPOLOGY.cell_index
+NUM_CELLS = TOPOLOGY.num_cells
+
+# ライン番号(0～11, A～L の順) → セル番号のタプル
+line_labels = TOPOLOGY.line_labels
+line_cells = TOPOLOGY.line_cells
+NUM_LINES = TOPOLOGY.num_lines
+
+# セル番号 → そのセルを通るライン番号 (2～3本) / 辺を共有するセル番号
+cell_lines = TOPOLOGY.cell_lines
+cell_neighbors = TOPOLOGY.cell_neighbors
+
+# ライン番号 → (方向名, 方向内の番号)  重複メッセージ用
+line_names = TOPOLOGY.line_names
+
+is_cell = TOPOLOGY.is_cell
+generate_combinations = TOPOLOGY.generate_combinations
+
+#############################################
+# 三角形の頂点・重心 (描画や対称性の計算用)
+#############################################
+triangle_vertices = TOPOLOGY.triangle_vertices
+cell_vertices = TOPOLOGY.cell_vertices
+cell_centroids = TOPOLOGY.cell_centroids
+
+#############################################
+# 盤面の対称性 (60° 回転 × 6 と鏡映 × 6 の 12 通り)
+# symmetries[name] はセル番号の置換 (idx → 移動先の idx)
+#############################################
+symmetries = TOPOLOGY.symmetries
+
+#############################################
+# ラベル(A～L)の配置: ラベル → 描画座標 (x, y)
+#############################################
+label_coords = TOPOLOGY.label_coords
+
+
+def cell_color(r, c, value, selected_pos, initial_board_values,
+               puzzle_completed=False, highlight_digits=None):
+    """初期値セル=薄青, 選択セル=黄, 他=白 / 完成時はハイライト対象の数字をピンク"""
+    if initial_board_values[r][c] is not None:
+        color = 'lightblue'
+    elif (r, c) == selected_pos:
+        color = 'yellow'
+    else:
+        color = 'white'
+    if puzzle_completed and highlight_digits and value in highlight_digits:
+        color = 'pink'
+    return color
+
+
+def board_appearance(board_values, selected_pos, initial_board_values,
+                     puzzle_completed=False, highlight_digits=None, topology=TOPOLOGY):
+    """セル毎の (塗り色のタプル, 数字文字列のタプル)。描画キャッシュのキーにもなる"""
+    colors = []
+    texts = []
+    for (r, c) in topology.cells:
+        value = board_values[r][c]
+        colors.append(cell_color(r, c, value, selected_pos, initial_board_values,
+                                 puzzle_completed, highlight_digits))
+        texts.append('' if value is None else str(value))
+    return tuple(colors), tuple(texts)
@@ -0,0 +1,275 @@
+#############################################
+# 人が使う解き方の順で解いて難易度を付ける
+#
+#   python -m hanagram.grade puzzles/ puzzles/library.hgp -o grades.jsonl
+#
+# 各ラインは 9 セルに 0～9 の 10 種類の数字が重複なく入るので、
+# 必ず 1 つだけ「欠ける数字」がある。候補 (鉛筆書き) を持ちながら、
+# 易しい順に当てはまる解き方を 1 つ適用しては最初から探し直す:
+#   naked_single       候補が 1 つしかないセル
+#   hidden_single      欠ける数字が決まった (= 入る場所のない数字がある) ラインで、
+#                      入る場所が 1 つしかない数字
+#   locked_candidates  ラインに必ず入る数字の候補が、すべて別の 1 本のラインに
+#                      含まれる → そのラインの他のセルから消す
+#   naked_pair         ライン内で候補が同じ 2 数字の 2 セル → 他のセルから消す
+#   missing_pair       欠ける数字が決まっていないラインで、2 つの数字の入る場所が
+#                      同じ 1 セルだけ → 片方が欠ける数字なので、そのセルはその 2 択、
+#                      残りの数字はすべて入る
+#   guess              どれも当てはまらなければ、候補の最も少ないセルに解の数字を置く
+# 点数は適用した回数 × 重み (TECHNIQUES) の合計、ラベルは使った最も難しい解き方で決める。
+# 盤面は従来の 42 セルの盤面 (ライン 9 セル・数字 10 種類) のみ。
+#############################################
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, namedtuple
+
+from hanagram.canonical import puzzle_hash
+from hanagram.geometry import NUM_CELLS, cell_lines, line_cells
+from hanagram.loader import load_puzzle_from_csv
+from hanagram.solver import ALL_DIGITS, MASK_DIGITS, POPCOUNT, grid_to_cells, solve_cells
+
+# (名前, 表示名, 重み, ラベル) を易しい順に
+TECHNIQUES = (
+    ('naked_single', '候補が 1 つのセル', 1, 'やさしい'),
+    ('hidden_single', 'ライン内で入る場所が 1 つ', 2, 'ふつう'),
+    ('locked_candidates', 'ラインの交差', 5, 'むずかしい'),
+    ('naked_pair', '候補のペア', 8, 'むずかしい'),
+    ('missing_pair', '欠ける数字の 2 択', 10, 'むずかしい'),
+    ('guess', '仮定', 40, 'とてもむずかしい'),
+)
+WEIGHTS = {name: weight for name, _, weight, _ in TECHNIQUES}
+LABELS = {name: label for name, _, _, label in TECHNIQUES}
+UNSOLVABLE = '解なし'
+
+# score: 点数、hardest: 使った最も難しい解き方 (初期値だけで完成していれば None)、
+# label: 難易度ラベル、counts: 解き方 → 適用回数
+Grade = namedtuple('Grade', ['score', 'hardest', 'label', 'counts'])
+
+# ライン番号 → セル番号の集合
+_LINE_SETS = [frozenset(line) for line in line_cells]
+
+
+class _Grader:
+    def __init__(self, values, solution):
+        self.values = list(values)
+        self.solution = solution
+        self.placed = [0] * len(line_cells)
+        for l_idx, line in enumerate(line_cells):
+            for idx in line:
+                if self.values[idx] is not None:
+                    self.placed[l_idx] |= 1 << self.values[idx]
+        self.cands = [0] * NUM_CELLS
+        for idx in range(NUM_CELLS):
+            if self.values[idx] is None:
+                used = 0
+                for l_idx in cell_lines[idx]:
+                    used |= self.placed[l_idx]
+                self.cands[idx] = ALL_DIGITS & ~used
+        # ライン毎の「欠ける数字」の候補 (missing_pair で絞り込む)
+        self.missing = [ALL_DIGITS] * len(line_cells)
+        self.counts = Counter()
+
+    def place(self, idx, digit):
+        bit = 1 << digit
+        self.values[idx] = digit
+        self.cands[idx] = 0
+        for l_idx in cell_lines[idx]:
+            self.placed[l_idx] |= bit
+            for other in line_cells[l_idx]:
+                self.cands[other] &= ~bit
+
+    def eliminate(self, cells, mask):
+        changed = False
+        for idx in cells:
+            if self.cands[idx] & mask:
+                self.cands[idx] &= ~mask
+                changed = True
+        return changed
+
+    def line_info(self, l_idx):
+        """(空きセル, 数字 → 入りうるセルのリスト, 必ず入る数字のマスク)"""
+        empty = [idx for idx in line_cells[l_idx] if self.values[idx] is None]
+        unplaced = ALL_DIGITS & ~self.placed[l_idx]
+        positions = {d: [idx for idx in empty if self.cands[idx] >> d & 1]
+                     for d in MASK_DIGITS[unplaced]}
+        nowhere = 0
+        for d, cells in positions.items():
+            if not cells:
+                nowhere |= 1 << d
+        missing = nowhere if nowhere else self.missing[l_idx]
+        return empty, positions, unplaced & ~missing
+
+    #############################################
+    # 解き方 (易しい順)。当てはまったら 1 回適用して True
+    #############################################
+    def naked_single(self):
+        for idx, cand in enumerate(self.cands):
+            if cand and POPCOUNT[cand] == 1:
+                self.place(idx, MASK_DIGITS[cand][0])
+                return True
+        return False
+
+    def hidden_single(self):
+        for l_idx in range(len(line_cells)):
+            _, positions, required = self.line_info(l_idx)
+            for d in MASK_DIGITS[required]:
+                if len(positions[d]) == 1:
+                    self.place(positions[d][0], d)
+                    return True
+        return False
+
+    def locked_candidates(self):
+        for l_idx in range(len(line_cells)):
+            _, positions, required = self.line_info(l_idx)
+            for d in MASK_DIGITS[required]:
+                cells = positions[d]
+                if len(cells) < 2:
+                    continue
+                shared = set(cell_lines[cells[0]]).intersection(*(cell_lines[idx] for idx in cells[1:]))
+                shared.discard(l_idx)
+                for other in shared:
+                    if self.eliminate(_LINE_SETS[other] - _LINE_SETS[l_idx], 1 << d):
+                        return True
+        return False
+
+    def naked_pair(self):
+        for l_idx in range(len(line_cells)):
+            empty = [idx for idx in line_cells[l_idx] if self.values[idx] is None]
+            pairs = {}
+            for idx in empty:
+                cand = self.cands[idx]
+                if POPCOUNT[cand] == 2:
+                    if cand in pairs:
+                        rest = [other for other in empty if other not in (idx, pairs[cand])]
+                        if self.eliminate(rest, cand):
+                            return True
+                    else:
+                        pairs[cand] = idx
+        return False
+
+    def missing_pair(self):
+        for l_idx in range(len(line_cells)):
+            _, positions, required = self.line_info(l_idx)
+            unknown = ALL_DIGITS & ~self.placed[l_idx] & ~required
+            if POPCOUNT[unknown] < 3:
+                continue
+            single = {}
+            for d in MASK_DIGITS[unknown]:
+                cells = positions[d]
+                if len(cells) != 1:
+                    continue
+                if cells[0] in single:
+                    pair = 1 << d | 1 << single[cells[0]]
+                    self.missing[l_idx] = pair
+                    self.cands[cells[0]] &= pair
+                    return True
+                single[cells[0]] = d
+        return False
+
+    def guess(self):
+        empty = [idx for idx in range(NUM_CELLS) if self.values[idx] is None]
+        idx = min(empty, key=lambda i: POPCOUNT[self.cands[i]])
+        self.place(idx, self.solution[idx])
+        return True
+
+    def run(self):
+        steps = [(name, getattr(self, name)) for name, _, _, _ in TECHNIQUES]
+        while None in self.values:
+            for name, step in steps:
+                if step():
+                    self.counts[name] += 1
+                    break
+        return self.values
+
+
+def grade_cells(values):
+    """42 セルの値リスト (None=空) の難易度。解がなければ点数 None の Grade"""
+    solution = solve_cells(values)
+    if solution is None:
+        return Grade(None, None, UNSOLVABLE, {})
+    grader = _Grader(values, solution)
+    grader.run()
+    counts = {name: grader.counts[name] for name, _, _, _ in TECHNIQUES if grader.counts[name]}
+    hardest = next((name for name, _, _, _ in reversed(TECHNIQUES) if name in counts), None)
+    score = sum(WEIGHTS[name] * n for name, n in counts.items())
+    return Grade(score, hardest, LABELS.get(hardest, LABELS['naked_single']), counts)
+
+
+def grade(board_values):
+    """6×9 の盤面の難易度"""
+    return grade_cells(grid_to_cells(board_values))
+
+
+def grade_text(result):
+    """セレクトボックス用の短い表示 (例: "ふつう 38")"""
+    if result.score is None:
+        return result.label
+    return f"{result.label} {result.score}"
+
+
+#############################################
+# 一括採点 (プロセスプール)
+#############################################
+def _grade_job(job):
+    source, values = job
+    try:
+        if values is None:
+            values = grid_to_cells(load_puzzle_from_csv(source))
+        start = time.perf_counter()
+        result = grade_cells(values)
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        return {'source': source, 'error': str(e)}
+    return {'source': source, 'hash': puzzle_hash(values), 'score': result.score,
+            'label': result.label, 'hardest': result.hardest, 'counts': result.counts,
+            'ms': round(elapsed * 1000, 3)}
+
+
+def grade_sources(paths, workers=None):
+    """フォルダ / glob / CSV / パックを採点して結果の辞書を順に返す"""
+    # カタログから import されるので、一括採点でしか使わないものはここで読み込む
+    from multiprocessing import Pool
+
+    from hanagram.batch import iter_sources
+    jobs = list(iter_sources(paths))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(256, len(jobs) // (workers * 8)))
+    with Pool(workers) as pool:
+        yield from pool.imap(_grade_job, jobs, chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='人が使う解き方の順で解いてパズルの難易度を付ける')
+    parser.add_argument('paths', nargs='+', help='パズルのフォルダ / glob / CSV ファイル / パック (.hgp)')
+    parser.add_argument('-o', '--output', help='結果の JSONL (省略時は標準出力)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ワーカープロセス数 (既定: CPU コア数)')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    start = time.perf_counter()
+    labels = Counter()
+    errors = 0
+    try:
+        for result in grade_sources(args.paths, args.workers):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            if 'error' in result:
+                errors += 1
+                sys.stderr.write(f"{result['source']}: {result['error']}\n")
+            else:
+                labels[result['label']] += 1
+    finally:
+        if args.output:
+            out.close()
+    total = sum(labels.values())
+    elapsed = time.perf_counter() - start
+    sys.stderr.write(f"{total} 問 ({elapsed:.1f} 秒, {total / elapsed if elapsed else 0:.0f} 問/秒): "
+                     + ' / '.join(f"{label} {n}" for label, n in labels.most_common()) + '\n')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#############################################
+# 手順の履歴 (元に戻す / やり直す / 任意の手順へ移動)
+#
+# 1 手 = (セル番号, 変更前, 変更後, 変更後に重複がないか) を 16bit に詰めて
+# array('H') に追記していく:
+#   bit 15    直前の手と同じ操作 (まとめて入力) の続き
+#   bit 9～14 セル番号 (0～41)
+#   bit 5～8  変更前の値 (0～9、空欄 = 0xF)
+#   bit 1～4  変更後の値
+#   bit 0     変更後の盤面に重複がない
+# CHECKPOINT_INTERVAL 手毎に盤面 (42 バイト) を保存しておくので、
+# 任意の手順の盤面は直前のチェックポイントから高々 CHECKPOINT_INTERVAL 手を
+# 再生するだけで求まる。手数が max_moves を超えたら古い側から
+# チェックポイント 1 区間分ずつ捨てるので、1 セッションのメモリは
+# 約 2 バイト × max_moves + 42 バイト × (max_moves / CHECKPOINT_INTERVAL) で頭打ちになる。
+# 元に戻す / やり直すは bit 15 で繋がった手をまとめて 1 操作として扱う。
+# to_bytes() / from_bytes() で丸ごとバイト列にできる (進行状況の保存用)。
+#############################################
+import struct
+import sys
+from array import array
+
+from hanagram.geometry import NUM_CELLS
+
+CHECKPOINT_INTERVAL = 64
+MAX_MOVES = 8192
+EMPTY = 0xF
+GROUPED = 1 << 15
+
+# to_bytes の先頭: interval, max_moves, position, 起点に重複がないか, チェックポイント数, 手数
+_HEADER = struct.Struct('<HIIBHI')
+
+
+def _pack(idx, old, new, clean, grouped=False):
+    return (grouped << 15 | idx << 9 | (EMPTY if old is None else old) << 5
+            | (EMPTY if new is None else new) << 1 | bool(clean))
+
+
+def _value(nibble):
+    return None if nibble == EMPTY else nibble
+
+
+def unpack_move(move):
+    """16bit の 1 手 → (セル番号, 変更前, 変更後, 重複なし)"""
+    return move >> 9 & 0x3F, _value(move >> 5 & 0xF), _value(move >> 1 & 0xF), bool(move & 1)
+
+
+class MoveHistory:
+    def __init__(self, values=None, clean=True, max_moves=MAX_MOVES,
+                 interval=CHECKPOINT_INTERVAL):
+        """values: 履歴の起点となる 42 セルの値リスト (None=空)
+        clean:  起点の盤面に重複がないか"""
+        if values is None:
+            values = [None] * NUM_CELLS
+        if max_moves < interval:
+            raise ValueError("max_moves は interval 以上にしてください")
+        self.interval = interval
+        self.max_moves = max_moves
+        self.moves = array('H')
+        self.position = 0            # 適用済みの手数 (これより後はやり直し用)
+        self.base_clean = clean
+        # checkpoints[k] = k * interval 手適用後の盤面
+        self.checkpoints = [bytes(EMPTY if v is None else v for v in values)]
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.moves)
+
+    #############################################
+    # 記録
+    #############################################
+    def record(self, idx, old, new, clean):
+        """1 手を記録する (やり直し用の手は捨てる)。old == new なら何もしない"""
+        if old == new:
+            return
+        self._truncate(self.position)
+        self._append(_pack(idx, old, new, clean))
+
+    def record_group(self, changes, clean):
+        """changes: [(セル番号, 変更前, 変更後)] をまとめて 1 操作として記録する。
+        clean は全部適用した後の盤面について。途中の手は重複ありとして記録するので
+        「重複のない状態まで戻す」が操作の途中で止まることはない"""
+        changes = [(idx, old, new) for idx, old, new in changes if old != new]
+        if not changes:
+            return
+        self._truncate(self.position)
+        last = len(changes) - 1
+        for k, (idx, old, new) in enumerate(changes):
+            self._append(_pack(idx, old, new, clean and k == last, k > 0))
+
+    def _append(self, move):
+        self.moves.append(move)
+        self.position += 1
+        if self.position % self.interval == 0:
+            self.checkpoints.append(bytes(self._replay(self.position)))
+        if len(self.moves) > self.max_moves:
+            self._drop_oldest()
+
+    def _truncate(self, n):
+        del self.moves[n:]
+        del self.checkpoints[n // self.interval + 1:]
+
+    def _drop_oldest(self):
+        # 最初のチェックポイント区間を捨てて、次のチェックポイントを起点にする
+        interval = self.interval
+        self.base_clean = bool(self.moves[interval - 1] & 1)
+        del self.moves[:interval]
+        del self.checkpoints[0]
+        self.position -= interval
+
+    #############################################
+    # 保存 / 復元 (手は little endian の 16bit)
+    #############################################
+    def to_bytes(self):
+        moves = self.moves
+        if sys.byteorder == 'big':
+            moves = array('H', moves)
+            moves.byteswap()
+        return b''.join([_HEADER.pack(self.interval, self.max_moves, self.position, self.base_clean,
+                                      len(self.checkpoints), len(moves)),
+                         *self.checkpoints, moves.tobytes()])
+
+    @classmethod
+    def from_bytes(cls, data):
+        interval, max_moves, position, base_clean, n_checkpoints, n_moves = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        end = offset + n_checkpoints * NUM_CELLS + n_moves * 2
+        if len(data) != end or n_checkpoints != n_moves // interval + 1 or position > n_moves:
+            raise ValueError("履歴のバイト列が壊れています")
+        history = cls(max_moves=max_moves, interval=interval, clean=bool(base_clean))
+        history.checkpoints = [bytes(data[offset + k * NUM_CELLS:offset + (k + 1) * NUM_CELLS])
+                               for k in range(n_checkpoints)]
+        history.moves.frombytes(data[offset + n_checkpoints * NUM_CELLS:end])
+        if sys.byteorder == 'big':
+            history.moves.byteswap()
+        history.position = position
+        return history
+
+    #############################################
+    # 移動
+    #############################################
+    def _replay(self, n):
+        """n 手適用後の盤面 (セル毎の nibble の bytearray)"""
+        k = min(n // self.interval, len(self.checkpoints) - 1)
+        cells = bytearray(self.checkpoints[k])
+        for move in self.moves[k * self.interval:n]:
+            cells[move >> 9 & 0x3F] = move >> 1 & 0xF
+        return cells
+
+    def values_at(self, n):
+        """n 手適用後の 42 セルの値リスト"""
+        if not 0 <= n <= len(self.moves):
+            raise IndexError(n)
+        return [_value(b) for b in self._replay(n)]
+
+    def goto(self, n):
+        """n 手目へ移動して、その盤面の 42 セルの値リストを返す"""
+        values = self.values_at(n)
+        self.position = n
+        return values
+
+    def undo(self):
+        """1 操作戻す。戻したセルの [(セル番号, 値)] を返す (戻せなければ空)"""
+        steps = []
+        while self.can_undo:
+            self.position -= 1
+            move = self.moves[self.position]
+            idx, old, _, _ = unpack_move(move)
+            steps.append((idx, old))
+            if not move & GROUPED:
+                break
+        return steps
+
+    def redo(self):
+        """1 操作進める。進めたセルの [(セル番号, 値)] を返す (進められなければ空)"""
+        steps = []
+        while self.can_redo:
+            idx, _, new, _ = unpack_move(self.moves[self.position])
+            steps.append((idx, new))
+            self.position += 1
+            if not (self.can_redo and self.moves[self.position] & GROUPED):
+                break
+        return steps
+
+    def is_clean(self, n):
+        """n 手適用後の盤面に重複がないか"""
+        return self.base_clean if n == 0 else bool(self.moves[n - 1] & 1)
+
+    def last_clean_position(self):
+        """現在の手順以前で、重複のなかった最後の手数 (なければ None)"""
+        for n in range(self.position, -1, -1):
+            if self.is_clean(n):
+                return n
+        return None
@@ -0,0 +1,125 @@
+#############################################
+# CSV読込用関数 (6×9 のグリッド、空欄 = None)
+#
+# pandas を使わずに文字列を直接分割して読む。先頭の UTF-8 BOM は取り除き、
+# 次の内容はセル座標付きの PuzzleFormatError として報告する:
+#   - 行数・列数が 6×9 でない
+#   - 0～9 の整数でない値
+#   - board_structure の 'N' (セルが存在しない位置) に値がある
+#   - 同じライン上で重複している初期値
+#############################################
+import csv
+
+from hanagram.geometry import NUM_COLS, NUM_ROWS, board_structure, cells, line_cells, line_labels
+
+
+class PuzzleFormatError(ValueError):
+    """errors は (行, 列, メッセージ) のリスト (行・列が特定できない場合は None)"""
+
+    def __init__(self, source, errors):
+        self.source = source
+        self.errors = errors
+        lines = []
+        for r, c, message in errors:
+            where = f"セル ({r}, {c}): " if r is not None and c is not None else (
+                f"行 {r}: " if r is not None else "")
+            lines.append(where + message)
+        super().__init__(f"{source}: " + " / ".join(lines))
+
+
+def _split_line(line):
+    if '"' in line:
+        return next(csv.reader([line]))
+    return line.split(',')
+
+
+def _parse_value(text):
+    text = text.strip()
+    if not text:
+        return None
+    if text.isdigit() and len(text) == 1:
+        return int(text)
+    # 表計算ソフトが書き出す "3.0" 形式も受け付ける
+    try:
+        number = float(text)
+    except ValueError:
+        raise ValueError(f"数字ではない値 {text!r}")
+    if not number.is_integer() or not 0 <= number <= 9:
+        raise ValueError(f"0～9 の範囲外の値 {text!r}")
+    return int(number)
+
+
+def duplicate_errors(board_values):
+    """同じライン上で重複している初期値を (行, 列, メッセージ) のリストで返す"""
+    errors = []
+    for label, line in zip(line_labels, line_cells):
+        seen = {}
+        for idx in line:
+            r, c = cells[idx]
+            val = board_values[r][c]
+            if val is None:
+                continue
+            if val in seen:
+                r0, c0 = seen[val]
+                errors.append((r, c, f"ライン {label} で数字 {val} がセル ({r0}, {c0}) と重複"))
+            else:
+                seen[val] = (r, c)
+    return errors
+
+
+def parse_puzzle_csv(text, source='<csv>', check_duplicates=True):
+    """CSV 文字列 → 6×9 の盤面"""
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    rows = text.splitlines()
+    while rows and not rows[-1].strip():
+        rows.pop()
+    if len(rows) != NUM_ROWS:
+        raise PuzzleFormatError(source, [(None, None, f"行数が {NUM_ROWS} ではありません ({len(rows)} 行)")])
+
+    errors = []
+    puzzle_data = []
+    for r_idx, line in enumerate(rows):
+        fields = _split_line(line)
+        if len(fields) != NUM_COLS:
+            errors.append((r_idx, None, f"列数が {NUM_COLS} ではありません ({len(fields)} 列)"))
+            puzzle_data.append([None] * NUM_COLS)
+            continue
+        row_data = []
+        for c_idx, field in enumerate(fields):
+            try:
+                val = _parse_value(field)
+            except ValueError as e:
+                errors.append((r_idx, c_idx, str(e)))
+                val = None
+            if val is not None and board_structure[r_idx][c_idx] == 'N':
+                errors.append((r_idx, c_idx, f"セルが存在しない位置に値 {val} があります"))
+                val = None
+            row_data.append(val)
+        puzzle_data.append(row_data)
+
+    if check_duplicates and not errors:
+        errors = duplicate_errors(puzzle_data)
+    if errors:
+        raise PuzzleFormatError(source, errors)
+    return puzzle_data
+
+
+def load_puzzle_from_csv(filename, check_duplicates=True):
+    with open(filename, 'rb') as f:
+        data = f.read()
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError as e:
+        raise PuzzleFormatError(filename, [(None, None, f"UTF-8 として読めません ({e})")])
+    return parse_puzzle_csv(text, filename, check_duplicates)
+
+
+#############################################
+# CSV書出し用関数 (load_puzzle_from_csv と同じ 6×9 レイアウト)
+#############################################
+def save_puzzle_to_csv(board_values, filename):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for row_data in board_values:
+            writer.writerow(['' if val is None else val for val in row_data])
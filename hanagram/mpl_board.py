@@ -0,0 +1,111 @@
+#############################################
+# Matplotlib 版の盤面図
+#
+# 三角形 (従来の盤面なら 42 個) は 1 つの PolyCollection、数字とラベル(A～L)の Text も
+# 最初に 1 度だけ作っておき、描画毎には塗り色と数字の文字列だけを差し替える。
+# Figure は pyplot を通さずに作るので pyplot の管理下に溜まらない。
+# PNG は (塗り色, 数字) をキーにキャッシュする。
+#############################################
+import io
+import threading
+from collections import OrderedDict
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from hanagram.geometry import HEIGHT, TOPOLOGY, board_appearance
+
+
+# 盤面 (ラベル込み) の外側に取る余白
+MARGIN = 1.5
+
+
+class BoardRenderer:
+    def __init__(self, figsize=(8, 8), dpi=100, topology=TOPOLOGY):
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        ax = self.fig.add_axes((0, 0, 1, 1))
+
+        self.cells = PolyCollection(topology.cell_vertices, edgecolors='black', facecolors='white')
+        ax.add_collection(self.cells)
+
+        # 中央に数字を表示 (三角形の外接矩形の中心)
+        self.texts = []
+        for pts in topology.cell_vertices:
+            cx = min(x for x, _ in pts) + 0.5
+            cy = min(y for _, y in pts) + HEIGHT / 2
+            self.texts.append(ax.text(cx, cy, '', fontsize=14, ha='center', va='center'))
+
+        for label, (x_lab, y_lab) in topology.label_coords.items():
+            ax.text(x_lab, y_lab, label, color="red", fontsize=16, ha="center", va="center")
+
+        # 盤面の中心を真ん中にした正方形の範囲
+        x_min, x_max, y_min, y_max = topology.bounds
+        half = max(x_max - x_min, y_max - y_min) / 2 + MARGIN
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        ax.set_xlim(cx - half, cx + half)
+        ax.set_ylim(cy - half, cy + half)
+        ax.set_aspect('equal')
+        ax.axis('off')
+        self.lock = threading.Lock()
+
+    def update(self, colors, texts):
+        self.cells.set_facecolors(colors)
+        for text, value in zip(self.texts, texts):
+            text.set_text(value)
+
+    def render(self, colors, texts, fmt='png'):
+        """png / svg / pdf のバイト列"""
+        with self.lock:
+            self.update(colors, texts)
+            buf = io.BytesIO()
+            self.fig.savefig(buf, format=fmt)
+            return buf.getvalue()
+
+    def render_png(self, colors, texts):
+        return self.render(colors, texts, 'png')
+
+    def save_page(self, pdf, colors, texts):
+        """matplotlib の PdfPages に 1 ページ追加する"""
+        with self.lock:
+            self.update(colors, texts)
+            pdf.savefig(self.fig)
+
+
+#############################################
+# プロセス共有のレンダラーと PNG キャッシュ
+#############################################
+PNG_CACHE_SIZE = 256
+
+_renderer = None
+_renderer_lock = threading.Lock()
+_png_cache = OrderedDict()
+_png_cache_lock = threading.Lock()
+
+
+def get_renderer():
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = BoardRenderer()
+        return _renderer
+
+
+def render_board_png(board_values, selected_pos, initial_board_values,
+                     puzzle_completed=False, highlight_digits=None, use_cache=True):
+    key = board_appearance(board_values, selected_pos, initial_board_values,
+                           puzzle_completed, highlight_digits)
+    if use_cache:
+        with _png_cache_lock:
+            png = _png_cache.get(key)
+            if png is not None:
+                _png_cache.move_to_end(key)
+                return png
+    png = get_renderer().render_png(*key)
+    if use_cache:
+        with _png_cache_lock:
+            _png_cache[key] = png
+            while len(_png_cache) > PNG_CACHE_SIZE:
+                _png_cache.popitem(last=False)
+    return png
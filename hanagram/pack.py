@@ -0,0 +1,237 @@
+#############################################
+# パズルパック (.hgp): 多数のパズルを 1 ファイルに詰めたバイナリ形式
+#
+#   ヘッダ 16 バイト (リトルエンディアン)
+#     magic  4s  b'HGPK'
+#     version B  1
+#     flags   B  bit0 = 解答セクションあり
+#     cells   H  1 レコードのセル数 (42)
+#     count   I  パズル数
+#     reserved I
+#   パズルセクション: count × 21 バイト
+#   解答セクション (flags bit0 のとき): count × 21 バイト
+#
+# 1 レコードは 42 セル (geometry.cells の順) を 4bit ずつ詰めたもの。
+# 偶数番目のセルが上位 4bit、0～9 が数字、0xF が空欄。
+# 読み込みは mmap で N 番目のレコードだけを取り出す。
+#
+#   python -m hanagram.pack pack puzzles/ -o library.hgp --solutions
+#   python -m hanagram.pack unpack library.hgp -o puzzles_out/
+#   python -m hanagram.pack info library.hgp
+#############################################
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+from hanagram.geometry import NUM_CELLS, cells
+
+MAGIC = b'HGPK'
+VERSION = 1
+FLAG_SOLUTIONS = 1
+EMPTY = 0xF
+PACK_EXTENSION = '.hgp'
+
+HEADER = struct.Struct('<4sBBHII')
+RECORD_SIZE = (NUM_CELLS + 1) // 2
+
+# 1 バイト → (上位セル, 下位セル) の値
+_DECODE = [(hi if hi < 10 else None, lo if lo < 10 else None)
+           for hi, lo in ((b >> 4, b & 0xF) for b in range(256))]
+
+
+def encode_cells(values):
+    """42 セルの値リスト (None=空) → 21 バイト"""
+    if len(values) != NUM_CELLS:
+        raise ValueError(f"セル数が {NUM_CELLS} ではありません: {len(values)}")
+    nibbles = []
+    for idx, val in enumerate(values):
+        if val is None:
+            nibbles.append(EMPTY)
+        elif isinstance(val, int) and 0 <= val <= 9:
+            nibbles.append(val)
+        else:
+            raise ValueError(f"セル {cells[idx]} の値が 0～9 ではありません: {val!r}")
+    if len(nibbles) % 2:
+        nibbles.append(EMPTY)
+    return bytes((nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2))
+
+
+def decode_cells(record):
+    """21 バイト → 42 セルの値リスト"""
+    values = []
+    for b in record:
+        values.extend(_DECODE[b])
+    return values[:NUM_CELLS]
+
+
+def grid_to_record(board_values):
+    return encode_cells([board_values[r][c] for (r, c) in cells])
+
+
+def record_to_grid(record):
+    grid = [[None]*9 for _ in range(6)]
+    for (r, c), val in zip(cells, decode_cells(record)):
+        grid[r][c] = val
+    return grid
+
+
+#############################################
+# 書き出し
+#############################################
+def write_pack(filename, puzzles, solutions=None):
+    """6×9 の盤面の列をパックに書き出す (solutions は同じ順の解答の列)"""
+    records = [grid_to_record(board) for board in puzzles]
+    solution_records = None
+    if solutions is not None:
+        solution_records = [grid_to_record(board) for board in solutions]
+        if len(solution_records) != len(records):
+            raise ValueError("パズルと解答の数が一致しません")
+    flags = FLAG_SOLUTIONS if solution_records is not None else 0
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, NUM_CELLS, len(records), 0))
+        f.write(b''.join(records))
+        if solution_records is not None:
+            f.write(b''.join(solution_records))
+    return len(records)
+
+
+#############################################
+# 読み込み (mmap でランダムアクセス)
+#############################################
+class PuzzlePack:
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{filename}: 空のファイルです")
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"{filename}: ヘッダがありません")
+        magic, version, flags, n_cells, count, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or n_cells != NUM_CELLS:
+            self.close()
+            raise ValueError(f"{filename}: パズルパックではないか、対応していない形式です")
+        self.count = count
+        self.has_solutions = bool(flags & FLAG_SOLUTIONS)
+        expected = HEADER.size + count * RECORD_SIZE * (2 if self.has_solutions else 1)
+        if len(self._mm) < expected:
+            self.close()
+            raise ValueError(f"{filename}: ファイルが途中で切れています")
+        self._solution_offset = HEADER.size + count * RECORD_SIZE
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, offset, n):
+        if not 0 <= n < self.count:
+            raise IndexError(n)
+        start = offset + n * RECORD_SIZE
+        return self._mm[start:start + RECORD_SIZE]
+
+    def cells(self, n):
+        """n 番目のパズルの 42 セルの値リスト"""
+        return decode_cells(self._record(HEADER.size, n))
+
+    def __getitem__(self, n):
+        """n 番目のパズル (6×9)"""
+        return record_to_grid(self._record(HEADER.size, n))
+
+    def solution(self, n):
+        """n 番目のパズルの解答 (6×9)。解答セクションがなければ None"""
+        if not self.has_solutions:
+            return None
+        return record_to_grid(self._record(self._solution_offset, n))
+
+    def solution_cells(self, n):
+        """n 番目のパズルの解答の 42 セルの値リスト。解答セクションがなければ None"""
+        if not self.has_solutions:
+            return None
+        return decode_cells(self._record(self._solution_offset, n))
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+
+    def __del__(self):
+        # 共有しているカタログが差し替えた古いパックは、読んでいる人がいなくなってから閉じる
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+#############################################
+# CSV との相互変換
+#############################################
+def csv_to_pack(files, filename, with_solutions=False):
+    from hanagram.loader import load_puzzle_from_csv
+    from hanagram.solver import solve
+
+    puzzles = [load_puzzle_from_csv(f) for f in files]
+    solutions = None
+    if with_solutions:
+        solutions = []
+        for f, board in zip(files, puzzles):
+            solution = solve(board)
+            if solution is None:
+                raise ValueError(f"{f}: 解がないため解答セクションを作れません")
+            solutions.append(solution)
+    return write_pack(filename, puzzles, solutions)
+
+
+def pack_to_csv(filename, out_dir, prefix='PACK'):
+    from hanagram.loader import save_puzzle_to_csv
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    with PuzzlePack(filename) as pack:
+        width = max(6, len(str(len(pack))))
+        for n in range(len(pack)):
+            path = os.path.join(out_dir, f"{prefix}_{n + 1:0{width}d}.csv")
+            save_puzzle_to_csv(pack[n], path)
+            written.append(path)
+    return written
+
+
+def main(argv=None):
+    from hanagram.batch import collect_files
+
+    parser = argparse.ArgumentParser(description='パズルパック (.hgp) の作成・展開')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_pack = sub.add_parser('pack', help='CSV をパックにまとめる')
+    p_pack.add_argument('paths', nargs='+', help='パズルのフォルダ / glob / CSV ファイル')
+    p_pack.add_argument('-o', '--output', required=True, help='出力するパックファイル')
+    p_pack.add_argument('--solutions', action='store_true', help='解答セクションも書き出す')
+    p_unpack = sub.add_parser('unpack', help='パックを CSV に展開する')
+    p_unpack.add_argument('pack', help='パックファイル')
+    p_unpack.add_argument('-o', '--output', required=True, help='出力フォルダ')
+    p_unpack.add_argument('--prefix', default='PACK', help='ファイル名の接頭辞')
+    p_info = sub.add_parser('info', help='パックの情報を表示する')
+    p_info.add_argument('pack', help='パックファイル')
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        count = csv_to_pack(collect_files(args.paths), args.output, args.solutions)
+        print(f"{args.output}: {count} 問")
+    elif args.command == 'unpack':
+        written = pack_to_csv(args.pack, args.output, args.prefix)
+        print(f"{args.output}: {len(written)} 問を書き出しました")
+    else:
+        with PuzzlePack(args.pack) as pack:
+            print(f"{args.pack}: {len(pack)} 問 / 解答 {'あり' if pack.has_solutions else 'なし'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
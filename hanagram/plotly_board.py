@@ -0,0 +1,153 @@
+#############################################
+# Plotly 版の盤面図
+#
+# 三角形・重心・ラベルの座標はトポロジー毎に 1 度だけ計算し
+# (プロセス内の全セッションで共有)、再実行毎には色と数字だけを差し替える。
+# トレース構成は固定:
+#   0～3: 塗り色毎の三角形 (fill='toself' の多角形を None 区切りでまとめたもの)
+#   4:    全セル分のマーカー+数字 (クリック判定用、customdata=(行, 列))
+#   5:    ラベル(A～L)
+# 作った Figure は (塗り色, 数字) をキーにキャッシュする。
+#############################################
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from hanagram.geometry import TOPOLOGY, board_appearance
+
+FILL_COLORS = ['white', 'lightblue', 'yellow', 'pink']
+CELL_TRACE = len(FILL_COLORS)
+
+
+class _TopologyTraces:
+    """トポロジー毎の座標とラベルのトレース (1 度だけ作って共有する)"""
+
+    def __init__(self, topology):
+        vertices = topology.cell_vertices
+        # セル毎の閉じた三角形 (x1, x2, x3, x1, None)
+        self.poly_x = [[p[0] for p in pts] + [pts[0][0], None] for pts in vertices]
+        self.poly_y = [[p[1] for p in pts] + [pts[0][1], None] for pts in vertices]
+        self.center_x = [x for x, _ in topology.cell_centroids]
+        self.center_y = [y for _, y in topology.cell_centroids]
+        self.customdata = [list(pos) for pos in topology.cells]
+        self.labels = go.Scatter(
+            x=[x for x, _ in topology.label_coords.values()],
+            y=[y for _, y in topology.label_coords.values()],
+            text=list(topology.label_coords.keys()),
+            mode="text",
+            textfont=dict(size=16, color="red"),
+            hoverinfo="skip",
+            name="labels",
+        )
+
+
+_traces = {TOPOLOGY.size: _TopologyTraces(TOPOLOGY)}
+_traces_lock = threading.Lock()
+
+
+def _get_traces(topology):
+    with _traces_lock:
+        traces = _traces.get(topology.size)
+        if traces is None:
+            traces = _traces[topology.size] = _TopologyTraces(topology)
+        return traces
+
+
+_LAYOUT = go.Layout(
+    width=700,
+    height=700,
+    margin=dict(l=10, r=10, t=10, b=10),
+    plot_bgcolor='white',
+    paper_bgcolor='white',
+    dragmode=False,
+    clickmode='event+select',
+    showlegend=False,
+    xaxis=dict(showgrid=False, zeroline=False, visible=False),
+    yaxis=dict(showgrid=False, zeroline=False, visible=False),
+)
+
+
+def figure_from_appearance(colors, texts, topology=TOPOLOGY):
+    """board_appearance の (塗り色, 数字) から Figure を作る"""
+    traces = _get_traces(topology)
+    poly_x = {color: [] for color in FILL_COLORS}
+    poly_y = {color: [] for color in FILL_COLORS}
+    for idx, color in enumerate(colors):
+        poly_x[color].extend(traces.poly_x[idx])
+        poly_y[color].extend(traces.poly_y[idx])
+
+    data = [
+        go.Scatter(
+            x=poly_x[color],
+            y=poly_y[color],
+            mode="lines",
+            fill="toself",
+            fillcolor=color,
+            line=dict(color="black", width=1),
+            hoverinfo="skip",
+            name=f"cells_{color}",
+        )
+        for color in FILL_COLORS
+    ]
+    data.append(go.Scatter(
+        x=traces.center_x,
+        y=traces.center_y,
+        text=list(texts),
+        mode="markers+text",  # 大きな円＋テキスト
+        marker=dict(size=30, color="rgba(255,0,0,0.3)"),  # 赤い半透明マーカー
+        textfont=dict(size=16, color="black"),
+        textposition="middle center",
+        name="cells",
+        customdata=traces.customdata,
+        hoverinfo="none",
+    ))
+    data.append(traces.labels)
+    return go.Figure(data=data, layout=_LAYOUT)
+
+
+#############################################
+# プロセス共有の Figure キャッシュ
+#############################################
+FIGURE_CACHE_SIZE = 256
+
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def build_board_figure(board_values, selected_pos, initial_board_values,
+                       puzzle_completed=False, highlight_digits=None, use_cache=True,
+                       topology=TOPOLOGY):
+    """盤面の Figure。キャッシュを共有しているので呼び出し側で書き換えないこと"""
+    # セル数が違えばキーの長さも違うので、トポロジーが違う盤面のキーは衝突しない
+    key = board_appearance(board_values, selected_pos, initial_board_values,
+                           puzzle_completed, highlight_digits, topology)
+    if use_cache:
+        with _figure_cache_lock:
+            fig = _figure_cache.get(key)
+            if fig is not None:
+                _figure_cache.move_to_end(key)
+                return fig
+    fig = figure_from_appearance(*key, topology)
+    if use_cache:
+        with _figure_cache_lock:
+            _figure_cache[key] = fig
+            while len(_figure_cache) > FIGURE_CACHE_SIZE:
+                _figure_cache.popitem(last=False)
+    return fig
+
+
+def clicked_cell_from_events(selected_points, topology=TOPOLOGY):
+    """plotly_events の戻り値からクリックされたセル (行, 列) を取り出す"""
+    if not selected_points:
+        return None
+    event = selected_points[-1]
+    customdata = event.get('customdata')
+    if isinstance(customdata, (list, tuple)) and len(customdata) == 2:
+        return (customdata[0], customdata[1])
+    # customdata を返さないバージョンでは点の番号から引く
+    if event.get('curveNumber') == CELL_TRACE:
+        point = event.get('pointIndex', event.get('pointNumber'))
+        if point is not None and 0 <= point < topology.num_cells:
+            return topology.cells[point]
+    return None
@@ -0,0 +1,137 @@
+#############################################
+# 再実行毎の処理時間の計測 (既定では無効)
+#
+# 環境変数 HANAGRAM_PROFILE=1 か、URL のクエリ ?profile=1 で有効になる。
+#   - PhaseTimer.phase(名前) で囲んだ区間を perf_counter_ns で計測する
+#   - finish() で 1 再実行分の記録を JSONL に追記する
+#     (HANAGRAM_PROFILE_LOG、既定 logs/timing.jsonl。LOG_MAX_BYTES でローテーション)
+#   - start_profile() / dump_profile() で 1 再実行分の cProfile を .prof に保存する
+#     (HANAGRAM_PROFILE_DIR、既定 logs/profiles)
+# streamlit には依存しない。表示はアプリ側で行う。
+#############################################
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+ENV_VAR = 'HANAGRAM_PROFILE'
+LOG_ENV_VAR = 'HANAGRAM_PROFILE_LOG'
+PROFILE_DIR_ENV_VAR = 'HANAGRAM_PROFILE_DIR'
+DEFAULT_LOG = os.path.join('logs', 'timing.jsonl')
+DEFAULT_PROFILE_DIR = os.path.join('logs', 'profiles')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+
+
+def profiling_enabled(query_value=None):
+    """環境変数かクエリパラメータ (profile=1 など) で計測が有効になっているか"""
+    if os.environ.get(ENV_VAR, '').lower() in _TRUE_VALUES:
+        return True
+    return str(query_value).lower() in _TRUE_VALUES
+
+
+class PhaseTimer:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = []          # [(名前, ミリ秒)] 計測順
+        self.started = time.time()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter_ns() - start) / 1e6)
+
+    def add(self, name, ms):
+        if self.enabled:
+            self.phases.append((name, ms))
+
+    def total_ms(self):
+        return sum(ms for _, ms in self.phases)
+
+    def record(self, label, **extra):
+        record = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'label': label,
+            'phases': [{'phase': name, 'ms': round(ms, 3)} for name, ms in self.phases],
+            'total_ms': round(self.total_ms(), 3),
+        }
+        record.update(extra)
+        return record
+
+    def finish(self, label, **extra):
+        """1 再実行分の記録を JSONL に書き出して返す (無効なら None)"""
+        if not self.enabled:
+            return None
+        record = self.record(label, **extra)
+        log_record(record)
+        return record
+
+
+#############################################
+# JSONL ログ (プロセス内で 1 つのローテーションするハンドラを共有)
+#############################################
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _get_logger():
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            path = os.environ.get(LOG_ENV_VAR, DEFAULT_LOG)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES,
+                                          backupCount=LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('hanagram.timing')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+def log_record(record):
+    _get_logger().info(json.dumps(record, ensure_ascii=False))
+
+
+#############################################
+# cProfile (1 再実行分)
+#############################################
+def start_profile():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def dump_profile(profiler, label='rerun'):
+    """計測を止めて .prof を保存し、そのパスを返す (snakeviz などで開ける)"""
+    profiler.disable()
+    directory = os.environ.get(PROFILE_DIR_ENV_VAR, DEFAULT_PROFILE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{label}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.prof")
+    profiler.dump_stats(path)
+    return path
+
+
+def profile_summary(profiler, limit=20):
+    """累積時間の上位 limit 件のテキスト"""
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,247 @@
+#############################################
+# プレイヤー毎・パズル毎の進行状況を SQLite (WAL) に保存する
+#
+# - save() は最新の状態をメモリ上の待ち行列 (キー毎に最新の 1 件だけ) に置いて
+#   すぐ戻る。書き込みは専用スレッドが FLUSH_INTERVAL 秒毎 (か MAX_PENDING 件
+#   たまったとき) に 1 トランザクションでまとめて行うので、入力が待つことはない
+# - load() はまだ書いていない分を先に見て、なければ主キー検索 1 回で読む。
+#   player だけ渡すと最後に保存したパズル ((player, updated) の索引で 1 回)
+# - WAL なので同じファイルを開いた別プロセス (同じマシンの別ワーカー) の
+#   書き込み中も読める。プロセスの終了時 (atexit) に残りを書き出す
+# - 書き込みに失敗したら (別プロセスの書き込みは BUSY_TIMEOUT まで待った上で) 書き込み
+#   スレッドを止め、以後の save() / flush() は ProgressError を送出する。
+#   書けなかった行は load() からは見え続ける
+# パズルは初期盤面の canonical.puzzle_hash で区別する (回転したパズルは別扱い)。
+# streamlit には依存しない。
+#############################################
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from hanagram.board import Board
+from hanagram.canonical import puzzle_hash
+from hanagram.history import MoveHistory
+
+ENV_VAR = 'HANAGRAM_PROGRESS_DB'
+DEFAULT_DB = os.path.join('data', 'progress.sqlite')
+FLUSH_INTERVAL = 0.2      # 秒
+MAX_PENDING = 1000        # これだけたまったら間隔を待たずに書く
+BUSY_TIMEOUT = 5000       # ミリ秒 (別プロセスが書き込み中のときに待つ上限)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    player TEXT NOT NULL,
+    puzzle TEXT NOT NULL,
+    source TEXT,
+    givens INTEGER NOT NULL,
+    initial BLOB NOT NULL,
+    board BLOB NOT NULL,
+    history BLOB NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (player, puzzle)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS progress_recent ON progress(player, updated);
+"""
+
+_COLUMNS = "player, puzzle, source, givens, initial, board, history, updated"
+_UPSERT = f"INSERT OR REPLACE INTO progress ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+# 復元した進行状況。initial は凍結済み、board はその clone() に入力を反映したもの
+Progress = namedtuple('Progress', ['puzzle', 'source', 'initial', 'board', 'history', 'updated'])
+
+
+class ProgressError(RuntimeError):
+    """書き込みスレッドが失敗した (原因は __cause__)"""
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+    return conn
+
+
+def snapshot(player, initial, board, history, source=None):
+    """保存する 1 行 (呼び出し側の盤面・履歴がこの後変わってもよいようにバイト列にする)"""
+    initial_bytes = initial.to_bytes()
+    return (player, puzzle_hash(initial.values()), source, initial.givens, initial_bytes,
+            board.to_bytes(), history.to_bytes(), time.time())
+
+
+def _restore(row):
+    puzzle, source, givens, initial_bytes, board_bytes, history_bytes, updated = row
+    initial = Board(initial_bytes, givens).freeze()
+    board = Board(board_bytes, givens)
+    return Progress(puzzle, source, initial, board, MoveHistory.from_bytes(history_bytes), updated)
+
+
+class ProgressStore:
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._writer_conn = _connect(path)
+        self._writer_conn.executescript(SCHEMA)
+        self._reader_conn = _connect(path)
+        self._read_lock = threading.Lock()
+
+        self._pending = {}               # (player, puzzle) → snapshot の行
+        self._inflight = {}              # 書き込み中の行 (書き終えるまで load() から見えるように)
+        self._cond = threading.Condition()
+        self._queued = 0                 # これまでに save() した件数
+        self._written = 0                # そのうち書き終えた (か新しい行に置き換わった) 件数
+        self.rows_written = 0            # 実際に書いた行数 (統計用)
+        self.flushes = 0
+        self._flush_requested = False
+        self._closed = False
+        self._error = None               # 書き込みスレッドが止まった原因の例外
+        self._thread = threading.Thread(target=self._run, name='hanagram-progress', daemon=True)
+        self._thread.start()
+
+    #############################################
+    # 書き込み (呼び出し側は待たない)
+    #############################################
+    def save(self, player, initial, board, history, source=None):
+        self.save_row(snapshot(player, initial, board, history, source))
+
+    def _raise_error(self):
+        raise ProgressError(f"{self.path}: 進行状況を書き込めません "
+                            f"({type(self._error).__name__}: {self._error})") from self._error
+
+    def save_row(self, row):
+        with self._cond:
+            if self._error is not None:
+                self._raise_error()
+            if self._closed:
+                raise RuntimeError("閉じた ProgressStore には保存できません")
+            self._pending[(row[0], row[1])] = row
+            self._queued += 1
+            if len(self._pending) >= self.max_pending:
+                self._cond.notify_all()
+
+    def _flush_due(self):
+        return self._closed or self._flush_requested or len(self._pending) >= self.max_pending
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # 間隔を空けて、その間の保存を 1 回の書き込みにまとめる
+                self._cond.wait_for(self._flush_due, self.flush_interval)
+                rows = list(self._pending.values())
+                queued = self._queued
+                closed = self._closed
+                self._inflight = self._pending
+                self._pending = {}
+                self._flush_requested = False
+            if rows:
+                try:
+                    with self._writer_conn:
+                        self._writer_conn.executemany(_UPSERT, rows)
+                except Exception as e:
+                    # 書けなかった行は (もっと新しい保存がなければ) 戻して load() から見えるようにし、
+                    # 失敗を記録して止まる (待っている flush() は起こして例外にする)
+                    with self._cond:
+                        for row in rows:
+                            self._pending.setdefault((row[0], row[1]), row)
+                        self._inflight = {}
+                        self._error = e
+                        self._cond.notify_all()
+                    return
+            with self._cond:
+                self._inflight = {}
+                self._written = queued
+                self.rows_written += len(rows)
+                self.flushes += bool(rows)
+                self._cond.notify_all()
+                if closed and not self._pending:
+                    return
+
+    def flush(self, timeout=None):
+        """ここまでの save() がディスクに書かれるまで待つ。書けたら True、
+        時間切れなら False、書き込みに失敗していたら ProgressError"""
+        with self._cond:
+            target = self._queued
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._written >= target or self._error is not None, timeout)
+            if self._written >= target:
+                return True
+            if self._error is not None:
+                self._raise_error()
+            return False
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._writer_conn.close()
+        self._reader_conn.close()
+        if self._error is not None and self._pending:
+            sys.stderr.write(f"{self.path}: 進行状況 {len(self._pending)} 件を書き込めませんでした "
+                             f"({type(self._error).__name__}: {self._error})\n")
+
+    #############################################
+    # 読み出し
+    #############################################
+    def load(self, player, puzzle=None):
+        """(player, puzzle) の進行状況。puzzle=None なら最後に保存したパズル。なければ None"""
+        with self._cond:
+            if puzzle is not None:
+                row = self._pending.get((player, puzzle)) or self._inflight.get((player, puzzle))
+            else:
+                rows = [row for queue in (self._pending, self._inflight)
+                        for (p, _), row in queue.items() if p == player]
+                row = max(rows, key=lambda row: row[7]) if rows else None
+        if row is not None:
+            return _restore(row[1:])
+        with self._read_lock:
+            if puzzle is not None:
+                row = self._reader_conn.execute(
+                    "SELECT puzzle, source, givens, initial, board, history, updated FROM progress "
+                    "WHERE player = ? AND puzzle = ?", (player, puzzle)).fetchone()
+            else:
+                row = self._reader_conn.execute(
+                    "SELECT puzzle, source, givens, initial, board, history, updated FROM progress "
+                    "WHERE player = ? ORDER BY updated DESC LIMIT 1", (player,)).fetchone()
+        return None if row is None else _restore(row)
+
+    def __len__(self):
+        with self._read_lock:
+            return self._reader_conn.execute("SELECT COUNT(*) FROM progress").fetchone()[0]
+
+
+#############################################
+# パスごとにプロセス内で 1 つだけ作る (書き込みスレッドも 1 本)
+#############################################
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=None):
+    """path=None なら環境変数 HANAGRAM_PROGRESS_DB (なければ data/progress.sqlite)"""
+    path = os.path.abspath(path or os.environ.get(ENV_VAR) or DEFAULT_DB)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ProgressStore(path)
+    return store
+
+
+@atexit.register
+def _close_all():
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
@@ -0,0 +1,150 @@
+#############################################
+# 読み込んだパズルの解答・候補をバックグラウンドで計算して共有する
+#
+# - submit(values) で共有のスレッドプールに求解を投げ、キー (canonical.puzzle_hash) を返す
+# - 結果 (解答と初期盤面の各セルの候補) はキー毎にプロセス内でキャッシュし、
+#   同じパズルを開いた他のセッションもそのまま使う (SOLVE_CACHE_SIZE 件を超えたら LRU で捨てる)
+# - 同じパズルの計算中に submit されたら同じ Future を共有し、参照数を数える
+# - release(key) で参照を外し、誰も待っていなければ計算を止める
+#   (まだ始まっていなければ Future.cancel()、探索中なら分岐毎に見るフラグで打ち切る)
+# streamlit には依存しない。
+#############################################
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from hanagram.canonical import puzzle_hash
+from hanagram.solver import candidate_cells, solve_cells
+
+SOLVE_CACHE_SIZE = 256
+SOLVER_WORKERS = 2
+
+# solution: 42 セルの解 (解なしなら None)、candidates: 初期盤面の各セルの候補数字 (矛盾があれば None)
+SolveResult = namedtuple('SolveResult', ['solution', 'candidates'])
+
+
+class Cancelled(Exception):
+    pass
+
+
+_results = OrderedDict()   # キー → SolveResult (LRU)
+_pending = {}              # キー → [Future, 打ち切りフラグ, 参照数]
+_lock = threading.Lock()
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=SOLVER_WORKERS,
+                                       thread_name_prefix='hanagram-solve')
+    return _executor
+
+
+def _compute(values, cancel_event):
+    def order(digits):
+        # 探索の分岐毎に呼ばれるので、ここで打ち切りを確認する
+        if cancel_event.is_set():
+            raise Cancelled
+        return digits
+
+    solution = solve_cells(values, order)
+    cands = candidate_cells(values)
+    return SolveResult(None if solution is None else tuple(solution),
+                       None if cands is None else tuple(map(tuple, cands)))
+
+
+def _store(key, result):
+    # _lock を持った状態で呼ぶ
+    _results[key] = result
+    _results.move_to_end(key)
+    while len(_results) > SOLVE_CACHE_SIZE:
+        _results.popitem(last=False)
+
+
+def _finish(key, future):
+    with _lock:
+        entry = _pending.get(key)
+        if entry is not None and entry[0] is future:
+            del _pending[key]
+        if future.cancelled() or isinstance(future.exception(), Cancelled):
+            return
+        if future.exception() is None:
+            _store(key, future.result())
+
+
+def submit(values):
+    """求解をバックグラウンドで始めてキーを返す (計算済み・計算中なら何もしない)"""
+    values = tuple(values)
+    key = puzzle_hash(values)
+    with _lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return key
+        entry = _pending.get(key)
+        if entry is not None:
+            entry[2] += 1
+            return key
+        cancel_event = threading.Event()
+        future = _get_executor().submit(_compute, values, cancel_event)
+        _pending[key] = [future, cancel_event, 1]
+    # 既に終わっていればこの場で呼ばれるので、ロックの外で登録する
+    future.add_done_callback(lambda f: _finish(key, f))
+    return key
+
+
+def release(key):
+    """submit() の参照を外す。誰も待っていなければ計算を打ち切る"""
+    with _lock:
+        entry = _pending.get(key)
+        if entry is None:
+            return
+        entry[2] -= 1
+        if entry[2] > 0:
+            return
+        del _pending[key]
+    future, cancel_event, _ = entry
+    cancel_event.set()
+    future.cancel()
+
+
+def get(key, timeout=0):
+    """計算済みなら SolveResult、まだなら timeout 秒まで待って、それでもなければ None"""
+    if key is None:
+        return None
+    with _lock:
+        result = _results.get(key)
+        if result is not None:
+            _results.move_to_end(key)
+            return result
+        entry = _pending.get(key)
+    if entry is None:
+        return None
+    try:
+        return entry[0].result(timeout)
+    except (FutureTimeoutError, CancelledError, Cancelled):
+        return None
+
+
+def result(values):
+    """values の SolveResult を返す (計算中なら待ち、なければこの場で計算する)"""
+    values = tuple(values)
+    key = puzzle_hash(values)
+    found = get(key, timeout=None)
+    if found is not None:
+        return found
+    found = _compute(values, threading.Event())
+    with _lock:
+        _store(key, found)
+    return found
+
+
+def conflicts(values, solution):
+    """入力済みで解と食い違うセル番号のリスト"""
+    return [idx for idx, (val, ans) in enumerate(zip(values, solution))
+            if val is not None and val != ans]
+
+
+def clear():
+    with _lock:
+        _results.clear()
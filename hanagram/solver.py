@@ -0,0 +1,239 @@
+#############################################
+# ソルバー (セル候補ビットマスク + 制約伝播 + MRV 探索)
+# 公開関数は topology= で大きい盤面 (topology.get_topology(size)) も解ける。
+# 省略時は従来の 42 セルの盤面
+#############################################
+from hanagram.geometry import TOPOLOGY, cells
+
+ALL_DIGITS = (1 << 10) - 1
+
+# 10bit マスク → 立っているビット数 / 数字リスト
+POPCOUNT = [bin(mask).count('1') for mask in range(1 << 10)]
+MASK_DIGITS = [[d for d in range(10) if mask >> d & 1] for mask in range(1 << 10)]
+
+
+class Contradiction(Exception):
+    pass
+
+
+class _MaskTable(dict):
+    """数字が 10 種類を超える盤面用: マスク → 値 を必要になったときに計算して覚える"""
+
+    def __init__(self, compute):
+        super().__init__()
+        self.compute = compute
+
+    def __missing__(self, mask):
+        value = self[mask] = self.compute(mask)
+        return value
+
+
+class _Rules:
+    """トポロジー毎の探索用の表"""
+
+    def __init__(self, topology):
+        self.num_cells = topology.num_cells
+        self.num_lines = topology.num_lines
+        self.line_cells = topology.line_cells
+        self.cell_lines = topology.cell_lines
+        num_digits = topology.num_digits
+        self.all_digits = (1 << num_digits) - 1
+        if num_digits <= 10:
+            self.popcount = POPCOUNT
+            self.mask_digits = MASK_DIGITS
+        else:
+            self.popcount = _MaskTable(int.bit_count)
+            self.mask_digits = _MaskTable(
+                lambda mask: [d for d in range(num_digits) if mask >> d & 1])
+
+
+_DEFAULT_RULES = _Rules(TOPOLOGY)
+_rules = {TOPOLOGY.size: _DEFAULT_RULES}
+
+
+def _get_rules(topology):
+    if topology is None:
+        return _DEFAULT_RULES
+    rules = _rules.get(topology.size)
+    if rules is None:
+        rules = _rules.setdefault(topology.size, _Rules(topology))
+    return rules
+
+
+def grid_to_cells(board_values, topology=None):
+    return [board_values[r][c] for (r, c) in (topology.cells if topology else cells)]
+
+
+def cells_to_grid(values, topology=None):
+    topology = topology or TOPOLOGY
+    grid = topology.empty_grid()
+    for idx, (r, c) in enumerate(topology.cells):
+        grid[r][c] = values[idx]
+    return grid
+
+
+def _line_masks(values, rules):
+    """ライン毎の使用済み数字マスク (重複があれば Contradiction)"""
+    masks = [0] * rules.num_lines
+    for l_idx, line in enumerate(rules.line_cells):
+        mask = 0
+        for idx in line:
+            val = values[idx]
+            if val is None:
+                continue
+            bit = 1 << val
+            if mask & bit:
+                raise Contradiction
+            mask |= bit
+        masks[l_idx] = mask
+    return masks
+
+
+def _place(values, masks, idx, digit, cell_lines):
+    bit = 1 << digit
+    for l_idx in cell_lines[idx]:
+        if masks[l_idx] & bit:
+            raise Contradiction
+        masks[l_idx] |= bit
+    values[idx] = digit
+
+
+def _propagate(values, masks, rules):
+    """確定できるセルを埋め続け、空きセル → 候補マスク を返す
+
+    - naked single: 候補が 1 つしかないセル
+    - hidden single: ラインの候補数字の合計が空きセル数と等しい (= 欠ける数字が既に決まっている)
+      とき、その中で 1 セルにしか入らない数字
+    """
+    cell_lines = rules.cell_lines
+    all_digits = rules.all_digits
+    popcount = rules.popcount
+    mask_digits = rules.mask_digits
+    cell_range = range(rules.num_cells)
+    while True:
+        cands = {}
+        progress = False
+        for idx in cell_range:
+            if values[idx] is not None:
+                continue
+            used = 0
+            for l_idx in cell_lines[idx]:
+                used |= masks[l_idx]
+            cand = all_digits & ~used
+            if not cand:
+                raise Contradiction
+            if popcount[cand] == 1:
+                _place(values, masks, idx, mask_digits[cand][0], cell_lines)
+                progress = True
+            else:
+                cands[idx] = cand
+        if progress:
+            continue
+
+        for line in rules.line_cells:
+            empty = [idx for idx in line if idx in cands]
+            if not empty:
+                continue
+            union = 0
+            once = 0
+            twice = 0
+            for idx in empty:
+                cand = cands[idx]
+                twice |= once & cand
+                once |= cand
+                union |= cand
+            n_union = popcount[union]
+            if n_union < len(empty):
+                raise Contradiction
+            if n_union != len(empty):
+                continue
+            singles = once & ~twice
+            for idx in empty:
+                hit = cands[idx] & singles
+                if hit:
+                    if popcount[hit] > 1:
+                        raise Contradiction
+                    _place(values, masks, idx, mask_digits[hit][0], cell_lines)
+                    progress = True
+            if progress:
+                break
+        if not progress:
+            return cands
+
+
+def _search(values, masks, rules, order=None):
+    cands = _propagate(values, masks, rules)
+    if not cands:
+        yield values
+        return
+    # MRV: 候補が最も少ないセルから分岐
+    popcount = rules.popcount
+    idx = min(cands, key=lambda i: popcount[cands[i]])
+    digits = rules.mask_digits[cands[idx]]
+    if order is not None:
+        digits = order(digits)
+    for digit in digits:
+        next_values = values[:]
+        next_masks = masks[:]
+        try:
+            _place(next_values, next_masks, idx, digit, rules.cell_lines)
+            yield from _search(next_values, next_masks, rules, order)
+        except Contradiction:
+            continue
+
+
+def iter_solutions(values, order=None, topology=None):
+    """42 セルの値リスト (None=空) から解を順に生成する"""
+    rules = _get_rules(topology)
+    values = list(values)
+    try:
+        masks = _line_masks(values, rules)
+    except Contradiction:
+        return
+    try:
+        yield from _search(values, masks, rules, order)
+    except Contradiction:
+        return
+
+
+def solve_cells(values, order=None, topology=None):
+    for solution in iter_solutions(values, order, topology):
+        return solution
+    return None
+
+
+def solve(board_values, topology=None):
+    """6×9 の盤面を解いて 6×9 の解を返す (解なしなら None)"""
+    solution = solve_cells(grid_to_cells(board_values, topology), topology=topology)
+    if solution is None:
+        return None
+    return cells_to_grid(solution, topology)
+
+
+def candidate_cells(values, topology=None):
+    """42 セルの各候補数字のリスト (矛盾があれば None)。制約伝播で確定したセルは 1 候補になる"""
+    rules = _get_rules(topology)
+    values = list(values)
+    try:
+        masks = _line_masks(values, rules)
+        cands = _propagate(values, masks, rules)
+    except Contradiction:
+        return None
+    return [rules.mask_digits[cands[idx]] if idx in cands else [values[idx]]
+            for idx in range(rules.num_cells)]
+
+
+def candidates(board_values, topology=None):
+    """各セルの候補数字 ((行, 列) → 数字リスト)。制約伝播で確定したセルは 1 候補になる"""
+    result = candidate_cells(grid_to_cells(board_values, topology), topology)
+    if result is None:
+        return None
+    return dict(zip(topology.cells if topology else cells, result))
+
+
+def hint(board_values, r, c, topology=None):
+    """(r, c) に入る数字を返す (盤面が解けない場合は None)"""
+    solution = solve(board_values, topology)
+    if solution is None:
+        return None
+    return solution[r][c]
@@ -0,0 +1,137 @@
+#############################################
+# 差分更新型の盤面状態 (ライン毎の数字ビットマスク + 重複カウンタ)
+#############################################
+from hanagram.geometry import (
+    NUM_CELLS, NUM_LINES, cells, cell_index, cell_lines, line_cells, line_names,
+)
+
+
+class BoardState:
+    """1セルの更新でそのセルを通る 2～3 本のラインだけを O(1) で更新する盤面状態
+
+    - values:       セル番号(0～41) → 数字 or None
+    - line_masks:   ライン毎に出現している数字の 10bit マスク
+    - line_dups:    ライン毎の重複数 (同じ数字の 2 個目以降の個数)
+    - line_filled:  ライン毎の埋まっているセル数
+    """
+
+    def __init__(self):
+        self.values = [None] * NUM_CELLS
+        self.line_masks = [0] * NUM_LINES
+        self.line_dups = [0] * NUM_LINES
+        self.line_filled = [0] * NUM_LINES
+        # ライン l の数字 d の出現数は counts[l*10 + d]
+        self.counts = [0] * (NUM_LINES * 10)
+        self.dup_lines = 0         # 重複を含むライン数
+        self.completed_lines = 0   # 9 セル埋まり重複なしのライン数
+
+    @classmethod
+    def from_cells(cls, values):
+        state = cls()
+        for idx, val in enumerate(values):
+            if val is not None:
+                state.set(idx, val)
+        return state
+
+    @classmethod
+    def from_grid(cls, board_values):
+        return cls.from_cells([board_values[r][c] for (r, c) in cells])
+
+    def to_grid(self):
+        grid = [[None]*9 for _ in range(6)]
+        for idx, (r, c) in enumerate(cells):
+            grid[r][c] = self.values[idx]
+        return grid
+
+    def copy(self):
+        other = BoardState.__new__(BoardState)
+        other.values = self.values[:]
+        other.line_masks = self.line_masks[:]
+        other.line_dups = self.line_dups[:]
+        other.line_filled = self.line_filled[:]
+        other.counts = self.counts[:]
+        other.dup_lines = self.dup_lines
+        other.completed_lines = self.completed_lines
+        return other
+
+    #############################################
+    # 更新
+    #############################################
+    def _line_status(self, l_idx):
+        has_dup = self.line_dups[l_idx] > 0
+        completed = self.line_filled[l_idx] == 9 and not has_dup
+        return has_dup, completed
+
+    def set(self, idx, value):
+        old = self.values[idx]
+        if old == value:
+            return
+        self.values[idx] = value
+        counts = self.counts
+        for l_idx in cell_lines[idx]:
+            had_dup, was_completed = self._line_status(l_idx)
+            base = l_idx * 10
+            if old is not None:
+                counts[base + old] -= 1
+                n = counts[base + old]
+                if n == 0:
+                    self.line_masks[l_idx] &= ~(1 << old)
+                else:
+                    self.line_dups[l_idx] -= 1
+                self.line_filled[l_idx] -= 1
+            if value is not None:
+                n = counts[base + value]
+                if n == 0:
+                    self.line_masks[l_idx] |= 1 << value
+                else:
+                    self.line_dups[l_idx] += 1
+                counts[base + value] = n + 1
+                self.line_filled[l_idx] += 1
+            has_dup, completed = self._line_status(l_idx)
+            self.dup_lines += has_dup - had_dup
+            self.completed_lines += completed - was_completed
+
+    def set_cell(self, r, c, value):
+        self.set(cell_index[(r, c)], value)
+
+    def get_cell(self, r, c):
+        return self.values[cell_index[(r, c)]]
+
+    #############################################
+    # 判定結果の読み出し
+    #############################################
+    @property
+    def has_duplicates(self):
+        return self.dup_lines > 0
+
+    @property
+    def is_completed(self):
+        return self.completed_lines == NUM_LINES
+
+    def duplicate_lines(self):
+        return [l_idx for l_idx in range(NUM_LINES) if self.line_dups[l_idx]]
+
+    def duplicate_digits(self, l_idx):
+        # 表示順を参照実装と揃えるためライン上の並び順で集める
+        base = l_idx * 10
+        values = self.values
+        return set([values[idx] for idx in line_cells[l_idx]
+                    if values[idx] is not None and self.counts[base + values[idx]] > 1])
+
+    def duplicate_info(self):
+        dup_info = []
+        for l_idx in self.duplicate_lines():
+            direction, d_idx = line_names[l_idx]
+            dup_info.append(f"{direction} - 列{d_idx+1} 重複: {self.duplicate_digits(l_idx)}")
+        return dup_info
+
+    def check_duplicates(self):
+        """validation.check_duplicates と同じ (dup_found, dup_info) を返す"""
+        return self.has_duplicates, self.duplicate_info()
+
+    def duplicate_cells(self):
+        dup_cells = set()
+        for l_idx in self.duplicate_lines():
+            digits = self.duplicate_digits(l_idx)
+            dup_cells.update(idx for idx in line_cells[l_idx] if self.values[idx] in digits)
+        return dup_cells
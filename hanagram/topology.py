@@ -0,0 +1,208 @@
+#############################################
+# 大きさを指定して盤面トポロジーを作る
+#
+# 盤面は三角格子の「一辺 size の正六角形」から、外周の帯に 2 方向とも
+# 含まれる角の三角形 (各角 2 個) を除いたもの。size=3 が従来の 42 セルの盤面。
+#   - 3 方向それぞれ 2*size 本の帯があり、外側の 2 本を除いた 2*size-2 本がライン
+#   - 各セルは 2～3 本のラインに属する (外周の帯に入るのは高々 1 方向)
+#   - 数字は 0 ～ (最長ラインのセル数) の num_digits 種類 (size=3 なら 9 セル・0～9)
+# 三角格子の座標: 頂点 (i, j) の位置は x = i + j/2, y = j*HEIGHT。
+#   上向き三角形 (i, j) の頂点は (i, j), (i+1, j), (i, j+1)、
+#   下向き三角形 (i, j) の頂点は (i+1, j), (i, j+1), (i+1, j+1)。
+#   帯の番号は 右上→左下 = i、右下→左上 = i+j (下向きは i+j+1)、横 = j。
+# セル・ライン・隣接・ラベル位置・対称性などの表は作成時に 1 度だけ計算する
+# (いずれもセル数に比例する手間)。
+#############################################
+import math
+from string import ascii_uppercase
+
+HEIGHT = 3 ** 0.5 / 2
+
+# 方向名 (メッセージ・combos のキー)。帯番号のタプルもこの順
+DIRECTIONS = ('斜め_右上から左下', '斜め_右下から左上', '横方向_左から右')
+
+# ラベルをラインの先頭セルの重心からどれだけ離すか (セルの辺の長さ単位)
+LABEL_DISTANCE = 0.75
+
+
+def line_label(n):
+    """0, 1, ..., 25, 26, ... → A, B, ..., Z, AA, ..."""
+    label = ''
+    n += 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        label = ascii_uppercase[rem] + label
+    return label
+
+
+class Topology:
+    def __init__(self, size=3):
+        if size < 2:
+            raise ValueError(f"size は 2 以上にしてください: {size}")
+        self.size = size
+        n_strips = 2 * size
+        outer = {0, n_strips - 1}
+
+        # 1) 六角形内の三角形を列挙し、角 (外周の帯に 2 方向入るもの) を除く
+        #    i は -size から数えると右上→左下・右下→左上の帯番号も 0 ～ 2*size-1 になる
+        triangles = []                 # (行, 列の元になる 2x, 上向きか, 3 方向の帯番号)
+        for j in range(n_strips):
+            for i in range(-size, n_strips):
+                for up in (True, False):
+                    strips = (i + size, i + j + (0 if up else 1), j)
+                    if all(0 <= s < n_strips for s in strips) \
+                            and sum(s in outer for s in strips) <= 1:
+                        # 三角形の左端の x は i + j/2 (下向きは + 1/2)
+                        triangles.append((n_strips - 1 - j, 2 * i + j + (0 if up else 1), up, strips))
+
+        # 2) (行, 列) に並べる。行は上から、列は左端の x を 0.5 刻みで数える
+        min_col = min(col for _, col, _, _ in triangles)
+        positions = sorted(((r, col - min_col), up, strips) for r, col, up, strips in triangles)
+        self.num_rows = n_strips
+        self.num_cols = max(c for (_, c), _, _ in positions) + 1
+
+        self.board_structure = [['N'] * self.num_cols for _ in range(self.num_rows)]
+        for (r, c), up, _ in positions:
+            self.board_structure[r][c] = 'U' if up else 'D'
+
+        # セル番号 ⇔ (行, 列)
+        self.cells = [pos for pos, _, _ in positions]
+        self.cell_index = {pos: idx for idx, pos in enumerate(self.cells)}
+        self.num_cells = len(self.cells)
+        cell_strips = [strips for _, _, strips in positions]
+
+        # 3) ライン: 方向毎に外周以外の帯。並び順は従来の A～L と同じ
+        #    右上→左下: 帯の番号の小さい順、セルは上から (同じ行では右から)
+        #    右下→左上: 帯の番号の大きい順、セルは下から (同じ行では右から)
+        #    横:        下の行から、セルは左から
+        by_strip = [{} for _ in DIRECTIONS]
+        for idx, strips in enumerate(cell_strips):
+            for d, s in enumerate(strips):
+                if s not in outer:
+                    by_strip[d].setdefault(s, []).append(idx)
+        cell_order = (
+            lambda idx: (self.cells[idx][0], -self.cells[idx][1]),
+            lambda idx: (-self.cells[idx][0], -self.cells[idx][1]),
+            lambda idx: self.cells[idx][1],
+        )
+        strip_order = (
+            lambda s: s,
+            lambda s: -s,
+            lambda s: s,            # 横の帯番号 j は下から数える
+        )
+        self.line_labels = []
+        self.line_cells = []
+        self.line_directions = {}
+        for d, direction in enumerate(DIRECTIONS):
+            labels = []
+            for s in sorted(by_strip[d], key=strip_order[d]):
+                label = line_label(len(self.line_labels))
+                self.line_labels.append(label)
+                self.line_cells.append(tuple(sorted(by_strip[d][s], key=cell_order[d])))
+                labels.append(label)
+            self.line_directions[direction] = labels
+        self.num_lines = len(self.line_cells)
+        self.lines_map = {label: [self.cells[idx] for idx in line]
+                          for label, line in zip(self.line_labels, self.line_cells)}
+        self.line_length = max(len(line) for line in self.line_cells)
+        self.num_digits = self.line_length + 1
+        self.digits = list(range(self.num_digits))
+
+        # セル番号 → そのセルを通るライン番号 / ライン番号 → (方向名, 方向内の番号)
+        cell_lines = [[] for _ in range(self.num_cells)]
+        for l_idx, line in enumerate(self.line_cells):
+            for idx in line:
+                cell_lines[idx].append(l_idx)
+        self.cell_lines = [tuple(lines) for lines in cell_lines]
+        self.line_names = {}
+        for direction, labels in self.line_directions.items():
+            for d_idx, label in enumerate(labels):
+                self.line_names[self.line_labels.index(label)] = (direction, d_idx)
+
+        # 4) 描画用の頂点・重心 (一番下の行が y=0、左端の列が x=0)
+        self.cell_vertices = [self.triangle_vertices(r, c) for (r, c) in self.cells]
+        self.cell_centroids = [(sum(p[0] for p in pts) / 3.0, sum(p[1] for p in pts) / 3.0)
+                               for pts in self.cell_vertices]
+
+        # 5) 辺を共有するセル (隣接)
+        edges = {}
+        for idx, pts in enumerate(self.cell_vertices):
+            keys = [(round(x * 2), round(y / HEIGHT)) for x, y in pts]
+            for a in range(3):
+                edge = tuple(sorted((keys[a], keys[(a + 1) % 3])))
+                edges.setdefault(edge, []).append(idx)
+        neighbors = [[] for _ in range(self.num_cells)]
+        for members in edges.values():
+            if len(members) == 2:
+                a, b = members
+                neighbors[a].append(b)
+                neighbors[b].append(a)
+        self.cell_neighbors = [tuple(sorted(n)) for n in neighbors]
+
+        # 6) ラベル: ラインの先頭セルから、ラインと逆向きに LABEL_DISTANCE だけ離す
+        self.label_coords = {}
+        for label, line in zip(self.line_labels, self.line_cells):
+            (x0, y0), (x1, y1) = self.cell_centroids[line[0]], self.cell_centroids[line[2]]
+            dx, dy = x0 - x1, y0 - y1
+            norm = math.hypot(dx, dy)
+            self.label_coords[label] = (x0 + dx / norm * LABEL_DISTANCE,
+                                        y0 + dy / norm * LABEL_DISTANCE)
+        xs = [x for pts in self.cell_vertices for x, _ in pts] + [x for x, _ in self.label_coords.values()]
+        ys = [y for pts in self.cell_vertices for _, y in pts] + [y for _, y in self.label_coords.values()]
+        self.bounds = (min(xs), max(xs), min(ys), max(ys))
+
+        # 7) 対称性 (60° 回転 × 6 と鏡映 × 6 の 12 通り、セル番号の置換 idx → 移動先)
+        self.symmetries = {}
+        for steps in range(6):
+            self.symmetries[f'rot{steps * 60}'] = self._symmetry_permutation(steps, False)
+            self.symmetries[f'mirror{steps * 60}'] = self._symmetry_permutation(steps, True)
+
+    def triangle_vertices(self, r, c):
+        x = c * 0.5
+        y = (self.num_rows - 1 - r) * HEIGHT
+        if self.board_structure[r][c] == 'U':
+            return [(x, y), (x + 0.5, y + HEIGHT), (x + 1.0, y)]
+        return [(x, y + HEIGHT), (x + 0.5, y), (x + 1.0, y + HEIGHT)]
+
+    def _symmetry_permutation(self, steps, mirror):
+        cx = sum(x for x, _ in self.cell_centroids) / self.num_cells
+        cy = sum(y for _, y in self.cell_centroids) / self.num_cells
+        angle = steps * math.pi / 3
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        lookup = {(round(x, 6), round(y, 6)): idx for idx, (x, y) in enumerate(self.cell_centroids)}
+        perm = []
+        for x, y in self.cell_centroids:
+            dx, dy = x - cx, y - cy
+            if mirror:
+                dx = -dx
+            nx = cx + dx * cos_a - dy * sin_a
+            ny = cy + dx * sin_a + dy * cos_a
+            perm.append(lookup[(round(nx, 6), round(ny, 6))])
+        return perm
+
+    def is_cell(self, r, c):
+        return 0 <= r < self.num_rows and 0 <= c < self.num_cols and self.board_structure[r][c] != 'N'
+
+    def generate_combinations(self):
+        """方向名 → ライン座標リスト の辞書 (従来の combos 形式)"""
+        return {direction: [list(self.lines_map[label]) for label in labels]
+                for direction, labels in self.line_directions.items()}
+
+    def empty_grid(self):
+        return [[None] * self.num_cols for _ in range(self.num_rows)]
+
+    def __repr__(self):
+        return f"Topology(size={self.size}, cells={self.num_cells}, lines={self.num_lines})"
+
+
+#############################################
+# 大きさ毎にプロセス内で 1 つだけ作る
+#############################################
+_topologies = {}
+
+
+def get_topology(size=3):
+    topology = _topologies.get(size)
+    if topology is None:
+        topology = _topologies.setdefault(size, Topology(size))
+    return topology
@@ -0,0 +1,104 @@
+#############################################
+# 解の個数 / 一意性チェック (exact cover + 早期打ち切り)
+# コマンドラインは hanagram.verify (python -m hanagram.verify)
+#
+# 「各ラインに 0～9 のうち 9 種類が 1 回ずつ」を exact cover で表すため、
+# ライン毎に「欠ける数字」を 1 つ選ぶ行を追加する:
+#   列: セル(42) / (ライン, 数字)(120) / ラインの欠け枠(12)
+#   行: (セル, 数字)  → セル列 + そのセルを通るライン毎の (ライン, 数字) 列
+#       (ライン, 欠ける数字) → 欠け枠列 + (ライン, 数字) 列
+# こうすると全ての列がちょうど 1 回覆われる (exact cover) 問題になり、
+# 「ある数字がライン内で 1 セルにしか入らない」も列の選択で自然に扱える。
+#############################################
+from hanagram.geometry import NUM_CELLS, NUM_LINES, cells, cell_lines
+
+DIGIT_COL = NUM_CELLS                    # (ライン, 数字) 列の先頭
+MISSING_COL = DIGIT_COL + NUM_LINES * 10  # 欠け枠列の先頭
+NUM_COLS = MISSING_COL + NUM_LINES
+
+# 行 → 覆う列
+ROWS = []
+for idx in range(NUM_CELLS):
+    for d in range(10):
+        ROWS.append([idx] + [DIGIT_COL + l_idx*10 + d for l_idx in cell_lines[idx]])
+for l_idx in range(NUM_LINES):
+    for d in range(10):
+        ROWS.append([MISSING_COL + l_idx, DIGIT_COL + l_idx*10 + d])
+
+# 列 → 行の集合 (盤面毎にコピーして使う)
+COLUMNS = [set() for _ in range(NUM_COLS)]
+for row_id, cols in enumerate(ROWS):
+    for col in cols:
+        COLUMNS[col].add(row_id)
+
+
+def _select(X, row_id):
+    removed = []
+    for col in ROWS[row_id]:
+        for other in X[col]:
+            for other_col in ROWS[other]:
+                if other_col != col:
+                    X[other_col].discard(other)
+        removed.append(X.pop(col))
+    return removed
+
+
+def _deselect(X, row_id, removed):
+    for col in reversed(ROWS[row_id]):
+        X[col] = removed.pop()
+        for other in X[col]:
+            for other_col in ROWS[other]:
+                if other_col != col:
+                    X[other_col].add(other)
+
+
+def _count(X, limit):
+    if not X:
+        return 1
+    # 候補行が 0～1 の列があれば先に処理 (矛盾の検出 / 確定)。
+    # 分岐が必要なときはセル列の中で候補が最も少ないものを選ぶ
+    # ((ライン, 数字) 列で分岐すると行き止まりの枝が大きくなりやすい)
+    col = min(X, key=lambda c: len(X[c]))
+    if not X[col]:
+        return 0
+    if len(X[col]) > 1:
+        col = min((c for c in X if c < NUM_CELLS), key=lambda c: len(X[c]), default=col)
+    total = 0
+    for row_id in list(X[col]):
+        removed = _select(X, row_id)
+        total += _count(X, limit - total)
+        _deselect(X, row_id, removed)
+        if total >= limit:
+            return total
+    return total
+
+
+def _build(values):
+    """初期値の行を選択済みの列集合を返す (初期値が矛盾していれば None)"""
+    X = {col: set(rows) for col, rows in enumerate(COLUMNS)}
+    for idx, val in enumerate(values):
+        if val is None:
+            continue
+        row_id = idx*10 + val
+        for col in ROWS[row_id]:
+            if col not in X or row_id not in X[col]:
+                return None
+        _select(X, row_id)
+    return X
+
+
+def count_solutions_cells(values, limit=2):
+    """42 セルの値リストの解の個数を数える (limit 個見つけた時点で打ち切り)"""
+    X = _build(values)
+    if X is None:
+        return 0
+    return _count(X, limit)
+
+
+def count_solutions(board_values, limit=2):
+    """6×9 の盤面の解の個数 (limit 個で打ち切るので limit 以上は limit を返す)"""
+    return count_solutions_cells([board_values[r][c] for (r, c) in cells], limit)
+
+
+def is_unique(board_values):
+    return count_solutions(board_values, limit=2) == 1
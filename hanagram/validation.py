@@ -0,0 +1,40 @@
+#############################################
+# 重複チェックや完成判定 (盤面全体を毎回走査する参照実装)
+# 対話中の判定は state.BoardState の差分更新版を使う
+#############################################
+from hanagram.geometry import generate_combinations
+
+
+def check_duplicates(board_values, combos=None):
+    if combos is None:
+        combos = generate_combinations()
+    dup_found = False
+    dup_info = []
+    for direction, lines in combos.items():
+        for idx, line in enumerate(lines):
+            nums_in_line = []
+            for (r,c) in line:
+                val = board_values[r][c]
+                if val is not None:
+                    nums_in_line.append(val)
+            dups = set([num for num in nums_in_line if nums_in_line.count(num) > 1])
+            if dups:
+                dup_found = True
+                dup_info.append(f"{direction} - 列{idx+1} 重複: {dups}")
+    return dup_found, dup_info
+
+
+def check_all_lines_completed(board_values, combos=None):
+    if combos is None:
+        combos = generate_combinations()
+    for direction, lines in combos.items():
+        for line in lines:
+            digits = []
+            for (r,c) in line:
+                val = board_values[r][c]
+                if val is None:
+                    return False
+                digits.append(val)
+            if len(set(digits)) != len(line):
+                return False
+    return True
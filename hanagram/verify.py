@@ -0,0 +1,52 @@
+#############################################
+# 解の個数 / 一意性を調べるコマンドライン
+#
+#   python -m hanagram.verify puzzles/*.csv
+#
+# 数え上げ本体は hanagram.uniqueness (パッケージの __init__ からはそちらを読む)
+#############################################
+import sys
+
+from hanagram.uniqueness import count_solutions, count_solutions_cells, is_unique  # noqa: F401
+
+
+def describe(count, limit=2):
+    if count == 0:
+        return '解なし'
+    if count == 1:
+        return '唯一解'
+    if count >= limit:
+        return f'複数解 ({limit} 個以上)'
+    return f'複数解 ({count} 個)'
+
+
+#############################################
+# CLI
+#############################################
+def main(argv=None):
+    import argparse
+
+    from hanagram.loader import PuzzleFormatError, load_puzzle_from_csv
+
+    parser = argparse.ArgumentParser(description='Hanagram パズルの解の個数 (一意性) を調べる')
+    parser.add_argument('files', nargs='+', help='パズル CSV ファイル')
+    parser.add_argument('--limit', type=int, default=2,
+                        help='この個数の解が見つかった時点で探索を打ち切る (既定: 2)')
+    args = parser.parse_args(argv)
+
+    all_unique = True
+    for filename in args.files:
+        try:
+            board_values = load_puzzle_from_csv(filename)
+        except (OSError, PuzzleFormatError) as e:
+            print(f"{filename}: 読み込みエラー {e}")
+            all_unique = False
+            continue
+        count = count_solutions(board_values, limit=args.limit)
+        all_unique = all_unique and count == 1
+        print(f"{filename}: {describe(count, args.limit)}")
+    return 0 if all_unique else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
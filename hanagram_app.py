@@ -1,120 +1,82 @@
+import uuid
+
 import streamlit as st
-import pandas as pd
-import os
-import matplotlib.pyplot as plt
-import numpy as np
-import copy
+from hanagram.board import EMPTY_BOARD, Board
+from hanagram.canonical import puzzle_hash
+from hanagram.catalog import PAGE_SIZE, get_catalog
+from hanagram.entry import BOARD_TARGET, EntryError, apply_entry, board_to_text, format_rejected, parse_entry, plan_entry
+from hanagram.geometry import cell_index, is_cell, lines_map
+from hanagram.history import MoveHistory
+from hanagram.loader import PuzzleFormatError
+from hanagram.progress import ProgressError, get_store
+from hanagram.profiling import PhaseTimer, dump_profile, profile_summary, profiling_enabled, start_profile
+from hanagram.state import BoardState
 
 #############################################
-# 三角形描画
+# 処理時間の計測 (環境変数 HANAGRAM_PROFILE=1 か URL の ?profile=1 のときだけ)
+# タイマーは再実行の最後に作り直すので、次の操作のコールバックの時間も次の記録に入る
 #############################################
-def draw_triangle(ax, x, y, direction='U', value=None, color='white'):
- height = np.sqrt(3) / 2
- if direction == 'U':
-     points = np.array([
-         [x, y],
-         [x + 0.5, y + height],
-         [x + 1, y]
-     ])
- else:
-     points = np.array([
-         [x, y + height],
-         [x + 0.5, y],
-         [x + 1, y + height]
-     ])
-
- polygon = plt.Polygon(points, edgecolor='black', facecolor=color)
- ax.add_patch(polygon)
-
- # 中央に数字を表示
- if value is not None:
-     cx = x + 0.5
-     cy = y + height / 2
-     ax.text(cx, cy, str(value), fontsize=14, ha='center', va='center')
+profiling = profiling_enabled(st.query_params.get('profile'))
+if 'phase_timer' not in st.session_state:
+ st.session_state.phase_timer = PhaseTimer(profiling)
+timer = st.session_state.phase_timer
+timer.enabled = profiling
+profiler = None
+if profiling and st.session_state.pop('cprofile_next', False):
+ profiler = start_profile()
 
 #############################################
 # ボード描画 (初期値セル=薄青, 選択セル=黄, 他=白)
+# 三角形とラベルは使い回しの Figure に 1 度だけ作ってあり、
+# ここでは色と数字だけを差し替えた PNG (盤面毎にキャッシュ) を表示する
 #############################################
 def draw_board(board_values, selected_pos, initial_board_values, puzzle_completed=False, highlight_digits=None):
  """puzzle_completed: bool
     highlight_digits: (list or set) 完成時にピンクでハイライトする数字群"""
- fig, ax = plt.subplots(figsize=(8, 8))
-
- board_structure = [
-     ['N', 'N', 'N', 'U', 'D', 'U', 'N', 'N', 'N'],
-     ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
-     ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
-     ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
-     ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
-     ['N', 'N', 'N', 'D', 'U', 'D', 'N', 'N', 'N'],
- ]
- height = np.sqrt(3) / 2
-
- for r_idx, row_data in enumerate(board_structure):
-     for c_idx, cell in enumerate(row_data):
-         if cell != 'N':
-             x_offset = c_idx * 0.5
-             y_offset = (5 - r_idx) * height
-             value = board_values[r_idx][c_idx]
-
-             # --- 通常ロジックで色を決定 ---
-             if initial_board_values[r_idx][c_idx] is not None:
-                 color = 'lightblue'   # 初期値(変更不可)
-             elif (r_idx, c_idx) == selected_pos:
-                 color = 'yellow'      # 選択中のセル
-             else:
-                 color = 'white'       # 通常セル（ユーザーが入力可）
-
-             # --- パズル完成済かつハイライト対象の数字ならピンクで上書き ---
-             if puzzle_completed and highlight_digits and value in highlight_digits:
-                 color = 'pink'
-
-             draw_triangle(ax, x_offset, y_offset,
-                           direction=cell, value=value, color=color)
-
- # --- ラベル(A〜L)配置 ---
- label_positions = {
-     "A": (-1, 4),
-     "B": (1, 6),
-     "C": (1, 7),
-     "D": (2, 9),
-     "E": (4, 9),
-     "F": (5, 7),
-     "G": (5, 6),
-     "H": (6, 4),
-     "I": (4, -1),
-     "J": (3, -1),
-     "K": (2, -1),
-     "L": (1, -1),
- }
- label_shifts = {
-     "A": (0.5, 0.3), "B": (0.5, 1.5), "C": (0.5, 1.1), "D": (0.5, 1.4),
-     "E": (0.5, 0.4), "F": (0.5, 0.6), "G": (0.5, 0.2), "H": (0.5, 0.5),
-     "I": (0.1, 0.4), "J": (0.1, 0.4), "K": (0.1, 0.4), "L": (0.1, 0.4),
- }
-
- for label, (r, c) in label_positions.items():
-     x_lab = c * 0.5
-     y_lab = (5 - r) * height
-     dx, dy = label_shifts.get(label, (0,0))
-     x_lab += dx
-     y_lab += dy
-     ax.text(x_lab, y_lab, label, color="red", fontsize=16, ha="center", va="center")
+ # matplotlib は描画するときに初めて読み込む
+ from hanagram.mpl_board import render_board_png
+ png = render_board_png(board_values, selected_pos, initial_board_values,
+                        puzzle_completed, highlight_digits)
+ st.image(png)
 
- ax.set_xlim(-2, 7)
- ax.set_ylim(-2, 7)
- ax.set_aspect('equal')
- ax.axis('off')
- st.pyplot(fig)
+#############################################
+# 進行状況の保存 (hanagram.progress、SQLite に非同期でまとめて書く)
+# プレイヤーは URL の ?player= で区別し、開き直したら最後の盤面・履歴から再開する
+#############################################
+progress_store = get_store()
+if 'player' not in st.session_state:
+ player = st.query_params.get('player')
+ if not player:
+     player = uuid.uuid4().hex
+     st.query_params['player'] = player
+ st.session_state.player = player
+ with timer.phase('restore'):
+     saved = progress_store.load(player)
+ if saved is not None:
+     st.session_state.initial_board_values = saved.initial
+     st.session_state.board_values = saved.board
+     st.session_state.history = saved.history
+     st.session_state.progress_source = saved.source
 
 #############################################
 # セッション初期化
+# 盤面は hanagram.board.Board (42 セル + 初期値のビットマスク)。
+# initial_board_values は全セッション共有の凍結済み盤面、
+# board_values はその clone() (書き込むまでバイト列を共有する)
 #############################################
+if 'initial_board_values' not in st.session_state:
+ st.session_state.initial_board_values = EMPTY_BOARD
+
 if 'board_values' not in st.session_state:
- st.session_state.board_values = [[None]*9 for _ in range(6)]
+ st.session_state.board_values = st.session_state.initial_board_values.clone()
 
-if 'initial_board_values' not in st.session_state:
- st.session_state.initial_board_values = [[None]*9 for _ in range(6)]
+# ライン毎の数字マスク・重複数を差分更新で保持する盤面状態
+if 'board_state' not in st.session_state:
+ st.session_state.board_state = BoardState.from_cells(st.session_state.board_values.values())
+
+# 入力の履歴 (元に戻す / やり直す)。1 手 2 バイトの差分ログ
+if 'history' not in st.session_state:
+ st.session_state.history = MoveHistory(st.session_state.board_values.values())
 
 # ハイライト対象の数字を保持する Session State（最初は空リスト/空セットなど）
 if 'highlight_digits' not in st.session_state:
@@ -128,21 +90,7 @@ st.title('Hanagramアプリ https://www.hanagram.net')
 #############################################
 # 列(A～L)＆番号(0～8) 選択
 #############################################
-lines_map = {
- "A": [(0,4),(0,3),(1,3),(1,2),(2,2),(2,1),(3,1),(3,0),(4,0)],
- "B": [(0,5),(1,5),(1,4),(2,4),(2,3),(3,3),(3,2),(4,2),(4,1)],
- "C": [(1,7),(1,6),(2,6),(2,5),(3,5),(3,4),(4,4),(4,3),(5,3)],
- "D": [(1,8),(2,8),(2,7),(3,7),(3,6),(4,6),(4,5),(5,5),(5,4)],
- "E": [(4,8),(3,8),(3,7),(2,7),(2,6),(1,6),(1,5),(0,5),(0,4)],
- "F": [(4,7),(4,6),(3,6),(3,5),(2,5),(2,4),(1,4),(1,3),(0,3)],
- "G": [(5,5),(4,5),(4,4),(3,4),(3,3),(2,3),(2,2),(1,2),(1,1)],
- "H": [(5,4),(5,3),(4,3),(4,2),(3,2),(3,1),(2,1),(2,0),(1,0)],
- "I": [(4,0),(4,1),(4,2),(4,3),(4,4),(4,5),(4,6),(4,7),(4,8)],
- "J": [(3,0),(3,1),(3,2),(3,3),(3,4),(3,5),(3,6),(3,7),(3,8)],
- "K": [(2,0),(2,1),(2,2),(2,3),(2,4),(2,5),(2,6),(2,7),(2,8)],
- "L": [(1,0),(1,1),(1,2),(1,3),(1,4),(1,5),(1,6),(1,7),(1,8)]
-}
-
+# ライン座標は hanagram.geometry.lines_map を使う
 col_letter = st.selectbox("列(A～L)を選択", list(lines_map.keys()))
 pos_index = st.selectbox("番号(0～8)を選択", list(range(9)))
 (row, col) = lines_map[col_letter][pos_index]
@@ -153,122 +101,101 @@ pos_index = st.selectbox("番号(0～8)を選択", list(range(9)))
 number = st.selectbox("数字を選んでください", [None,0,1,2,3,4,5,6,7,8,9])
 
 if st.button('数字をセルに入力'):
- # board_structure
- board_structure = [
-     ['N','N','N','U','D','U','N','N','N'],
-     ['U','D','U','D','U','D','U','D','U'],
-     ['D','U','D','U','D','U','D','U','D'],
-     ['U','D','U','D','U','D','U','D','U'],
-     ['D','U','D','U','D','U','D','U','D'],
-     ['N','N','N','D','U','D','N','N','N'],
- ]
- if board_structure[row][col] == 'N':
-     st.warning('ここはセルが存在しません。')
- else:
-     # 初期値セルは変更不可
-     if st.session_state.initial_board_values[row][col] is not None:
-         st.warning('このセルは初期値なので変更できません。')
+ with timer.phase('entry'):
+     if not is_cell(row, col):
+         st.warning('ここはセルが存在しません。')
      else:
-         st.session_state.board_values[row][col] = number
+         # 初期値セルは変更不可
+         if st.session_state.board_values.is_given_cell(row, col):
+             st.warning('このセルは初期値なので変更できません。')
+         else:
+             idx = cell_index[(row, col)]
+             old = st.session_state.board_values.get(idx)
+             st.session_state.board_values.set(idx, number)
+             st.session_state.board_state.set(idx, number)
+             st.session_state.history.record(idx, old, number,
+                                             not st.session_state.board_state.has_duplicates)
 
 #############################################
-# 重複チェックや完成判定
+# まとめて入力 (ライン 1 本 / 盤面全体を文字列で)
+# フォーム内の入力は送信ボタンを押すまで再実行しない
 #############################################
-def generate_combinations():
- board_structure = [
-     ['N', 'N', 'N', 'U', 'D', 'U', 'N', 'N', 'N'],
-     ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
-     ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
-     ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
-     ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
-     ['N', 'N', 'N', 'D', 'U', 'D', 'N', 'N', 'N'],
- ]
- combos = {
-     '横': [],
-     '斜め_右上から左下': [],
-     '斜め_左上から右下': [],
-     '斜め_右下から左上': [],
-     '横': [],
- }
- # 横方向 (4行分)
- for r_idx, row_data in enumerate(board_structure):
-     temp_row = []
-     for c_idx, cell in enumerate(row_data):
-         if cell != 'N':
-             temp_row.append((r_idx,c_idx))
-     if len(temp_row) > 3:
-         combos['横'].append(temp_row)
-
- combos['斜め_右上から左下'] = [
-     [(0,4),(0,3),(1,3),(1,2),(2,2),(2,1),(3,1),(3,0),(4,0)],
-     [(0,5),(1,5),(1,4),(2,4),(2,3),(3,3),(3,2),(4,2),(4,1)],
-     [(1,7),(1,6),(2,6),(2,5),(3,5),(3,4),(4,4),(4,3),(5,3)],
-     [(1,8),(2,8),(2,7),(3,7),(3,6),(4,6),(4,5),(5,5),(5,4)]
- ]
- combos['斜め_左上から右下'] = [
-     [(0,4),(0,5),(1,5),(1,6),(2,6),(2,7),(3,7),(3,8),(4,8)],
-     [(0,3),(1,3),(1,4),(2,4),(2,5),(3,5),(3,6),(4,6),(4,7)],
-     [(1,1),(1,2),(2,2),(2,3),(3,3),(3,4),(4,4),(4,5),(5,5)],
-     [(1,0),(2,0),(2,1),(3,1),(3,2),(4,2),(4,3),(5,3),(5,4)]
- ]
- combos['斜め_右下から左上'] = [
-     [(4,8),(3,8),(3,7),(2,7),(2,6),(1,6),(1,5),(0,5),(0,4)],
-     [(4,7),(4,6),(3,6),(3,5),(2,5),(2,4),(1,4),(1,3),(0,3)],
-     [(5,5),(4,5),(4,4),(3,4),(3,3),(2,3),(2,2),(1,2),(1,1)],
-     [(5,4),(5,3),(4,3),(4,2),(3,2),(3,1),(2,1),(2,0),(1,0)]
- ]
- combos['横方向_左から右'] = [
-     [(4,0),(4,1),(4,2),(4,3),(4,4),(4,5),(4,6),(4,7),(4,8)],
-     [(3,0),(3,1),(3,2),(3,3),(3,4),(3,5),(3,6),(3,7),(3,8)],
-     [(2,0),(2,1),(2,2),(2,3),(2,4),(2,5),(2,6),(2,7),(2,8)],
-     [(1,0),(1,1),(1,2),(1,3),(1,4),(1,5),(1,6),(1,7),(1,8)]
- ]
- return combos
-
-def check_duplicates(board_values, combos):
- dup_found = False
- dup_info = []
- for direction, lines in combos.items():
-     for idx, line in enumerate(lines):
-         nums_in_line = []
-         for (r,c) in line:
-             val = board_values[r][c]
-             if val is not None:
-                 nums_in_line.append(val)
-         dups = set([num for num in nums_in_line if nums_in_line.count(num) > 1])
-         if dups:
-             dup_found = True
-             dup_info.append(f"{direction} - 列{idx+1} 重複: {dups}")
- return dup_found, dup_info
-
-def check_all_lines_completed(board_values, combos):
- for direction, lines in combos.items():
-     for line in lines:
-         digits = []
-         for (r,c) in line:
-             val = board_values[r][c]
-             if val is None:
-                 return False
-             digits.append(val)
-         if len(set(digits)) != 9:
-             return False
- return True
+with st.expander('まとめて入力 (ライン / 盤面全体)'):
+ st.caption("0～9 は数字、'.' は空欄。ラインは番号 0～8 の順に 9 文字、"
+            "盤面全体は 42 文字 (セル順) か 6×9 = 54 文字。空白・',' '/' '|' は無視します。")
+ st.code(board_to_text(st.session_state.board_values), language=None)
+ with st.form('bulk_entry'):
+     bulk_target = st.selectbox('対象', [BOARD_TARGET] + list(lines_map.keys()))
+     bulk_text = st.text_input('文字列')
+     bulk_submitted = st.form_submit_button('まとめて入力')
+
+if bulk_submitted:
+ try:
+     assignments = parse_entry(bulk_target, bulk_text)
+ except EntryError as e:
+     st.error(f"まとめて入力できません: {e}")
+ else:
+     # 初期値セルなどはセル毎に却下し、残りを 1 操作として適用する
+     plan = plan_entry(st.session_state.board_values, assignments)
+     with timer.phase('entry'):
+         applied = apply_entry(plan, st.session_state.board_values,
+                               st.session_state.board_state, st.session_state.history)
+     if plan.rejected:
+         st.warning(f"{applied} セルを入力し、{len(plan.rejected)} セルは入力しませんでした:\n"
+                    + format_rejected(plan.rejected))
+     else:
+         st.success(f"{applied} セルを入力しました。")
 
-combinations = generate_combinations()
+#############################################
+# 元に戻す / やり直す / 重複のない状態まで戻す
+#############################################
+def apply_history_step(steps):
+ for idx, value in steps:
+     st.session_state.board_values.set(idx, value)
+     st.session_state.board_state.set(idx, value)
+
+def undo_move():
+ apply_history_step(st.session_state.history.undo())
+
+def redo_move():
+ apply_history_step(st.session_state.history.redo())
+
+def rewind_to_clean():
+ position = st.session_state.history.last_clean_position()
+ if position is None:
+     st.warning('重複のない状態が履歴に残っていません。')
+     return
+ values = st.session_state.history.goto(position)
+ st.session_state.board_values = Board.from_cells(values, st.session_state.initial_board_values.givens)
+ st.session_state.board_state = BoardState.from_cells(values)
+
+history = st.session_state.history
+undo_col, redo_col, rewind_col = st.columns(3)
+undo_col.button('元に戻す', on_click=undo_move, disabled=not history.can_undo)
+redo_col.button('やり直す', on_click=redo_move, disabled=not history.can_redo)
+rewind_col.button('重複のない状態まで戻す', on_click=rewind_to_clean,
+                  disabled=not st.session_state.board_state.has_duplicates)
 
-dup_found, dup_info = check_duplicates(st.session_state.board_values, combinations)
-puzzle_completed = check_all_lines_completed(st.session_state.board_values, combinations)
+#############################################
+# 重複チェックや完成判定 (差分更新済みの結果を読むだけ)
+#############################################
+board_state = st.session_state.board_state
+with timer.phase('duplicate_check'):
+ dup_found, dup_info = board_state.check_duplicates()
+with timer.phase('completion_check'):
+ puzzle_completed = board_state.is_completed
 
 #############################################
 # ボード描画：ハイライト対象数字を考慮
 #############################################
-draw_board(
- board_values = st.session_state.board_values,
- selected_pos = (row, col),
- initial_board_values = st.session_state.initial_board_values,
- puzzle_completed = puzzle_completed,
- highlight_digits = st.session_state.highlight_digits
-)
+with timer.phase('draw'):
+ draw_board(
+     board_values = st.session_state.board_values,
+     selected_pos = (row, col),
+     initial_board_values = st.session_state.initial_board_values,
+     puzzle_completed = puzzle_completed,
+     highlight_digits = st.session_state.highlight_digits
+ )
 
 #############################################
 #  重複チェック＆完成メッセージ
@@ -299,44 +226,98 @@ if puzzle_completed:
 else:
  st.info("パズルが完成すると、選択した数字をピンクでハイライトできます。")
 
-#############################################
-# CSV読込用関数
-#############################################
-def load_puzzle_from_csv(filename):
- df = pd.read_csv(filename, header=None)
- puzzle_data = df.where(pd.notnull(df), None).values.tolist()
- for r_idx, row_data in enumerate(puzzle_data):
-     for c_idx, val in enumerate(row_data):
-         if pd.notnull(val):
-             puzzle_data[r_idx][c_idx] = int(val)
-         else:
-             puzzle_data[r_idx][c_idx] = None
- return puzzle_data
-
 #############################################
 # パズル読み込みUI（ボタンを残す方法）
 #############################################
 puzzle_folder = 'puzzles'
-puzzle_files = [f for f in os.listdir(puzzle_folder) if f.endswith('.csv')]
-
-if puzzle_files:
- st.selectbox(
-     label='🔍 パズルを選択',
-     options=puzzle_files,
-     key="selected_file"
- )
+# フォルダの走査・読み込み結果は全セッションで共有 (mtime が変わったときだけ読み直す)
+with timer.phase('listdir'):
+ catalog = get_catalog(puzzle_folder)
+# フォルダにパズルパック (.hgp) があれば CSV の代わりにパックから選べる
+if catalog.packs:
+ source = st.selectbox('パズル集', ['フォルダ (CSV)'] + catalog.packs, key="puzzle_source")
+ if source in catalog.packs:
+     catalog = get_catalog(catalog.path(source))
+
+if len(catalog):
+ query = st.text_input('ファイル名で絞り込み (前方一致)', key="puzzle_query")
+ n_matches = catalog.count(query)
+ n_pages = max(1, -(-n_matches // PAGE_SIZE))
+ page = 1
+ if n_pages > 1:
+     page = st.selectbox(f'ページ (全 {n_pages} ページ / {n_matches} 件)',
+                         list(range(1, n_pages + 1)), key="puzzle_page")
+ with timer.phase('selector'):
+     puzzle_files, _ = catalog.search(query, page - 1)
+     st.selectbox(
+         label='🔍 パズルを選択',
+         options=puzzle_files,
+         key="selected_file",
+         format_func=catalog.label
+     )
 
  def load_selected_puzzle():
-     puzzle_path = os.path.join(puzzle_folder, st.session_state.selected_file)
-     loaded_puzzle = load_puzzle_from_csv(puzzle_path)
-     # board_values と initial_board_values を deepcopy で分離
-     st.session_state.board_values = copy.deepcopy(loaded_puzzle)
-     st.session_state.initial_board_values = copy.deepcopy(loaded_puzzle)
+     if st.session_state.selected_file is None:
+         st.warning("パズルが選択されていません。")
+         return
+     try:
+         with st.session_state.phase_timer.phase('load'):
+             loaded_puzzle = catalog.load_board(st.session_state.selected_file)
+     except (OSError, PuzzleFormatError) as e:
+         st.error(f"読み込めませんでした: {e}")
+         return
+     # 読み込んだ盤面は凍結済みで共有されるので、入力用には clone() を持つ
+     # (このパズルの進行状況が保存されていれば、その盤面・履歴から続ける)
+     saved = progress_store.load(st.session_state.player, puzzle_hash(loaded_puzzle.values()))
+     st.session_state.initial_board_values = loaded_puzzle
+     st.session_state.progress_source = st.session_state.selected_file
+     if saved is not None:
+         st.session_state.board_values = saved.board
+         st.session_state.board_state = BoardState.from_cells(saved.board.values())
+         st.session_state.history = saved.history
+     else:
+         st.session_state.board_values = loaded_puzzle.clone()
+         st.session_state.board_state = BoardState.from_cells(loaded_puzzle.values())
+         st.session_state.history = MoveHistory(loaded_puzzle.values(),
+                                                not st.session_state.board_state.has_duplicates)
      # ハイライト選択もクリアする（パズル切り替え時にリセットしたい場合）
      st.session_state.highlight_digits = []
-     st.success(f"{st.session_state.selected_file} を読み込みました！")
+     st.success(f"{st.session_state.selected_file} を読み込みました！"
+                + (" (前回の続きから)" if saved is not None else ""))
 
  if st.button('選択したパズルを読み込み', on_click=load_selected_puzzle):
      pass
 else:
  st.warning("puzzles フォルダに CSV ファイルがありません。")
+
+#############################################
+# 進行状況を保存 (盤面・履歴が変わっていれば待ち行列に置くだけで、書き込みは待たない)
+#############################################
+with timer.phase('save'):
+ progress_mark = (st.session_state.initial_board_values.to_bytes(),
+                  st.session_state.board_values.to_bytes(),
+                  len(st.session_state.history), st.session_state.history.position)
+ if st.session_state.get('saved_mark') != progress_mark:
+     st.session_state.saved_mark = progress_mark
+     try:
+         progress_store.save(st.session_state.player, st.session_state.initial_board_values,
+                             st.session_state.board_values, st.session_state.history,
+                             st.session_state.get('progress_source'))
+     except ProgressError as e:
+         st.warning(f"進行状況を保存できません: {e}")
+
+#############################################
+# 計測結果 (サイドバー) と JSONL ログ・cProfile
+#############################################
+def request_cprofile():
+ st.session_state.cprofile_next = True
+
+if profiling:
+ record = timer.finish('hanagram_app', file=st.session_state.get('selected_file'))
+ with st.sidebar.expander(f"⏱ 処理時間 {record['total_ms']:.1f} ms", expanded=False):
+     st.table(record['phases'])
+     st.button('次の再実行を cProfile で記録', on_click=request_cprofile)
+     if profiler is not None:
+         st.caption(dump_profile(profiler, 'hanagram_app'))
+         st.code(profile_summary(profiler))
+ st.session_state.phase_timer = PhaseTimer(profiling)
@@ -1,38 +1,97 @@
-import streamlit as st
-import pandas as pd
-import os
-import numpy as np
-import copy
-import plotly.graph_objects as go
-from streamlit_plotly_events import plotly_events
-
-def load_selected_puzzle():
-    puzzle_path = os.path.join(puzzle_folder, st.session_state.selected_file)
-    loaded_puzzle = load_puzzle_from_csv(puzzle_path)
-    st.session_state.board_values = copy.deepcopy(loaded_puzzle)
-    st.session_state.initial_board_values = copy.deepcopy(loaded_puzzle)
-    st.session_state.highlight_digits = []
-    st.session_state.selected_pos = (None, None)
-
-    # ▼ここを追加
-    st.write("読み込んだパズルデータ:", st.session_state.board_values)
-
-    st.success(f"{st.session_state.selected_file} を読み込みました！")
+import uuid
 
+import streamlit as st
+from hanagram import solve_cache
+from hanagram.board import EMPTY_BOARD, Board
+from hanagram.canonical import puzzle_hash
+from hanagram.catalog import PAGE_SIZE, get_catalog
+from hanagram.entry import BOARD_TARGET, EntryError, apply_entry, board_to_text, format_rejected, parse_entry, plan_entry
+from hanagram.geometry import cell_index, cells, line_labels
+from hanagram.history import MoveHistory
+from hanagram.loader import PuzzleFormatError
+from hanagram.progress import ProgressError, get_store
+from hanagram.profiling import PhaseTimer, dump_profile, profile_summary, profiling_enabled, start_profile
+from hanagram.state import BoardState
+from hanagram.solver import hint
 
 #############################################
 # ページレイアウト設定 (任意)
 #############################################
 st.set_page_config(page_title="Hanagram with Plotly", layout="wide")
 
+#############################################
+# 処理時間の計測 (環境変数 HANAGRAM_PROFILE=1 か URL の ?profile=1 のときだけ)
+# phase_timer はスクリプト全体の再実行、panel_timer は盤面フラグメントの再実行用。
+# どちらも再実行の最後に作り直すので、次の操作のコールバックの時間も次の記録に入る
+#############################################
+profiling = profiling_enabled(st.query_params.get('profile'))
+for timer_key in ('phase_timer', 'panel_timer'):
+    if timer_key not in st.session_state:
+        st.session_state[timer_key] = PhaseTimer(profiling)
+    st.session_state[timer_key].enabled = profiling
+timer = st.session_state.phase_timer
+profiler = None
+if profiling and st.session_state.pop('cprofile_next', False):
+    profiler = start_profile()
+
+#############################################
+# 進行状況の保存 (hanagram.progress、SQLite に非同期でまとめて書く)
+# プレイヤーは URL の ?player= で区別する。ページを開き直したりサーバーが
+# 再起動しても、そのプレイヤーが最後に保存したパズルの盤面・履歴から再開する
+#############################################
+progress_store = get_store()
+if 'player' not in st.session_state:
+    player = st.query_params.get('player')
+    if not player:
+        player = uuid.uuid4().hex
+        st.query_params['player'] = player
+    st.session_state.player = player
+    with timer.phase('restore'):
+        saved = progress_store.load(player)
+    if saved is not None:
+        st.session_state.initial_board_values = saved.initial
+        st.session_state.board_values = saved.board
+        st.session_state.history = saved.history
+        st.session_state.progress_source = saved.source
+        st.session_state.solve_key = solve_cache.submit(saved.initial.values())
+
+def save_progress():
+    # 盤面・履歴が前回の保存から変わっていれば待ち行列に置く (書き込みは別スレッド)
+    initial = st.session_state.initial_board_values
+    board = st.session_state.board_values
+    history = st.session_state.history
+    mark = (initial.to_bytes(), board.to_bytes(), len(history), history.position)
+    if st.session_state.get('saved_mark') != mark:
+        st.session_state.saved_mark = mark
+        try:
+            progress_store.save(st.session_state.player, initial, board, history,
+                                st.session_state.get('progress_source'))
+        except ProgressError as e:
+            st.warning(f"進行状況を保存できません: {e}")
+
 #############################################
 # セッション初期化
+# 盤面は hanagram.board.Board (42 セル + 初期値のビットマスク)。
+# initial_board_values は全セッション共有の凍結済み盤面、
+# board_values はその clone() (書き込むまでバイト列を共有する)
 #############################################
+if 'initial_board_values' not in st.session_state:
+    st.session_state.initial_board_values = EMPTY_BOARD
+
 if 'board_values' not in st.session_state:
-    st.session_state.board_values = [[None]*9 for _ in range(6)]
+    st.session_state.board_values = st.session_state.initial_board_values.clone()
 
-if 'initial_board_values' not in st.session_state:
-    st.session_state.initial_board_values = [[None]*9 for _ in range(6)]
+# ライン毎の数字マスク・重複数を差分更新で保持する盤面状態
+if 'board_state' not in st.session_state:
+    st.session_state.board_state = BoardState.from_cells(st.session_state.board_values.values())
+
+# 入力の履歴 (元に戻す / やり直す / 手順の移動)。1 手 2 バイトの差分ログ
+if 'history' not in st.session_state:
+    st.session_state.history = MoveHistory(st.session_state.board_values.values())
+
+# 読み込んだパズルの解答・候補 (solve_cache のキー。計算は読み込み時にバックグラウンドで始める)
+if 'solve_key' not in st.session_state:
+    st.session_state.solve_key = None
 
 if 'highlight_digits' not in st.session_state:
     st.session_state.highlight_digits = []
@@ -46,256 +105,101 @@ if 'selected_pos' not in st.session_state:
 #############################################
 st.title('Hanagramアプリ (Plotly版)  https://www.hanagram.net')
 
-#############################################
-# 盤面構造 (三角形の向き) 定義
-#############################################
-board_structure = [
-    ['N', 'N', 'N', 'U', 'D', 'U', 'N', 'N', 'N'],
-    ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
-    ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
-    ['U', 'D', 'U', 'D', 'U', 'D', 'U', 'D', 'U'],
-    ['D', 'U', 'D', 'U', 'D', 'U', 'D', 'U', 'D'],
-    ['N', 'N', 'N', 'D', 'U', 'D', 'N', 'N', 'N'],
-]
-height = np.sqrt(3) / 2
-
 #############################################
 # Plotly で三角形セルを描画し、クリックイベントを拾う関数
+# (座標はキャッシュ済み、再実行毎に変わるのは色と数字だけ)
 #############################################
 def draw_board_plotly(board_values, selected_pos, initial_board_values,
-                      puzzle_completed=False, highlight_digits=None):
-    fig = go.Figure()
-    for r_idx, row_data in enumerate(board_structure):
-        for c_idx, cell_dir in enumerate(row_data):
-            if cell_dir == 'N':
-                continue
-            x_offset = c_idx * 0.5
-            y_offset = (5 - r_idx) * height
-            if cell_dir == 'U':
-                p1 = (x_offset,       y_offset)
-                p2 = (x_offset+0.5,  y_offset+height)
-                p3 = (x_offset+1.0,  y_offset)
-            else:
-                p1 = (x_offset,       y_offset+height)
-                p2 = (x_offset+0.5,  y_offset)
-                p3 = (x_offset+1.0,  y_offset+height)
-            val = board_values[r_idx][c_idx]
-
-            # 色分け
-            if initial_board_values[r_idx][c_idx] is not None:
-                color = 'lightblue'
-            elif (r_idx, c_idx) == selected_pos:
-                color = 'yellow'
-            else:
-                color = 'white'
-            if puzzle_completed and highlight_digits and (val in highlight_digits):
-                color = 'pink'
-
-            path_d = f"M {p1[0]},{p1[1]} L {p2[0]},{p2[1]} L {p3[0]},{p3[1]} Z"
-            shape_name = f"cell_{r_idx}_{c_idx}"
-            fig.add_shape(
-                type="path",
-                path=path_d,
-                fillcolor=color,
-                line=dict(color="black"),
-                name=shape_name,
-                layer='below'  # <-- これを追加！
-            )
-
-            cx = (p1[0] + p2[0] + p3[0]) / 3.0
-            cy = (p1[1] + p2[1] + p3[1]) / 3.0
-            text_val = str(val) if val is not None else ""
-            fig.add_trace(go.Scatter(
-                x=[cx],
-                y=[cy],
-                text=[text_val],
-                #mode="markers+text",  # ← markersを足す
-                # marker=dict(size=30, color="rgba(0,0,0,0)"),  # 透明マーカー
-
-                mode="markers+text",  # 大きな円＋テキスト
-                marker=dict(size=30, color="rgba(255,0,0,0.3)"),  # 赤い半透明マーカー
-                
-                textfont=dict(size=16, color="black"),
-                textposition="middle center",
-                name=shape_name,
-                customdata=[(r_idx, c_idx)],
-                hoverinfo="skip"
-            ))
-
-    # ラベル(A～L)を描画する(散布図トレース or shape)
-    label_positions = {
-        "A": (-1, 4),
-        "B": (1, 6),
-        "C": (1, 7),
-        "D": (2, 9),
-        "E": (4, 9),
-        "F": (5, 7),
-        "G": (5, 6),
-        "H": (6, 4),
-        "I": (4, -1),
-        "J": (3, -1),
-        "K": (2, -1),
-        "L": (1, -1),
-    }
-    label_shifts = {
-        "A": (0.5, 0.3), "B": (0.5, 1.5), "C": (0.5, 1.1), "D": (0.5, 1.4),
-        "E": (0.5, 0.4), "F": (0.5, 0.6), "G": (0.5, 0.2), "H": (0.5, 0.5),
-        "I": (0.1, 0.4), "J": (0.1, 0.4), "K": (0.1, 0.4), "L": (0.1, 0.4),
-    }
-
-    # 別トレースでテキスト描画
-    label_x = []
-    label_y = []
-    label_text = []
-    for label, (r, c) in label_positions.items():
-        x_lab = c * 0.5
-        y_lab = (5 - r) * height
-        dx, dy = label_shifts.get(label, (0,0))
-        x_lab += dx
-        y_lab += dy
-
-        label_x.append(x_lab)
-        label_y.append(y_lab)
-        label_text.append(label)
-
-    fig.add_trace(
-        go.Scatter(
-            x=label_x,
-            y=label_y,
-            text=label_text,
-            mode="text",
-            textfont=dict(size=16, color="red"),
-            hoverinfo="skip",
-            name="labels"
+                      puzzle_completed=False, highlight_digits=None, timer=None):
+    # plotly は描画するときに初めて読み込む
+    from streamlit_plotly_events import plotly_events
+    from hanagram.plotly_board import build_board_figure, clicked_cell_from_events
+
+    timer = timer or PhaseTimer(False)
+    with timer.phase('figure'):
+        fig = build_board_figure(board_values, selected_pos, initial_board_values,
+                                 puzzle_completed, highlight_digits)
+
+    # key を固定して、Figure が変わってもコンポーネントを作り直さない
+    # (Figure の JSON 化もコンポーネント側で行われるのでここで計測する)
+    with timer.phase('component'):
+        selected_points = plotly_events(
+            fig,
+            click_event=True,
+            hover_event=False,
+            select_event=False,
+            key="board",
         )
-    )
-
-    # レイアウト調整
-    fig.update_xaxes(showgrid=False, zeroline=False, visible=False)
-    fig.update_yaxes(showgrid=False, zeroline=False, visible=False)
-    fig.update_layout(
-        width=700,
-        height=700,
-        margin=dict(l=10, r=10, t=10, b=10),
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        dragmode=False,
-        clickmode='event+select'
-    )
-
-    # ここで plotly_events を呼び出す → 余計な引数は付けない
-    selected_points = plotly_events(
-        fig,
-        click_event=True,
-        hover_event=False,
-        select_event=False,
-    )
-
-    st.write("selected_points:", selected_points)  # ← デバッグ表示
-
-    clicked_cell = None
-    if selected_points:
-        event = selected_points[-1]
-        if 'customdata' in event and isinstance(event['customdata'], (list, tuple)):
-            if len(event['customdata']) == 2:
-                clicked_cell = (event['customdata'][0], event['customdata'][1])
-    return clicked_cell
-
-#############################################
-# 重複チェックや完成判定の関数
-#############################################
-def generate_combinations():
-    combos = {
-        '斜め_右上から左下': [
-            [(0,4),(0,3),(1,3),(1,2),(2,2),(2,1),(3,1),(3,0),(4,0)],
-            [(0,5),(1,5),(1,4),(2,4),(2,3),(3,3),(3,2),(4,2),(4,1)],
-            [(1,7),(1,6),(2,6),(2,5),(3,5),(3,4),(4,4),(4,3),(5,3)],
-            [(1,8),(2,8),(2,7),(3,7),(3,6),(4,6),(4,5),(5,5),(5,4)]
-        ],
-        '斜め_右下から左上': [
-            [(4,8),(3,8),(3,7),(2,7),(2,6),(1,6),(1,5),(0,5),(0,4)],
-            [(4,7),(4,6),(3,6),(3,5),(2,5),(2,4),(1,4),(1,3),(0,3)],
-            [(5,5),(4,5),(4,4),(3,4),(3,3),(2,3),(2,2),(1,2),(1,1)],
-            [(5,4),(5,3),(4,3),(4,2),(3,2),(3,1),(2,1),(2,0),(1,0)]
-        ],
-        '横方向_左から右': [
-            [(4,0),(4,1),(4,2),(4,3),(4,4),(4,5),(4,6),(4,7),(4,8)],
-            [(3,0),(3,1),(3,2),(3,3),(3,4),(3,5),(3,6),(3,7),(3,8)],
-            [(2,0),(2,1),(2,2),(2,3),(2,4),(2,5),(2,6),(2,7),(2,8)],
-            [(1,0),(1,1),(1,2),(1,3),(1,4),(1,5),(1,6),(1,7),(1,8)]
-        ],
-    }
-    return combos
-
-def check_duplicates(board_values, combos):
-    dup_found = False
-    dup_info = []
-    for direction, lines in combos.items():
-        for idx, line in enumerate(lines):
-            nums_in_line = []
-            for (r,c) in line:
-                val = board_values[r][c]
-                if val is not None:
-                    nums_in_line.append(val)
-            dups = set([num for num in nums_in_line if nums_in_line.count(num) > 1])
-            if dups:
-                dup_found = True
-                dup_info.append(f"{direction} - 列{idx+1} 重複: {dups}")
-    return dup_found, dup_info
-
-def check_all_lines_completed(board_values, combos):
-    for direction, lines in combos.items():
-        for line in lines:
-            digits = []
-            for (r,c) in line:
-                val = board_values[r][c]
-                if val is None:
-                    return False
-                digits.append(val)
-            if len(set(digits)) != 9:
-                return False
-    return True
-
-#############################################
-# CSV読込用関数
-#############################################
-def load_puzzle_from_csv(filename):
-    df = pd.read_csv(filename, header=None)
-    # df の欠損値(NaN)を None に変換
-    puzzle_data = df.where(pd.notnull(df), None).values.tolist()
-
-    for r_idx, row_data in enumerate(puzzle_data):
-        for c_idx, val in enumerate(row_data):
-            if val is not None:
-                try:
-                    puzzle_data[r_idx][c_idx] = int(val)
-                except ValueError:
-                    # 変換できない値は None に置き換え
-                    puzzle_data[r_idx][c_idx] = None
-    return puzzle_data
 
+    # 最後のクリックは再実行のたびに返ってくるので、新しいものだけを扱う
+    if selected_points == st.session_state.get('last_board_event'):
+        return None
+    st.session_state.last_board_event = selected_points
+    return clicked_cell_from_events(selected_points)
 
 #############################################
 # パズル読み込みUI
 #############################################
 puzzle_folder = 'puzzles'
-puzzle_files = [f for f in os.listdir(puzzle_folder) if f.endswith('.csv')]
-
-if puzzle_files:
-    st.selectbox(
-        label='🔍 パズルを選択',
-        options=puzzle_files,
-        key="selected_file"
-    )
+# フォルダの走査・読み込み結果は全セッションで共有 (mtime が変わったときだけ読み直す)
+with timer.phase('listdir'):
+    catalog = get_catalog(puzzle_folder)
+# フォルダにパズルパック (.hgp) があれば CSV の代わりにパックから選べる
+if catalog.packs:
+    source = st.selectbox('パズル集', ['フォルダ (CSV)'] + catalog.packs, key="puzzle_source")
+    if source in catalog.packs:
+        catalog = get_catalog(catalog.path(source))
+
+if len(catalog):
+    query = st.text_input('ファイル名で絞り込み (前方一致)', key="puzzle_query")
+    n_matches = catalog.count(query)
+    n_pages = max(1, -(-n_matches // PAGE_SIZE))
+    page = 1
+    if n_pages > 1:
+        page = st.selectbox(f'ページ (全 {n_pages} ページ / {n_matches} 件)',
+                            list(range(1, n_pages + 1)), key="puzzle_page")
+    with timer.phase('selector'):
+        puzzle_files, _ = catalog.search(query, page - 1)
+        st.selectbox(
+            label='🔍 パズルを選択',
+            options=puzzle_files,
+            key="selected_file",
+            format_func=catalog.label
+        )
 
     def load_selected_puzzle():
-        puzzle_path = os.path.join(puzzle_folder, st.session_state.selected_file)
-        loaded_puzzle = load_puzzle_from_csv(puzzle_path)
-        st.session_state.board_values = copy.deepcopy(loaded_puzzle)
-        st.session_state.initial_board_values = copy.deepcopy(loaded_puzzle)
+        if st.session_state.selected_file is None:
+            st.warning("パズルが選択されていません。")
+            return
+        try:
+            with st.session_state.phase_timer.phase('load'):
+                loaded_puzzle = catalog.load_board(st.session_state.selected_file)
+        except (OSError, PuzzleFormatError) as e:
+            st.error(f"読み込めませんでした: {e}")
+            return
+        # 読み込んだ盤面は凍結済みで共有されるので、入力用には clone() を持つ
+        # (このパズルの進行状況が保存されていれば、その盤面・履歴から続ける)
+        saved = progress_store.load(st.session_state.player, puzzle_hash(loaded_puzzle.values()))
+        st.session_state.initial_board_values = loaded_puzzle
+        st.session_state.progress_source = st.session_state.selected_file
+        if saved is not None:
+            st.session_state.board_values = saved.board
+            st.session_state.board_state = BoardState.from_cells(saved.board.values())
+            st.session_state.history = saved.history
+        else:
+            st.session_state.board_values = loaded_puzzle.clone()
+            st.session_state.board_state = BoardState.from_cells(loaded_puzzle.values())
+            st.session_state.history = MoveHistory(loaded_puzzle.values(),
+                                                   not st.session_state.board_state.has_duplicates)
         st.session_state.highlight_digits = []
         st.session_state.selected_pos = (None, None)
-        st.success(f"{st.session_state.selected_file} を読み込みました！")
+        # 解答・候補の計算を共有プールで始め、前のパズルの計算は (誰も待っていなければ) 止める
+        previous_key = st.session_state.solve_key
+        st.session_state.solve_key = solve_cache.submit(loaded_puzzle.values())
+        if previous_key is not None:
+            solve_cache.release(previous_key)
+        st.success(f"{st.session_state.selected_file} を読み込みました！"
+                   + (" (前回の続きから)" if saved is not None else ""))
 
     if st.button('選択したパズルを読み込み', on_click=load_selected_puzzle):
         pass
@@ -303,70 +207,247 @@ else:
     st.warning("puzzles フォルダに CSV ファイルがありません。")
 
 #############################################
-# メインロジック
+# ボタンの処理 (on_click で盤面を描く前に状態を更新する)
+# ボタンはフラグメント内にあり、そのコールバックからは表示できないので、
+# メッセージは session_state に (種類, 文) で置き、フラグメント内で show_message が出す
 #############################################
-# 1) Plotly で盤面を描画 & クリックされたセルを取得
-clicked_cell = draw_board_plotly(
-    board_values = st.session_state.board_values,
-    selected_pos = st.session_state.selected_pos,
-    initial_board_values = st.session_state.initial_board_values,
-    puzzle_completed = False,  # 一旦後で判定
-    highlight_digits = st.session_state.highlight_digits
-)
-
-# 2) もしクリックされたら、選択セルを更新
-if clicked_cell is not None:
-    st.session_state.selected_pos = clicked_cell
-
-# 3) 数字選択 UI → “選択中セル” に入力
-st.write(f"現在の選択セル: {st.session_state.selected_pos}")
-number = st.selectbox("数字を選んでください", [None,0,1,2,3,4,5,6,7,8,9])
-if st.button('数字をセルに入力'):
+def show_message(key):
+    if key in st.session_state:
+        kind, message = st.session_state.pop(key)
+        getattr(st, kind)(message)
+
+def enter_number():
     r, c = st.session_state.selected_pos
     if r is None or c is None:
-        st.warning("セルが選択されていません。")
+        st.session_state.entry_message = ('warning', "セルが選択されていません。")
+    # 初期値セルは変更不可
+    elif st.session_state.board_values.is_given_cell(r, c):
+        st.session_state.entry_message = ('warning', 'このセルは初期値なので変更できません。')
     else:
-        # 初期値セルは変更不可
-        if st.session_state.initial_board_values[r][c] is not None:
-            st.warning('このセルは初期値なので変更できません。')
-        else:
-            st.session_state.board_values[r][c] = number
-
-# 4) 重複チェック & 完成判定
-combinations = generate_combinations()
-dup_found, dup_info = check_duplicates(st.session_state.board_values, combinations)
-puzzle_completed = check_all_lines_completed(st.session_state.board_values, combinations)
-
-st.subheader("🔎 数字の重複チェック結果")
-if dup_found:
-    st.error("⚠️ 重複があります。")
-    for info in dup_info:
-        st.write(info)
-else:
-    st.success("✅ 現在、重複はありません。")
-
-# 5) パズルが完成していればハイライト UI を表示
-if puzzle_completed:
-    st.balloons()
-    st.success("🎉 すべてのラインが完成しました！")
-    st.subheader("🌸 花柄(ハナグラム)表示オプション")
-    selected_digits = st.multiselect(
-        "ピンク色でハイライトする数字を選んでください（複数選択可）",
-        [0,1,2,3,4,5,6,7,8,9],
-        default = st.session_state.highlight_digits
-    )
-    if st.button("表示"):
-        st.session_state.highlight_digits = selected_digits
+        with st.session_state.panel_timer.phase('entry'):
+            number = st.session_state.number
+            idx = cell_index[(r, c)]
+            old = st.session_state.board_values.get(idx)
+            st.session_state.board_values.set(idx, number)
+            st.session_state.board_state.set(idx, number)
+            st.session_state.history.record(idx, old, number,
+                                            not st.session_state.board_state.has_duplicates)
+
+def enter_bulk():
+    # 文字列でまとめて入力: 文字列が不正なら何も変えず、初期値セルなどはセル毎に却下
+    # (結果はフォームの下に出す)
+    try:
+        assignments = parse_entry(st.session_state.bulk_target, st.session_state.bulk_text)
+    except EntryError as e:
+        st.session_state.bulk_message = ('error', f"まとめて入力できません: {e}")
+        return
+    plan = plan_entry(st.session_state.board_values, assignments)
+    with st.session_state.panel_timer.phase('entry'):
+        applied = apply_entry(plan, st.session_state.board_values,
+                              st.session_state.board_state, st.session_state.history)
+    if plan.rejected:
+        st.session_state.bulk_message = (
+            'warning', f"{applied} セルを入力し、{len(plan.rejected)} セルは入力しませんでした:\n"
+            + format_rejected(plan.rejected))
+    else:
+        st.session_state.bulk_message = ('success', f"{applied} セルを入力しました。")
 
-    # いったん再度描画 (完了後のハイライト表示)  
-    # クリックイベントは不要なので、下記は描画だけでもOK
-    draw_board_plotly(
+def fill_solution():
+    # 読み込み時に始めた計算の結果を使う (終わっていなければ待つ)
+    solution = solve_cache.result(st.session_state.initial_board_values.values()).solution
+    if solution is None:
+        st.session_state.solve_message = ('error', 'このパズルには解がありません。')
+    else:
+        givens = st.session_state.initial_board_values.givens
+        st.session_state.board_values = Board.from_cells(solution, givens)
+        st.session_state.board_state = BoardState.from_cells(solution)
+        # 解答の表示は手順ではないので、履歴は解答を起点に作り直す
+        st.session_state.history = MoveHistory(st.session_state.board_values.values())
+
+def apply_history_step(steps):
+    for idx, value in steps:
+        st.session_state.board_values.set(idx, value)
+        st.session_state.board_state.set(idx, value)
+
+def undo_move():
+    apply_history_step(st.session_state.history.undo())
+
+def redo_move():
+    apply_history_step(st.session_state.history.redo())
+
+def restore_position(position):
+    values = st.session_state.history.goto(position)
+    givens = st.session_state.initial_board_values.givens
+    st.session_state.board_values = Board.from_cells(values, givens)
+    st.session_state.board_state = BoardState.from_cells(values)
+
+def rewind_to_clean():
+    position = st.session_state.history.last_clean_position()
+    if position is None:
+        st.session_state.history_message = ('warning', '重複のない状態が履歴に残っていません。')
+    else:
+        restore_position(position)
+
+def jump_to_position():
+    restore_position(st.session_state.history_position)
+
+def apply_highlight():
+    st.session_state.highlight_digits = st.session_state.highlight_choice
+
+#############################################
+# メインロジック (盤面・入力・判定のフラグメント)
+# セルのクリックや入力ではこの関数だけが再実行され、
+# 上のパズル選択 UI は再実行されない。重複・完成判定は
+# BoardState が入力のたびに関係するラインだけ更新した結果を読むだけ
+#############################################
+@st.fragment
+def play_panel():
+    panel_timer = st.session_state.panel_timer
+
+    # 1) 重複チェック & 完成判定 (差分更新済みの結果を読むだけ)
+    board_state = st.session_state.board_state
+    with panel_timer.phase('duplicate_check'):
+        dup_found, dup_info = board_state.check_duplicates()
+    with panel_timer.phase('completion_check'):
+        puzzle_completed = board_state.is_completed
+
+    # 2) Plotly で盤面を描画 (完成時はハイライト込みで 1 回だけ) & クリックされたセルを取得
+    clicked_cell = draw_board_plotly(
         board_values = st.session_state.board_values,
         selected_pos = st.session_state.selected_pos,
         initial_board_values = st.session_state.initial_board_values,
         puzzle_completed = puzzle_completed,
-        highlight_digits = st.session_state.highlight_digits
+        highlight_digits = st.session_state.highlight_digits,
+        timer = panel_timer
     )
-else:
-    st.info("パズルが完成すると、選択した数字をピンクでハイライトできます。")
 
+    # 3) もしクリックされたら、選択セルを更新してフラグメントだけ描き直す
+    if clicked_cell is not None and clicked_cell != st.session_state.selected_pos:
+        st.session_state.selected_pos = clicked_cell
+        st.rerun(scope="fragment")
+
+    # 4) 数字選択 UI → “選択中セル” に入力
+    st.write(f"現在の選択セル: {st.session_state.selected_pos}")
+    known = solve_cache.get(st.session_state.solve_key)
+    r, c = st.session_state.selected_pos
+    if known is not None and known.candidates is not None and (r, c) in cell_index:
+        st.caption(f"初期盤面から入りうる数字: {list(known.candidates[cell_index[(r, c)]])}")
+    st.selectbox("数字を選んでください", [None,0,1,2,3,4,5,6,7,8,9], key="number")
+    st.button('数字をセルに入力', on_click=enter_number)
+    show_message('entry_message')
+
+    # 4.1) まとめて入力 (フォーム内は送信するまで再実行しない)
+    with st.expander('まとめて入力 (ライン / 盤面全体)'):
+        st.caption("0～9 は数字、'.' は空欄。ラインは番号 0～8 の順に 9 文字、"
+                   "盤面全体は 42 文字 (セル順) か 6×9 = 54 文字。空白・',' '/' '|' は無視します。")
+        st.code(board_to_text(st.session_state.board_values), language=None)
+        with st.form('bulk_entry'):
+            st.selectbox('対象', [BOARD_TARGET] + line_labels, key='bulk_target')
+            st.text_input('文字列', key='bulk_text')
+            st.form_submit_button('まとめて入力', on_click=enter_bulk)
+        show_message('bulk_message')
+
+    # 4.2) 履歴: 元に戻す / やり直す / 重複のない状態まで戻す / 任意の手順へ移動
+    history = st.session_state.history
+    undo_col, redo_col, rewind_col = st.columns(3)
+    undo_col.button('元に戻す', on_click=undo_move, disabled=not history.can_undo)
+    redo_col.button('やり直す', on_click=redo_move, disabled=not history.can_redo)
+    rewind_col.button('重複のない状態まで戻す', on_click=rewind_to_clean, disabled=not dup_found)
+    if len(history):
+        st.session_state.history_position = history.position
+        st.slider('手順', 0, len(history), key="history_position", on_change=jump_to_position)
+    show_message('history_message')
+
+    # 4.5) ソルバー: 解答の表示 / 選択セルのヒント
+    st.button('解答を表示 (solve)', on_click=fill_solution)
+    show_message('solve_message')
+
+    if st.button('選択セルのヒント'):
+        r, c = st.session_state.selected_pos
+        if r is None or c is None:
+            st.warning("セルが選択されていません。")
+        elif st.session_state.board_values.is_given_cell(r, c):
+            st.info('このセルは初期値です。')
+        else:
+            # 入力済みの数字と矛盾しない解を優先し、解けなければ初期値だけで解く
+            # (読み込み時に計算した解答と入力が食い違っていなければそれを使う)
+            values = st.session_state.board_values.values()
+            if known is not None and known.solution is not None \
+                    and not solve_cache.conflicts(values, known.solution):
+                digit = known.solution[cell_index[(r, c)]]
+            else:
+                digit = hint(st.session_state.board_values, r, c)
+            if digit is None:
+                solution = solve_cache.result(st.session_state.initial_board_values.values()).solution
+                digit = None if solution is None else solution[cell_index[(r, c)]]
+            if digit is None:
+                st.error('このパズルには解がありません。')
+            else:
+                st.info(f"ヒント: セル {(r, c)} には {digit} が入ります。")
+
+    # 読み込み時に計算した解答との答え合わせ (計算が終わっていなければ待たない)
+    if st.button('答え合わせ'):
+        if known is None:
+            st.info('解答を計算中です。少し待ってからもう一度押してください。')
+        elif known.solution is None:
+            st.error('このパズルには解がありません。')
+        else:
+            wrong = solve_cache.conflicts(st.session_state.board_values.values(), known.solution)
+            if wrong:
+                st.error(f"解答と異なるセルが {len(wrong)} 個あります: {[cells[idx] for idx in wrong]}")
+            else:
+                st.success('入力済みのセルはすべて解答と一致しています。')
+
+    # 5) 重複チェック結果
+    st.subheader("🔎 数字の重複チェック結果")
+    if dup_found:
+        st.error("⚠️ 重複があります。")
+        for info in dup_info:
+            st.write(info)
+    else:
+        st.success("✅ 現在、重複はありません。")
+
+    # 6) パズルが完成していればハイライト UI を表示
+    if puzzle_completed:
+        st.balloons()
+        st.success("🎉 すべてのラインが完成しました！")
+        st.subheader("🌸 花柄(ハナグラム)表示オプション")
+        st.multiselect(
+            "ピンク色でハイライトする数字を選んでください（複数選択可）",
+            [0,1,2,3,4,5,6,7,8,9],
+            default = st.session_state.highlight_digits,
+            key = "highlight_choice"
+        )
+        st.button("表示", on_click=apply_highlight)
+    else:
+        st.info("パズルが完成すると、選択した数字をピンクでハイライトできます。")
+
+    # 6.5) 進行状況を保存 (待ち行列に置くだけで、ディスクへの書き込みは待たない)
+    with panel_timer.phase('save'):
+        save_progress()
+
+    # 7) フラグメント分の計測結果 (サイドバーにはフラグメントから書けないのでここに出す)
+    if profiling:
+        record = panel_timer.finish('hanagram_app2.play_panel')
+        with st.expander(f"⏱ 盤面の処理時間 {record['total_ms']:.1f} ms", expanded=False):
+            st.table(record['phases'])
+        st.session_state.panel_timer = PhaseTimer(profiling)
+
+
+play_panel()
+
+#############################################
+# 計測結果 (サイドバー) と JSONL ログ・cProfile
+#############################################
+def request_cprofile():
+    st.session_state.cprofile_next = True
+
+if profiling:
+    record = timer.finish('hanagram_app2', file=st.session_state.get('selected_file'))
+    with st.sidebar.expander(f"⏱ 処理時間 {record['total_ms']:.1f} ms", expanded=False):
+        st.table(record['phases'])
+        st.button('次の再実行を cProfile で記録', on_click=request_cprofile)
+        if profiler is not None:
+            st.caption(dump_profile(profiler, 'hanagram_app2'))
+            st.code(profile_summary(profiler))
+    st.session_state.phase_timer = PhaseTimer(profiling)